@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+generate_nova_csv.py
+Writes a realistic synthetic Nova Scheduling CSV for benchmarks.
+
+Responsibility:
+- Same columns as the tagger export: title, due, list, flagged, priority, completed, id
+- A mix of valid, empty, "No", "Error: ..." and malformed due values
+- Project / phase / keyword titles for build_project_view
+- Daily-keyword titles ("water", "feed", ...) for the recurrence generator
+- Deterministic for a given seed and as-of date
+"""
+
+import argparse
+import csv
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+FIELDNAMES = ['title', 'due', 'list', 'flagged', 'priority', 'completed', 'id']
+
+LISTS = ['Reminders', 'Home', 'Work', 'Errands', 'Projects', 'Roadmap', 'Health', 'Family']
+PROJECTS = ['Jenquin Site', 'Digital Twin', 'Nova Router', 'Garage Cleanout', 'Tax Prep 2025']
+PHASES = ['Design', 'Build', 'Testing', 'Launch', 'Research']
+PLAIN_TITLES = ['Buy milk', 'Call mom', 'Pay electric bill', 'Book dentist', 'Return package',
+                'Email landlord', 'Renew passport', 'Schedule oil change', 'Café with Zoë']
+DAILY_TITLES = ['Water plants', 'Feed the cat', 'Walk dog', 'Exercise 20 min', 'Daily journal',
+                'Every day: vitamins']
+KEYWORD_TITLES = ['Milestone review', 'Roadmap sync', 'Epic grooming', 'Feature flag cleanup']
+
+def make_title(rng, i):
+    roll = rng.random()
+    if roll < 0.08:
+        return f"Project — {rng.choice(PROJECTS)}"
+    if roll < 0.16:
+        return f"Phase: {rng.choice(PHASES)} {rng.randint(1, 4)}"
+    if roll < 0.22:
+        return rng.choice(KEYWORD_TITLES)
+    if roll < 0.32:
+        return rng.choice(DAILY_TITLES)
+    title = rng.choice(PLAIN_TITLES)
+    return f"{title} #{i % 97}" if rng.random() < 0.5 else title
+
+def make_due(rng, as_of):
+    roll = rng.random()
+    if roll < 0.08:
+        return ''
+    if roll < 0.11:
+        return 'No'
+    if roll < 0.13:
+        return 'Error: could not read due date'
+    if roll < 0.14:
+        return '2025-13-40 25:00:00'
+    day = as_of + timedelta(days=int(rng.triangular(-60, 60, 0)))
+    hour = rng.choice([0, 8, 9, 9, 12, 14, 17, 18, 20])
+    minute = rng.choice([0, 0, 15, 30, 45])
+    return datetime(day.year, day.month, day.day, hour, minute).strftime('%Y-%m-%d %H:%M:%S')
+
+def generate_rows(count, seed=813, as_of=None):
+    """Yield CSV row dicts"""
+    rng = random.Random(seed)
+    as_of = as_of or date.today()
+    for i in range(count):
+        yield {
+            'title': make_title(rng, i),
+            'due': make_due(rng, as_of),
+            'list': rng.choice(LISTS),
+            'flagged': 'Yes' if rng.random() < 0.1 else 'No',
+            'priority': rng.choice([0, 0, 0, 0, 1, 5, 9]),
+            'completed': 'Yes' if rng.random() < 0.15 else 'No',
+            'id': f"x-apple-reminder://{seed:04d}-{i:08d}"
+        }
+
+def write_csv(path, count, seed=813, as_of=None):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(generate_rows(count, seed, as_of))
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Nova Scheduling CSV")
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output_csv')
+    parser.add_argument('--seed', type=int, default=813)
+    parser.add_argument('--as-of', type=date.fromisoformat, default=None,
+                        help="date the due dates cluster around (default: today)")
+    args = parser.parse_args()
+
+    write_csv(args.output_csv, args.rows, args.seed, args.as_of)
+    print(f"✅ Wrote {args.rows} rows to {args.output_csv}")
+    sys.exit(0)
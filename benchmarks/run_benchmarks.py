@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+run_benchmarks.py
+Times every pipeline stage on synthetic exports and guards against regressions.
+
+Responsibility:
+- Generate (and reuse) synthetic CSVs at several sizes
+- Time each stage (best of N) and measure its peak memory with tracemalloc
+- Write machine-readable results (JSON)
+- Exit non-zero when a stage is slower, or peaks higher, than a stored baseline
+  by more than its tolerance (--tolerance for time, --memory-tolerance for memory)
+
+Usage:
+  python3 benchmarks/run_benchmarks.py --output results.json            (10k, 100k and 1M rows)
+  python3 benchmarks/run_benchmarks.py --sizes 10000,100000 --output results.json
+  python3 benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+  python3 benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+sys.path.insert(0, str(ROOT))
+
+from generate_nova_csv import write_csv
+from nova_csv import read_reminders
+from snapshot_cache import SnapshotCache
+from view_writer import write_view
+from build_all_views import build_all_views, build_views_for_dates
+from build_daily_view import DailyView, build_daily_view
+from build_backlog_view import BacklogView, build_backlog_view
+from build_project_view import ProjectView, build_project_view, is_project_item, extract_project_info
+from build_week_view import WeekView, build_week_view
+from build_top3_view import Top3View
+from search_index import SearchView
+from build_next_actions_view import NextActionView
+from synthetic_cleanup_patch import enhanced_recurrence_generator
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+def feed(view_class, rows):
+    view = view_class()
+    for row in rows:
+        view.add(row)
+    return view.build()
+
+def classify_projects(rows):
+    for row in rows:
+        if is_project_item(row['title'], row['list']):
+            extract_project_info(row['title'])
+
+def as_tagger_reminders(rows):
+    """Dict reminders shaped like reminder_tagger's input to the recurrence generator"""
+    return [{
+        'id': row['id'],
+        'title': row['title'],
+        'due': row['due'].dt.strftime('%Y-%m-%d %H:%M:%S') if row['due'] else '',
+        'recurrence': 'daily' if i % 50 == 0 else ''
+    } for i, row in enumerate(rows)]
+
+def stage_plan(csv_path, work_dir):
+    """(name, setup, run) for every stage; setup's result is passed to run"""
+    rows = lambda: list(read_reminders(csv_path))
+    out = lambda name: work_dir / name
+
+    def recurrence_setup():
+        reminders = as_tagger_reminders(rows())
+        return reminders, {r['id'] for r in reminders}
+
+    def cache_warm():
+        cache_dir = work_dir / 'cache'
+        SnapshotCache(cache_dir).load_rows(csv_path)
+        return cache_dir
+
+    return [
+        ('parse', None, lambda _: list(read_reminders(csv_path))),
+        ('cache_hit_load', cache_warm, lambda cache_dir: SnapshotCache(cache_dir).load_rows(csv_path)),
+        ('view_daily', rows, lambda r: feed(DailyView, r)),
+        ('view_backlog', rows, lambda r: feed(BacklogView, r)),
+        ('view_projects', rows, lambda r: feed(ProjectView, r)),
+        ('view_week', rows, lambda r: feed(WeekView, r)),
+        ('view_top3', rows, lambda r: feed(Top3View, r)),
+        ('view_search', rows, lambda r: feed(SearchView, r)),
+        ('view_next_actions', rows, lambda r: feed(NextActionView, r)),
+        ('classify_projects', rows, classify_projects),
+        ('serialize_backlog', lambda: feed(BacklogView, rows()),
+         lambda output: write_view(output, out('backlog.json'))),
+        ('serialize_backlog_pretty', lambda: feed(BacklogView, rows()),
+         lambda output: write_view(output, out('backlog.json'), pretty=True)),
+        ('build_daily_view', None, lambda _: build_daily_view(csv_path, out('daily.json'))),
+        ('build_backlog_view', None, lambda _: build_backlog_view(csv_path, out('backlog.json'))),
+        ('build_project_view', None, lambda _: build_project_view(csv_path, out('projects.json'))),
+        ('build_week_view', None, lambda _: build_week_view(csv_path, out('week.json'))),
+        ('build_all_views', None, lambda _: build_all_views(csv_path, work_dir / 'all')),
+        ('build_views_7_days', None,
+         lambda _: build_views_for_dates(csv_path, work_dir / 'days',
+                                         [date.today() + timedelta(days=n) for n in range(7)])),
+        ('recurrence_generator', recurrence_setup, lambda args: enhanced_recurrence_generator(*args)),
+    ]
+
+def measure(setup, run, repeat):
+    """Best wall time over `repeat` runs and peak traced memory of one run"""
+    best = float('inf')
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        gc.collect()
+        started = time.perf_counter()
+        run(arg)
+        best = min(best, time.perf_counter() - started)
+
+    arg = setup() if setup else None
+    gc.collect()
+    tracemalloc.start()
+    run(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': round(best, 6), 'peak_kib': peak // 1024}
+
+def run_suite(sizes, repeat, stages, csv_dir, seed):
+    results = {}
+    for size in sizes:
+        csv_path = Path(csv_dir) / f"nova_{size}_{seed}_{date.today().isoformat()}.csv"
+        if not csv_path.exists():
+            write_csv(csv_path, size, seed)
+        results[str(size)] = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, setup, run in stage_plan(csv_path, Path(tmp)):
+                if stages and name not in stages:
+                    continue
+                # The builders print progress; keep the report readable
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = measure(setup, run, repeat)
+                results[str(size)][name] = result
+                print(f"   {size:>9,} rows  {name:<26} {result['seconds']:>9.4f}s  {result['peak_kib']:>9,} KiB",
+                      flush=True)
+    return results
+
+def find_regressions(results, baseline, tolerance, min_seconds, memory_tolerance, min_kib):
+    """(size, stage, metric, before, after) for every stage slower than baseline * (1 + tolerance)
+    or peaking above baseline * (1 + memory_tolerance), ignoring sub-min_seconds / sub-min_kib noise"""
+    limits = (('seconds', tolerance, min_seconds), ('peak_kib', memory_tolerance, min_kib))
+    regressions = []
+    for size, stages in results.items():
+        for name, result in stages.items():
+            base = baseline.get('results', {}).get(size, {}).get(name)
+            if not base:
+                continue
+            for metric, allowed, noise in limits:
+                if metric not in base:
+                    continue
+                before, after = base[metric], result[metric]
+                if after > before * (1 + allowed) and after - before > noise:
+                    regressions.append((size, name, metric, before, after))
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the reminders pipeline")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated row counts, e.g. 10000,100000,1000000")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--stages', default='', help="comma-separated subset of stages")
+    parser.add_argument('--seed', type=int, default=813)
+    parser.add_argument('--csv-dir', default=os.path.join(tempfile.gettempdir(), 'jenquin-bench'))
+    parser.add_argument('--output', help="write results JSON here")
+    parser.add_argument('--baseline', help="compare against this results JSON")
+    parser.add_argument('--save-baseline', help="write results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown over baseline (default: %(default)s = 25%%)")
+    parser.add_argument('--min-seconds', type=float, default=0.01,
+                        help="ignore slowdowns smaller than this many seconds")
+    parser.add_argument('--memory-tolerance', type=float, default=0.10,
+                        help="allowed peak memory growth over baseline (default: %(default)s = 10%%)")
+    parser.add_argument('--min-kib', type=int, default=256,
+                        help="ignore peak memory growth smaller than this many KiB")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    stages = {s for s in args.stages.split(',') if s}
+    os.makedirs(args.csv_dir, exist_ok=True)
+
+    print(f"🏁 Benchmarking {', '.join(f'{s:,}' for s in sizes)} rows (best of {args.repeat})")
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'generated_at': datetime.now().isoformat()
+        },
+        'results': run_suite(sizes, args.repeat, stages, args.csv_dir, args.seed)
+    }
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"💾 Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report['results'], baseline, args.tolerance, args.min_seconds,
+                                       args.memory_tolerance, args.min_kib)
+        for size, name, metric, before, after in regressions:
+            if metric == 'seconds':
+                print(f"❌ Regression: {name} at {int(size):,} rows {before:.4f}s → {after:.4f}s")
+            else:
+                print(f"❌ Memory regression: {name} at {int(size):,} rows {before:,} KiB → {after:,} KiB")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No stage slower than baseline by more than {args.tolerance:.0%} "
+              f"or using more than {args.memory_tolerance:.0%} extra peak memory")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+RRULE-style recurrence expansion for the reminder tagger's synthetic instances.
+
+Supports FREQ=DAILY/WEEKLY/MONTHLY with INTERVAL, BYDAY (plain or ordinal,
+e.g. 2TU / -1FR for monthly), BYMONTHDAY, UNTIL and COUNT, plus the plain
+"daily" / "weekly" / "monthly" values the tagger already writes.
+Occurrences are dates; the time of day comes from the original reminder.
+"""
+
+import json
+import os
+import re
+from collections import namedtuple
+from datetime import date, timedelta
+
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+INDEX_VERSION = 1
+
+Rule = namedtuple('Rule', 'freq interval byday bymonthday until count')
+
+_BYDAY = re.compile(r'([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)')
+
+def parse_rule(text):
+    """Rule for an RRULE string or plain frequency word; None if unsupported"""
+    text = (text or '').strip().upper()
+    if text.startswith('RRULE:'):
+        text = text[len('RRULE:'):]
+    if not text:
+        return None
+    if '=' not in text:
+        return Rule(text, 1, (), (), None, None) if text in FREQUENCIES else None
+
+    try:
+        parts = dict(part.split('=', 1) for part in text.split(';') if part)
+        freq = parts.get('FREQ')
+        interval = int(parts.get('INTERVAL', 1))
+        if freq not in FREQUENCIES or interval < 1:
+            return None
+
+        byday = []
+        for token in filter(None, parts.get('BYDAY', '').split(',')):
+            match = _BYDAY.fullmatch(token)
+            if match is None:
+                return None
+            byday.append((int(match.group(1) or 0), WEEKDAYS.index(match.group(2))))
+
+        bymonthday = tuple(int(day) for day in filter(None, parts.get('BYMONTHDAY', '').split(',')))
+        if any(day == 0 or not -31 <= day <= 31 for day in bymonthday):
+            return None
+
+        until = parts.get('UNTIL')
+        until = date(int(until[:4]), int(until[4:6]), int(until[6:8])) if until else None
+        count = int(parts['COUNT']) if 'COUNT' in parts else None
+        if count is not None and count < 1:
+            return None
+    except (ValueError, IndexError):
+        return None
+    return Rule(freq, interval, tuple(byday), bymonthday, until, count)
+
+def _month_days(year, month, rule, dtstart):
+    first = date(year, month, 1)
+    last = (date(year + month // 12, month % 12 + 1, 1) - first).days
+
+    days = None
+    if rule.byday:
+        days = set()
+        for ordinal, weekday in rule.byday:
+            matches = [first + timedelta(days=offset) for offset in range((weekday - first.weekday()) % 7, last, 7)]
+            if ordinal == 0:
+                days.update(matches)
+            elif -len(matches) <= ordinal <= len(matches):
+                days.add(matches[ordinal - 1 if ordinal > 0 else ordinal])
+    if rule.bymonthday or not rule.byday:
+        monthdays = rule.bymonthday or (dtstart.day,)
+        # Days that do not exist in this month are skipped, as in RFC 5545
+        by_number = {date(year, month, day if day > 0 else last + 1 + day)
+                     for day in monthdays if 1 <= (day if day > 0 else last + 1 + day) <= last}
+        days = by_number if days is None else days & by_number
+    return sorted(days)
+
+def _periods(rule, dtstart, skip_to=None):
+    """(period start, sorted candidate dates) per period, from the period containing skip_to"""
+    if rule.freq == 'DAILY':
+        weekdays = {weekday for _, weekday in rule.byday}
+        k = max(0, -(-(skip_to - dtstart).days // rule.interval)) if skip_to else 0
+        while True:
+            day = dtstart + timedelta(days=k * rule.interval)
+            yield day, [day] if not weekdays or day.weekday() in weekdays else []
+            k += 1
+    elif rule.freq == 'WEEKLY':
+        week0 = dtstart - timedelta(days=dtstart.weekday())
+        offsets = sorted({weekday for _, weekday in rule.byday} or {dtstart.weekday()})
+        step = 7 * rule.interval
+        k = max(0, (skip_to - week0).days // step) if skip_to else 0
+        while True:
+            monday = week0 + timedelta(days=k * step)
+            yield monday, [monday + timedelta(days=offset) for offset in offsets]
+            k += 1
+    else:
+        month0 = dtstart.year * 12 + dtstart.month - 1
+        k = max(0, (skip_to.year * 12 + skip_to.month - 1 - month0) // rule.interval) if skip_to else 0
+        while True:
+            year, month = divmod(month0 + k * rule.interval, 12)
+            yield date(year, month + 1, 1), _month_days(year, month + 1, rule, dtstart)
+            k += 1
+
+def occurrences(rule, dtstart, start, end):
+    """Occurrence dates of rule anchored at dtstart within [start, end)"""
+    found = []
+    emitted = 0
+    # COUNT is counted from dtstart, so only uncounted rules can skip ahead
+    skip_to = start if rule.count is None and start > dtstart else None
+    for period_start, days in _periods(rule, dtstart, skip_to):
+        if period_start >= end:
+            break
+        for day in days:
+            if day < dtstart:
+                continue
+            if (rule.until and day > rule.until) or day >= end:
+                return found
+            emitted += 1
+            if rule.count and emitted > rule.count:
+                return found
+            if day >= start:
+                found.append(day)
+    return found
+
+class OccurrenceIndex:
+    """Occurrence dates per recurring reminder over a rolling [start, end) horizon
+
+    Entries are keyed by reminder id and remember the rule text and anchor
+    they were expanded from. An update re-expands only reminders whose rule
+    or anchor changed; when the horizon rolls forward, kept entries just
+    drop past dates and expand the newly uncovered days.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.start = None
+        self.end = None
+        self.entries = {}    # id -> {'rule', 'anchor', 'dates': ['YYYY-MM-DD', ...]}
+        self.expanded = 0    # full expansions done by the last update
+        self.dirty = False
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if saved.get('version') == INDEX_VERSION:
+                    self.start = date.fromisoformat(saved['start'])
+                    self.end = date.fromisoformat(saved['end'])
+                    self.entries = saved['entries']
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def update(self, recurring, start, end):
+        """recurring maps id -> (rule text, anchor date); returns ids whose dates changed"""
+        changed = set()
+        self.expanded = 0
+        rolled = self.end is not None and self.start <= start <= self.end
+        same_horizon = (self.start, self.end) == (start, end)
+
+        for reminder_id, (text, anchor) in recurring.items():
+            entry = self.entries.get(reminder_id)
+            unchanged_rule = entry is not None and entry['rule'] == text and entry['anchor'] == anchor.isoformat()
+            if unchanged_rule and same_horizon:
+                continue
+
+            rule = parse_rule(text)
+            if rule is None:
+                dates = []
+            elif unchanged_rule and rolled:
+                kept = [day for day in entry['dates'] if start.isoformat() <= day < end.isoformat()]
+                dates = kept + [day.isoformat() for day in occurrences(rule, anchor, max(self.end, start), end)]
+            else:
+                dates = [day.isoformat() for day in occurrences(rule, anchor, start, end)]
+                self.expanded += 1
+
+            if entry is None or entry['dates'] != dates:
+                changed.add(reminder_id)
+            self.entries[reminder_id] = {'rule': text, 'anchor': anchor.isoformat(), 'dates': dates}
+            self.dirty = True
+
+        for reminder_id in self.entries.keys() - recurring.keys():
+            del self.entries[reminder_id]
+            changed.add(reminder_id)
+        self.dirty = self.dirty or bool(changed) or not same_horizon
+        self.start, self.end = start, end
+        return changed
+
+    def dates(self, reminder_id):
+        entry = self.entries.get(reminder_id)
+        return [date.fromisoformat(day) for day in entry['dates']] if entry else []
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # One-shot dumps uses the C encoder; json.dump to a file does not
+            f.write(json.dumps({
+                'version': INDEX_VERSION,
+                'start': self.start.isoformat(),
+                'end': self.end.isoformat(),
+                'entries': self.entries
+            }, ensure_ascii=False, separators=(',', ':')))
+        os.replace(tmp_path, self.path)
+        self.dirty = False
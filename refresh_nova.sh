@@ -15,12 +15,11 @@ ls "$PROJECT_DIR" >> "$HOME/refresh_nova.log" 2>&1
 # Use venv's python explicitly (don't rely on 'source' + bare 'python')
 VENV_PY="$PROJECT_DIR/venv/bin/python"
 
-$VENV_PY -m life_organizer.modules.organized_reminders.scripts.export_reminders
-$VENV_PY -m life_organizer.modules.organized_reminders.scripts.deduplicate_reminders
-$VENV_PY -m life_organizer.modules.organized_reminders.scripts.reminder_tagger --commit
-
 cd "$SITE_DIR" || { echo "Failed to cd to $SITE_DIR" >> "$HOME/refresh_nova.log"; exit 1; }
 
-./scripts/pull_reminders_local.sh
+# export → dedupe → tag → (views | csv copy) → snapshot, as declared in
+# scripts/refresh_pipeline.json; stages whose inputs are unchanged since
+# their last run are skipped, independent ones run side by side
+$VENV_PY "$SITE_DIR/scripts/refresh_pipeline.py" >> "$HOME/refresh_nova.log" 2>&1
 
 echo "$(date): refresh_nova finished OK" >> "$HOME/refresh_nova.log"
\ No newline at end of file
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+build_all_views.py
+Builds daily.json, backlog.json, projects.json, week.json, top3.json,
+search_index.json and next_actions.json in one run.
+
+Responsibility:
+- Read and normalize the Nova Scheduling CSV exactly once
+- Feed every reminder to each view's accumulator
+- Write every view with the same JSON layout as the single-view scripts
+- Reuse parsed rows from the snapshot cache when the export is unchanged
+- Patch the previous views from a row-level diff when only a few reminders changed
+- Publish a per-view version counter (view_versions.json) for push clients,
+  bumped only for views whose content changed
+- Optionally shard backlog.json into pages with a manifest
+- Optionally write calendar month shards from a sorted due index
+- Compact JSON by default; --pretty restores the indented debug layout
+- Publish each run as an atomic generation (view_publisher.py): views are
+  staged, fsynced and swapped in together via data/current
+- Per-stage timings and row counters in a rolling metrics.json
+- Optionally parse and classify across a process pool (--workers) for
+  archive-scale exports, with output identical to the serial path
+- Optional streaming mode (--streaming) with flat memory: backlog and week
+  items are spilled to disk and merged while writing, or capped to the
+  top N per backlog category
+- Tomorrow's daily and week views are pre-rendered into next/ in the same
+  pass, for view_server.py to swap in at midnight without a rebuild
+- --as-of builds the views of another day (clock.py); --through builds
+  every day of a range into <data_dir>/<YYYY-MM-DD>/ from one pass
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
+
+import clock
+from nova_csv import read_reminders, DUE_OK, DUE_MISSING
+from pipeline_metrics import Metrics, configure_logging, log
+from view_writer import write_view, expand_strings
+from snapshot_cache import SnapshotCache, DEFAULT_CACHE_DIR
+from reminder_diff import diff_reminders, diff_size, patch_view, summarize
+from build_daily_view import DailyView
+from build_backlog_view import BacklogView, StreamingBacklogView, write_backlog_shards, SHARD_DIR
+from build_project_view import ProjectView
+from build_week_view import WeekView, StreamingWeekView
+from build_top3_view import Top3View
+from search_index import SearchView
+from build_next_actions_view import NextActionView
+from external_sort import DEFAULT_SPILL_BUDGET
+from due_index import DueIndex, write_month_shards, CALENDAR_DIR
+from parallel_csv import build_views_parallel
+from view_publisher import ViewPublisher, KEEP_GENERATIONS
+
+# Output file name -> view accumulator class
+VIEW_FILES = {
+    'daily.json': DailyView,
+    'backlog.json': BacklogView,
+    'projects.json': ProjectView,
+    'week.json': WeekView,
+    'top3.json': Top3View,
+    'search_index.json': SearchView,
+    'next_actions.json': NextActionView
+}
+
+# Views that depend on the date; the search index is the same every day
+DATED_VIEWS = [name for name in VIEW_FILES if name != 'search_index.json']
+
+# Tomorrow's copies of these are written to next/ with every build;
+# view_server.py serves them in place of today's from midnight on
+NEXT_DAY_DIR = 'next'
+NEXT_DAY_VIEWS = ('daily.json', 'week.json')
+
+# Longest --through range built in one pass
+MAX_BATCH_DAYS = 366
+
+# Records which export the views in data_dir were built from
+STATE_FILE = '.build_state.json'
+
+# Per-view version counters, read by view_server.py to push updates
+VERSIONS_FILE = 'view_versions.json'
+
+# Rolling per-run timings and counters
+METRICS_FILE = 'metrics.json'
+
+# Changed ids listed in view_versions.json beyond this are left out
+MAX_CHANGE_IDS = 100
+
+# Above this share of changed rows a full rebuild is cheaper than patching
+MAX_PATCH_RATIO = 0.25
+
+def new_views(today, next_day=False):
+    views = {name: view_class(today) for name, view_class in VIEW_FILES.items()}
+    if next_day:
+        tomorrow = today + timedelta(days=1)
+        for name in NEXT_DAY_VIEWS:
+            views[f"{NEXT_DAY_DIR}/{name}"] = VIEW_FILES[name](tomorrow)
+    return views
+
+def new_streaming_views(today, backlog_limit=None, spill_budget=DEFAULT_SPILL_BUDGET, next_day=False):
+    views = new_views(today, next_day)
+    views['backlog.json'] = StreamingBacklogView(today, backlog_limit, spill_budget)
+    views['week.json'] = StreamingWeekView(today, spill_budget)
+    views['top3.json'] = Top3View(today, keep_scores=False)
+    if next_day:
+        views[f"{NEXT_DAY_DIR}/week.json"] = StreamingWeekView(today + timedelta(days=1), spill_budget)
+    return views
+
+def read_state(data_dir):
+    try:
+        with open(data_dir / STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_state(data_dir, state):
+    write_view(state, data_dir / STATE_FILE, pretty=True)
+
+def publish_versions(data_dir, diff, digests, previous_dir=None):
+    """Bump the version of each view whose content digest changed
+
+    digests maps view file name -> write_view digest; the previous
+    counters and digests are read from previous_dir (default data_dir).
+    Returns the names of the bumped views.
+    """
+    path = data_dir / VERSIONS_FILE
+    previous_path = (previous_dir or data_dir) / VERSIONS_FILE
+    try:
+        with open(previous_path, 'r', encoding='utf-8') as f:
+            versions = json.load(f)
+    except (OSError, ValueError):
+        versions = {'views': {}}
+
+    bumped = []
+    for name in VIEW_FILES:
+        view = name[:-len('.json')]
+        entry = versions['views'].get(view)
+        if entry is not None and entry.get('digest') == digests.get(name):
+            continue
+        entry = versions['views'].setdefault(view, {'version': 0})
+        entry['version'] += 1
+        entry['url'] = f"data/{name}"
+        entry['digest'] = digests.get(name)
+        bumped.append(view)
+
+    if not bumped:
+        if previous_path != path:
+            write_view(versions, path, pretty=True)
+        return bumped
+
+    changes = None
+    if diff is not None and diff_size(diff) <= MAX_CHANGE_IDS:
+        changes = summarize(diff)
+    versions['changes'] = changes
+    versions['changed'] = bumped
+    versions['generated_at'] = clock.now().isoformat()
+
+    write_view(versions, path, pretty=True)
+    return bumped
+
+def tally_rows(rows, metrics, adders=()):
+    """Count rows by outcome, feeding each to the view adders on the way"""
+    processed = completed = valid = undated = 0
+    for row in rows:
+        processed += 1
+        completed += row['completed']
+        status = row['due_status']
+        if status == DUE_OK:
+            valid += 1
+        elif status == DUE_MISSING:
+            undated += 1
+        for add in adders:
+            add(row)
+    metrics.count('rows_processed', processed)
+    metrics.count('rows_valid_due', valid)
+    metrics.count('rows_undated', undated)
+    metrics.count('rows_error_due', processed - valid - undated)
+    metrics.count('rows_skipped_completed', completed)
+
+def patch_views(views, data_dir, previous_rows, rows):
+    """Patch each view from its previous JSON; returns the diff or None
+
+    Views whose output can't be restored (load() returns False before
+    touching any state, e.g. when its side file is from another day) are
+    fed every row instead. A view with a state_file is restored from that
+    side file rather than from its published JSON.
+    """
+    diff = diff_reminders(previous_rows, rows)
+    if diff is None or diff_size(diff) > MAX_PATCH_RATIO * max(len(rows), 1):
+        return None
+
+    positions = {row['id']: i for i, row in enumerate(rows)}
+    rebuild = []
+    for name, view in views.items():
+        try:
+            with open(data_dir / (getattr(view, 'state_file', None) or name), 'r', encoding='utf-8') as f:
+                previous_output = expand_strings(json.load(f))
+        except (OSError, ValueError):
+            return None
+        if not patch_view(view, previous_output, diff, positions):
+            rebuild.append(name)
+
+    if len(rebuild) == len(views):
+        return None
+    for name in rebuild:
+        add = views[name].add
+        for row in rows:
+            add(row)
+    return diff
+
+def build_all_views(source_csv, data_dir, cache_dir=None, incremental=True, cache=None,
+                    backlog_page_size=0, calendar=False, pretty=False, string_table=False,
+                    metrics=None, metrics_file=METRICS_FILE, prometheus_file=None, workers=1,
+                    streaming=False, backlog_limit=None, spill_budget=DEFAULT_SPILL_BUDGET,
+                    generations=True, keep_generations=KEEP_GENERATIONS, today=None, next_day=True):
+    """Build every view from one pass over the Nova Scheduling CSV
+
+    With a cache_dir, parsed rows come from the snapshot cache and an
+    unchanged export is never re-parsed. If the previous export is still
+    cached, the existing JSON files are patched from the row diff instead
+    of being rebuilt (incremental=False forces a full rebuild). Long-lived
+    callers pass their own SnapshotCache to keep parsed rows warm.
+    A backlog_page_size > 0 also writes the paginated backlog shards;
+    calendar=True writes data_dir/calendar/YYYY-MM.json month shards.
+    pretty/string_table select the view_writer output format.
+    Timings and counters go to data_dir/metrics_file (None to skip) and,
+    optionally, a Prometheus text file.
+    Without a cache, workers > 1 parses and classifies in a process pool.
+    streaming=True reads the CSV directly (no cache, patching or workers)
+    and keeps memory flat: backlog and week items spill to disk past
+    spill_budget per collection, and a backlog_limit keeps only the top N
+    of each backlog category.
+    With generations=True the run is staged and published as one atomic
+    generation (data_dir/current); generations=False writes in place.
+    today defaults to clock.today(); next_day=True also writes tomorrow's
+    daily and week views to data_dir/next/.
+    """
+
+    today = today or clock.today()
+    views = new_views(today, next_day)
+    data_dir = Path(data_dir)
+    metrics = metrics or Metrics('views')
+    publisher = ViewPublisher(data_dir, keep_generations) if generations else None
+    staging = None
+    ok = False
+
+    print(f"📁 Source CSV file: {source_csv}")
+    print(f"🗓️ Building views for: {today}")
+
+    try:
+        data_dir.mkdir(parents=True, exist_ok=True)
+        state = {}
+        diff = None
+
+        # Previous views are read from the published generation; this run's
+        # go to a staging directory that readers never see half-written
+        previous_dir = out_dir = data_dir
+        if publisher is not None:
+            previous_dir = publisher.current() or data_dir
+            reuse = [SHARD_DIR] * (backlog_page_size > 0) + [CALENDAR_DIR] * calendar
+            staging = out_dir = publisher.stage(reuse)
+
+        if streaming:
+            if backlog_page_size > 0:
+                raise ValueError("backlog pages need the in-memory backlog; drop streaming or page size")
+            views = new_streaming_views(today, backlog_limit, spill_budget, next_day)
+            cache = cache_dir = None
+            workers = 1
+
+        if cache is None and cache_dir:
+            cache = SnapshotCache(cache_dir)
+
+        if cache is not None:
+            hits = cache.hits
+            with metrics.span('read_parse'):
+                rows = cache.load_rows(source_csv)
+            state['source_sha256'] = cache.last_digest
+            cache_hit = cache.hits > hits
+            metrics.label('snapshot_cache', 'hit' if cache_hit else 'miss')
+            print(f"💾 Snapshot cache {'hit' if cache_hit else 'miss'}: {len(rows)} rows")
+
+            previous_digest = read_state(previous_dir).get('source_sha256')
+            previous_rows = cache.rows_for_digest(previous_digest) if incremental and previous_digest else None
+            if previous_rows is not None:
+                with metrics.span('diff_patch'):
+                    diff = patch_views(views, previous_dir, previous_rows, rows)
+                if diff is None:
+                    views = new_views(today, next_day)
+
+            if diff is None:
+                with metrics.span('classify'):
+                    tally_rows(rows, metrics, [view.add for view in views.values()])
+            else:
+                tally_rows(rows, metrics)
+        elif workers > 1:
+            with metrics.span('read_parse_classify'):
+                views, counters = build_views_parallel(source_csv, partial(new_views, today, next_day),
+                                                       workers, tally=tally_rows)
+            for name, value in counters.items():
+                metrics.count(name, value)
+            metrics.label('workers', str(workers))
+        else:
+            # Reading, parsing and classifying are interleaved when streaming
+            with metrics.span('read_parse_classify'):
+                tally_rows(read_reminders(source_csv), metrics, [view.add for view in views.values()])
+
+        metrics.label('mode', 'full' if diff is None else 'patch')
+        if diff is not None:
+            metrics.count('rows_added', len(diff['added']))
+            metrics.count('rows_removed', len(diff['removed']))
+            metrics.count('rows_changed', len(diff['changed']))
+            print(f"🩹 Patched views: {len(diff['added'])} added, "
+                  f"{len(diff['removed'])} removed, {len(diff['changed'])} changed")
+
+        if next_day:
+            (out_dir / NEXT_DAY_DIR).mkdir(exist_ok=True)
+        digests = {}
+        for name, view in views.items():
+            view_key = name[:-len('.json')]
+            with metrics.span(f"sort.{view_key}"):
+                output = view.build()
+            with metrics.span(f"serialize.{view_key}"):
+                digests[name] = write_view(output, out_dir / name, pretty=pretty,
+                                           string_table=string_table, digest=True)
+                patch_state = view.patch_state() if name in VIEW_FILES and getattr(view, 'state_file', None) else None
+                if patch_state is not None:
+                    write_view(patch_state, out_dir / view.state_file)
+            print(view.summary() if name in VIEW_FILES else f"   ↳ {name} for {view.today}")
+            if name == 'backlog.json' and backlog_page_size > 0:
+                with metrics.span('serialize.backlog_pages'):
+                    written, unchanged = write_backlog_shards(output, out_dir, backlog_page_size, pretty=pretty)
+                metrics.count('backlog_pages_written', written)
+                metrics.count('backlog_pages_unchanged', unchanged)
+                print(f"📚 Backlog pages: {written} written, {unchanged} unchanged")
+
+        if calendar:
+            with metrics.span('calendar'):
+                index = DueIndex(rows if cache is not None else read_reminders(source_csv))
+                written, unchanged = write_month_shards(index, out_dir, pretty=pretty)
+            metrics.count('calendar_months_written', written)
+            metrics.count('calendar_months_unchanged', unchanged)
+            print(f"📅 Calendar months: {written} written, {unchanged} unchanged ({len(index)} dated reminders)")
+
+        with metrics.span('publish'):
+            write_state(out_dir, state)
+            bumped = publish_versions(out_dir, diff, digests, previous_dir)
+            metrics.count('views_changed', len(bumped))
+            if staging is not None:
+                generation = publisher.publish(staging)
+                staging = None
+                metrics.label('generation', str(generation))
+                print(f"📦 Published generation {generation}")
+        ok = True
+        return True
+
+    except Exception as e:
+        print(f"❌ Error building views: {e}")
+        return False
+
+    finally:
+        if staging is not None:
+            publisher.discard(staging)
+        metrics.label('status', 'ok' if ok else 'error')
+        try:
+            if metrics_file:
+                metrics.write_json(data_dir / metrics_file)
+            if prometheus_file:
+                metrics.write_prometheus(prometheus_file)
+        except OSError as e:
+            log.warning(f"⚠️ Could not write metrics: {e}")
+
+def build_views_for_dates(source_csv, out_dir, dates, names=None, cache_dir=None,
+                          pretty=False, string_table=False, metrics_file=METRICS_FILE):
+    """Build the views as of each of dates from one pass over the export
+
+    Every row is read and parsed once and fed to each day's views; day
+    D's files go to out_dir/D/. Meant for backfills and tests: files are
+    written in place, with no patching, generations or version counters.
+    names defaults to every view that depends on the date.
+    """
+
+    names = names or DATED_VIEWS
+    out_dir = Path(out_dir)
+    metrics = Metrics('backfill')
+    started = time.perf_counter()
+    ok = False
+
+    print(f"📁 Source CSV file: {source_csv}")
+    print(f"🗓️ Building {len(names)} views for {len(dates)} days: {dates[0]} → {dates[-1]}")
+
+    try:
+        days = {day: {name: VIEW_FILES[name](day) for name in names} for day in dates}
+        adders = [view.add for views in days.values() for view in views.values()]
+        rows = SnapshotCache(cache_dir).load_rows(source_csv) if cache_dir else read_reminders(source_csv)
+        with metrics.span('read_parse_classify'):
+            tally_rows(rows, metrics, adders)
+
+        with metrics.span('serialize'):
+            for day, views in days.items():
+                day_dir = out_dir / day.isoformat()
+                day_dir.mkdir(parents=True, exist_ok=True)
+                for name, view in views.items():
+                    write_view(view.build(), day_dir / name, pretty=pretty, string_table=string_table)
+        metrics.count('days_built', len(dates))
+
+        print(f"✅ {len(dates) * len(names)} views written to {out_dir}/<date>/ "
+              f"in {time.perf_counter() - started:.2f}s")
+        ok = True
+        return True
+
+    except Exception as e:
+        print(f"❌ Error building views: {e}")
+        return False
+
+    finally:
+        metrics.label('status', 'ok' if ok else 'error')
+        try:
+            if metrics_file and out_dir.is_dir():
+                metrics.write_json(out_dir / metrics_file)
+        except OSError as e:
+            log.warning(f"⚠️ Could not write metrics: {e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build all reminder views from one CSV pass")
+    parser.add_argument('source_csv')
+    parser.add_argument('data_dir')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help="parsed snapshot cache (default: %(default)s)")
+    parser.add_argument('--no-cache', action='store_true', help="always parse the CSV")
+    parser.add_argument('--full', action='store_true',
+                        help="rebuild every view instead of patching from the previous export")
+    parser.add_argument('--backlog-page-size', type=int, default=0,
+                        help="also write backlog pages of N items + backlog_manifest.json")
+    parser.add_argument('--calendar', action='store_true',
+                        help="also write calendar/YYYY-MM.json month shards with per-day counts")
+    parser.add_argument('--pretty', action='store_true', help="indented JSON for debugging")
+    parser.add_argument('--string-table', action='store_true',
+                        help="intern repeated item strings into a top-level \"strings\" array")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="with --no-cache, parse in N processes (0 = one per core)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="flat memory: spill backlog/week items to disk (implies --no-cache)")
+    parser.add_argument('--backlog-limit', type=int, default=None,
+                        help="with --streaming, keep only the top N items of each backlog category")
+    parser.add_argument('--spill-budget', type=int, default=DEFAULT_SPILL_BUDGET,
+                        help="with --streaming, items held in memory per collection (default: %(default)s)")
+    parser.add_argument('--in-place', action='store_true',
+                        help="write views straight into data_dir instead of publishing a generation")
+    parser.add_argument('--keep-generations', type=int, default=KEEP_GENERATIONS,
+                        help="published generations kept on disk (default: %(default)s)")
+    parser.add_argument('--no-next-day', action='store_true',
+                        help="skip pre-rendering tomorrow's daily/week views into next/")
+    parser.add_argument('--as-of', type=clock.parse_as_of,
+                        help="build the views of this day instead of today (YYYY-MM-DD, ISO datetime or +N/-N days)")
+    parser.add_argument('--through', type=clock.parse_as_of,
+                        help="build every day from --as-of (default today) through this one into data_dir/<date>/")
+    parser.add_argument('--views', default=','.join(DATED_VIEWS),
+                        help="with --through, the views built for each day (default: %(default)s)")
+    parser.add_argument('--prometheus', help="also write metrics in Prometheus text format here")
+    parser.add_argument('--log-level', default='INFO', choices=('DEBUG', 'INFO', 'WARNING', 'ERROR'),
+                        help="DEBUG adds per-row detail (default: %(default)s)")
+    args = parser.parse_args()
+    if args.streaming and args.backlog_page_size:
+        parser.error("--streaming cannot be combined with --backlog-page-size")
+
+    configure_logging(args.log_level)
+    if args.as_of:
+        clock.set_as_of(args.as_of)
+
+    if args.through:
+        names = [name.strip() for name in args.views.split(',') if name.strip()]
+        unknown = [name for name in names if name not in VIEW_FILES]
+        if unknown:
+            parser.error(f"unknown view(s): {', '.join(unknown)}")
+        dates = clock.date_range(clock.today(), args.through.date())
+        if not 1 <= len(dates) <= MAX_BATCH_DAYS:
+            parser.error(f"--through must be 0-{MAX_BATCH_DAYS - 1} days after --as-of")
+        success = build_views_for_dates(args.source_csv, args.data_dir, dates, names,
+                                        cache_dir=None if args.no_cache else args.cache_dir,
+                                        pretty=args.pretty, string_table=args.string_table)
+        sys.exit(0 if success else 1)
+
+    success = build_all_views(args.source_csv, args.data_dir,
+                              cache_dir=None if args.no_cache else args.cache_dir,
+                              incremental=not args.full,
+                              backlog_page_size=args.backlog_page_size,
+                              calendar=args.calendar,
+                              pretty=args.pretty,
+                              string_table=args.string_table,
+                              prometheus_file=args.prometheus,
+                              workers=args.workers or os.cpu_count() or 1,
+                              streaming=args.streaming,
+                              backlog_limit=args.backlog_limit,
+                              spill_budget=args.spill_budget,
+                              generations=not args.in_place,
+                              keep_generations=args.keep_generations,
+                              next_day=not args.no_next_day)
+    sys.exit(0 if success else 1)
@@ -8,82 +8,127 @@ Responsibility:
 - Undated reminders (no due date)
 - Future reminders NOT scheduled today
 - This is your "Everything else / Database view"
+- Optional sharded output: per-category pages + backlog_manifest.json
+  so the dashboard can paint page 1 before the rest arrives
+- StreamingBacklogView: flat memory via disk-spilling sorts, or only the
+  top N of each category kept in a heap
 """
 
-import csv
-import json
+import hashlib
+import os
 import sys
-from datetime import datetime, date
 from pathlib import Path
 
-def build_backlog_view(source_csv, output_json):
-    """Build backlog from Nova Scheduling CSV"""
-    
-    today = date.today()
-    overdue_items = []
-    undated_items = []
-    future_items = []
-    
-    try:
-        with open(source_csv, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            
-            for row in reader:
-                # Skip completed items
-                if row.get('completed', '').lower() in ['yes', 'true', '1']:
-                    continue
-                    
-                title = row.get('title', 'Untitled').strip()
-                due_str = row.get('due', '').strip()
-                
-                # Create base item
-                item = {
-                    'title': title,
-                    'list': row.get('list', 'Default').strip(),
-                    'flagged': row.get('flagged', '').lower() in ['yes', 'true', '1'],
-                    'priority': int(row.get('priority', 0) or 0),
-                    'id': row.get('id', '').strip()
-                }
-                
-                # Handle undated items
-                if not due_str or 'Error:' in due_str or due_str == 'No':
-                    item['category'] = 'undated'
-                    undated_items.append(item)
-                    continue
-                    
-                try:
-                    due_dt = datetime.strptime(due_str, '%Y-%m-%d %H:%M:%S')
-                    due_date = due_dt.date()
-                    
-                    item['dueISO'] = due_dt.isoformat()
-                    item['due_date'] = due_date.isoformat()
-                    
-                    if due_date < today:
-                        # Overdue
-                        item['category'] = 'overdue'
-                        item['days_overdue'] = (today - due_date).days
-                        overdue_items.append(item)
-                    elif due_date > today:
-                        # Future (not today)
-                        item['category'] = 'future'
-                        item['days_until'] = (due_date - today).days
-                        future_items.append(item)
-                    # Skip today items - they go to daily view
-                        
-                except ValueError:
-                    # Unparseable dates go to undated
-                    item['category'] = 'undated'
-                    undated_items.append(item)
-    
+import clock
+from view_writer import write_view, encode_view
+from nova_csv import read_reminders, DUE_OK
+from external_sort import ExternalSorter, TopN, DEFAULT_SPILL_BUDGET
+
+CATEGORIES = ('overdue', 'undated', 'future')
+SHARD_DIR = 'backlog'
+MANIFEST_FILE = 'backlog_manifest.json'
+
+# Category -> (sort key, reverse)
+SORT_ORDER = {
+    'overdue': (lambda x: x.get('days_overdue', 0), True),   # Most overdue first
+    'undated': (lambda x: x['title'].lower(), False),        # Alphabetical
+    'future': (lambda x: x.get('dueISO', ''), False)         # Cronological
+}
+
+class BacklogView:
+    """Accumulates overdue, undated and future reminders one at a time"""
+
+    def __init__(self, today=None):
+        self.today = today or clock.today()
+        self.today_ordinal = self.today.toordinal()
+        self.overdue_items = []
+        self.undated_items = []
+        self.future_items = []
+
+    def add(self, row):
+        """Feed one normalized reminder into the view"""
+        # Skip completed items
+        if row['completed']:
+            return
+
+        # Create base item
+        item = {
+            'title': row['title'],
+            'list': row['list'],
+            'flagged': row['flagged'],
+            'priority': row['priority'],
+            'id': row['id']
+        }
+
+        # Handle undated items (missing, sentinel and unparseable dates)
+        if row['due_status'] != DUE_OK:
+            item['category'] = 'undated'
+            self.undated_items.append(item)
+            return
+
+        due = row['due']
+        days_from_now = due.days_from(self.today_ordinal)
+
+        item['dueISO'] = due.iso
+        item['due_date'] = due.date_iso
+
+        if days_from_now < 0:
+            # Overdue
+            item['category'] = 'overdue'
+            item['days_overdue'] = -days_from_now
+            self.overdue_items.append(item)
+        elif days_from_now > 0:
+            # Future (not today)
+            item['category'] = 'future'
+            item['days_until'] = days_from_now
+            self.future_items.append(item)
+        # Skip today items - they go to daily view
+
+    def load(self, output):
+        """Restore state from a previous backlog.json; False if it is stale"""
+        if output.get('date') != self.today.isoformat():
+            return False
+        categories = output['categories']
+        self.overdue_items = list(categories['overdue']['items'])
+        self.undated_items = list(categories['undated']['items'])
+        self.future_items = list(categories['future']['items'])
+        return True
+
+    def remove_rows(self, rows):
+        """Undo add() for reminders that left or changed in the export"""
+        ids = {row['id'] for row in rows}
+        self.overdue_items = [item for item in self.overdue_items if item['id'] not in ids]
+        self.undated_items = [item for item in self.undated_items if item['id'] not in ids]
+        self.future_items = [item for item in self.future_items if item['id'] not in ids]
+
+    def reorder(self, positions):
+        """Put items back in export order so ties sort like a full rebuild"""
+        for items in (self.overdue_items, self.undated_items, self.future_items):
+            items.sort(key=lambda x: positions[x['id']])
+
+    def merge(self, other):
+        """Absorb a view built from the rows that follow this one's"""
+        self.overdue_items.extend(other.overdue_items)
+        self.undated_items.extend(other.undated_items)
+        self.future_items.extend(other.future_items)
+
+    def sort_items(self):
         # Sort each category
-        overdue_items.sort(key=lambda x: x.get('days_overdue', 0), reverse=True)  # Most overdue first
-        future_items.sort(key=lambda x: x.get('dueISO', ''))  # Cronological
-        undated_items.sort(key=lambda x: x['title'].lower())  # Alphabetical
-        
-        # Create output structure
-        output = {
+        for category, items in (('overdue', self.overdue_items), ('future', self.future_items),
+                                ('undated', self.undated_items)):
+            key, reverse = SORT_ORDER[category]
+            items.sort(key=key, reverse=reverse)
+
+    def build(self):
+        """Return the backlog.json structure"""
+        overdue_items = self.overdue_items
+        undated_items = self.undated_items
+        future_items = self.future_items
+        self.sort_items()
+
+        return {
             'view': 'backlog',
-            'date': today.isoformat(),
+            'date': self.today.isoformat(),
             'categories': {
                 'overdue': {
                     'count': len(overdue_items),
@@ -99,14 +144,143 @@ def build_backlog_view(source_csv, output_json):
                 }
             },
             'total_count': len(overdue_items) + len(undated_items) + len(future_items),
-            'generated_at': datetime.now().isoformat()
+            'generated_at': clock.now().isoformat()
         }
+
+    def summary(self):
+        return (f"✅ Backlog view: {len(self.overdue_items)} overdue, "
+                f"{len(self.undated_items)} undated, {len(self.future_items)} future")
+
+class StreamingBacklogView(BacklogView):
+    """BacklogView with flat memory
+
+    Each category is an ExternalSorter that spills sorted runs to disk
+    past spill_budget, or with a limit a TopN heap that keeps only the
+    first `limit` items (most overdue, soonest future, A-Z undated).
+    Counts are always the full category sizes. build() returns lazy item
+    iterators for view_writer to stream; without a limit the JSON is
+    identical to BacklogView's.
+    """
+
+    def __init__(self, today=None, limit=None, spill_budget=DEFAULT_SPILL_BUDGET):
+        super().__init__(today)
+        self.limit = limit
+
+        def collection(category):
+            key, reverse = SORT_ORDER[category]
+            if limit:
+                return TopN(limit, key, reverse)
+            return ExternalSorter(key, reverse, spill_budget)
+
+        self.overdue_items = collection('overdue')
+        self.undated_items = collection('undated')
+        self.future_items = collection('future')
+
+    def load(self, output):
+        # Nothing to patch: streaming views are always rebuilt
+        return False
+
+    def build(self):
+        """Return the backlog.json structure with lazily merged items"""
+        categories = {}
+        for category, items in (('overdue', self.overdue_items), ('undated', self.undated_items),
+                                ('future', self.future_items)):
+            categories[category] = {
+                'count': len(items),
+                'items': items.sorted_items()
+            }
+        return {
+            'view': 'backlog',
+            'date': self.today.isoformat(),
+            'categories': categories,
+            'total_count': sum(category['count'] for category in categories.values()),
+            'generated_at': clock.now().isoformat()
+        }
+
+def write_backlog_shards(output, data_dir, page_size=100, pretty=False):
+    """Split a backlog.json structure into pages plus a manifest
+
+    Pages keep today's sort order and carry no timestamp, so a page whose
+    items did not change keeps its hash and is not rewritten.
+    Returns (pages_written, pages_unchanged).
+    """
+    data_dir = Path(data_dir)
+    shard_dir = data_dir / SHARD_DIR
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    written = unchanged = 0
+    live_pages = set()
+
+    manifest = {
+        'view': 'backlog',
+        'date': output['date'],
+        'page_size': page_size,
+        'categories': {},
+        'total_count': output['total_count'],
+        'generated_at': output['generated_at']
+    }
+
+    for category in CATEGORIES:
+        items = output['categories'][category]['items']
+        page_count = (len(items) + page_size - 1) // page_size
+        pages = []
+        for index in range(page_count):
+            page_items = items[index * page_size:(index + 1) * page_size]
+            body = encode_view({
+                'view': 'backlog',
+                'category': category,
+                'page': index + 1,
+                'pages': page_count,
+                'items': page_items
+            }, pretty=pretty)
+            digest = hashlib.sha256(body).hexdigest()
+
+            name = f"{category}-{index + 1:03d}.json"
+            path = shard_dir / name
+            live_pages.add(name)
+            try:
+                same = path.stat().st_size == len(body) and path.read_bytes() == body
+            except OSError:
+                same = False
+            if same:
+                unchanged += 1
+            else:
+                tmp_path = path.with_suffix('.tmp')
+                tmp_path.write_bytes(body)
+                os.replace(tmp_path, path)
+                written += 1
+
+            pages.append({
+                'url': f"data/{SHARD_DIR}/{name}",
+                'count': len(page_items),
+                'sha256': digest
+            })
+
+        manifest['categories'][category] = {
+            'count': len(items),
+            'pages': pages
+        }
+
+    # Drop pages left over from a longer backlog
+    for path in shard_dir.glob('*.json'):
+        if path.name not in live_pages:
+            path.unlink()
+
+    write_view(manifest, data_dir / MANIFEST_FILE, pretty=pretty)
+    return written, unchanged
+
+def build_backlog_view(source_csv, output_json):
+    """Build backlog from Nova Scheduling CSV"""
+    
+    view = BacklogView()
+    
+    try:
+        for row in read_reminders(source_csv):
+            view.add(row)
         
         # Write output
-        with open(output_json, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        write_view(view.build(), output_json)
             
-        print(f"✅ Backlog view: {len(overdue_items)} overdue, {len(undated_items)} undated, {len(future_items)} future")
+        print(view.summary())
         return True
         
     except Exception as e:
@@ -11,103 +11,142 @@ Responsibility:
 - EXACT match with Apple Calendar "Today"
 """
 
-import csv
-import json
+import logging
 import sys
-from datetime import datetime, date, timedelta
 from pathlib import Path
 
+import clock
+from view_writer import write_view
+from nova_csv import read_reminders, DUE_MISSING, DUE_OK
+from pipeline_metrics import log, configure_logging
+
+class DailyView:
+    """Accumulates today's (and yesterday's) agenda one reminder at a time"""
+
+    def __init__(self, today=None):
+        self.today = today or clock.today()
+        self.today_ordinal = self.today.toordinal()
+        self.today_items = []
+        self.total_processed = 0
+        self.valid_dates = 0
+        self.error_dates = 0
+        # Per-row detail is DEBUG; checked once so it costs nothing when off
+        self.debug = log.isEnabledFor(logging.DEBUG)
+
+    def add(self, row):
+        """Feed one normalized reminder into the view"""
+        self.total_processed += 1
+
+        # Completed items are kept: the daily card shows what was due today
+        if row['due_status'] == DUE_MISSING:
+            return
+        if row['due_status'] != DUE_OK:
+            self.error_dates += 1
+            return
+
+        due = row['due']
+        self.valid_dates += 1
+
+        # Debug: Show a few sample dates
+        if self.debug and self.valid_dates <= 3:
+            log.debug("   Sample item: '%s' due %s", row['title'], due.date_iso)
+
+        # Keep if due is today OR yesterday
+        days_from_now = due.days_from(self.today_ordinal)
+        if days_from_now not in (0, -1):
+            return
+
+        if self.debug:
+            day_label = "today" if days_from_now == 0 else "yesterday"
+            log.debug("   ✅ Found %s item: '%s' at %s", day_label, row['title'], due.time)
+        self.today_items.append({
+            'title': row['title'],
+            'dueISO': due.iso,
+            'time': due.time,
+            'list': row['list'],
+            'flagged': False,  # CSV doesn't have flagged field
+            'priority': 0,     # CSV doesn't have priority field
+            'id': row['id']
+        })
+
+    def load(self, output):
+        """Restore state from a previous daily.json; False if it is stale"""
+        if output.get('date') != self.today.isoformat():
+            return False
+        self.today_items = list(output['items'])
+        self.total_processed = output['stats']['total_processed']
+        self.valid_dates = output['stats']['valid_dates']
+        self.error_dates = output['stats']['error_dates']
+        return True
+
+    def remove_rows(self, rows):
+        """Undo add() for reminders that left or changed in the export"""
+        for row in rows:
+            self.total_processed -= 1
+            if row['due_status'] == DUE_OK:
+                self.valid_dates -= 1
+            elif row['due_status'] != DUE_MISSING:
+                self.error_dates -= 1
+        ids = {row['id'] for row in rows}
+        self.today_items = [item for item in self.today_items if item['id'] not in ids]
+
+    def reorder(self, positions):
+        """Put items back in export order so ties sort like a full rebuild"""
+        self.today_items.sort(key=lambda x: positions[x['id']])
+
+    def merge(self, other):
+        """Absorb a view built from the rows that follow this one's"""
+        self.today_items.extend(other.today_items)
+        self.total_processed += other.total_processed
+        self.valid_dates += other.valid_dates
+        self.error_dates += other.error_dates
+
+    def sort_items(self):
+        # Sort by time
+        self.today_items.sort(key=lambda x: x['dueISO'])
+
+    def build(self):
+        """Return the daily.json structure"""
+        self.sort_items()
+
+        log.info("\n📊 Processing Summary:")
+        log.info("   Total rows: %d", self.total_processed)
+        log.info("   Valid dates: %d", self.valid_dates)
+        log.info("   Error dates: %d", self.error_dates)
+        log.info("   Items due today/yesterday: %d", len(self.today_items))
+
+        return {
+            'view': 'daily',
+            'date': self.today.isoformat(),
+            'count': len(self.today_items),
+            'items': self.today_items,
+            'stats': {
+                'total_processed': self.total_processed,
+                'valid_dates': self.valid_dates,
+                'error_dates': self.error_dates
+            },
+            'generated_at': clock.now().isoformat()
+        }
+
+    def summary(self):
+        return f"✅ Daily view: {len(self.today_items)} items for today + yesterday"
+
 def build_daily_view(source_csv, output_json):
     """Build today's agenda from Nova Scheduling CSV"""
     
-    today = date.today()
-    today_items = []
-    total_processed = 0
-    valid_dates = 0
-    error_dates = 0
+    view = DailyView()
     
     print(f"📁 Source CSV file: {source_csv}")
-    print(f"🗓️ Looking for items due today: {today}")
+    print(f"🗓️ Looking for items due today: {view.today}")
     
     try:
-        with open(source_csv, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            
-            for row in reader:
-                total_processed += 1
-                
-                # Skip completed items (CSV doesn't have completed field, so this won't match)
-                # if row.get('completed', '').lower() in ['yes', 'true', '1']:
-                #     continue
-                    
-                # Parse due date
-                due_str = row.get('due', '').strip()
-                if not due_str:
-                    continue
-                    
-                if 'Error:' in due_str or due_str == 'No':
-                    error_dates += 1
-                    continue
-                    
-                try:
-                    due_dt = datetime.strptime(due_str, '%Y-%m-%d %H:%M:%S')
-                    due_date = due_dt.date()
-                    valid_dates += 1
-                    
-                    # Debug: Show a few sample dates
-                    if valid_dates <= 3:
-                        print(f"   Sample item: '{row.get('title', '')}' due {due_date}")
-                    
-                    # Keep if due is today OR yesterday
-                    yesterday = today - timedelta(days=1)
-                    if due_date not in (today, yesterday):
-                        continue
-                    
-                    day_label = "today" if due_date == today else "yesterday"
-                    print(f"   ✅ Found {day_label} item: '{row.get('title', '')}' at {due_dt.strftime('%H:%M')}")
-                    item = {
-                        'title': row.get('title', 'Untitled').strip(),
-                        'dueISO': due_dt.isoformat(),
-                        'time': due_dt.strftime('%H:%M'),
-                        'list': row.get('list', 'Default').strip(),
-                        'flagged': False,  # CSV doesn't have flagged field
-                        'priority': 0,     # CSV doesn't have priority field
-                        'id': row.get('id', '').strip()
-                    }
-                    today_items.append(item)
-                        
-                except ValueError as e:
-                    error_dates += 1
-                    continue
-    
-        # Sort by time
-        today_items.sort(key=lambda x: x['dueISO'])
-        
-        print(f"\n📊 Processing Summary:")
-        print(f"   Total rows: {total_processed}")
-        print(f"   Valid dates: {valid_dates}")
-        print(f"   Error dates: {error_dates}")
-        print(f"   Items due today/yesterday: {len(today_items)}")
-        
-        # Create output structure
-        output = {
-            'view': 'daily',
-            'date': today.isoformat(),
-            'count': len(today_items),
-            'items': today_items,
-            'stats': {
-                'total_processed': total_processed,
-                'valid_dates': valid_dates,
-                'error_dates': error_dates
-            },
-            'generated_at': datetime.now().isoformat()
-        }
+        for row in read_reminders(source_csv):
+            view.add(row)
         
         # Write output
-        with open(output_json, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        write_view(view.build(), output_json)
             
-        print(f"✅ Daily view: {len(today_items)} items for today + yesterday")
+        print(view.summary())
         return True
         
     except Exception as e:
@@ -119,6 +158,7 @@ if __name__ == "__main__":
         print("Usage: python3 build_daily_view.py <source_csv> <output_json>")
         sys.exit(1)
         
+    configure_logging('INFO')
     source_csv = sys.argv[1]
     output_json = sys.argv[2]
     
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+build_next_actions_view.py
+Creates next_actions.json: the next task of every project for the Smart Planner card.
+
+Responsibility:
+- Graph of projects -> phases -> tasks over the open project reminders,
+  grouped like projects.json ("Project — Name" or the list name)
+- Only numbered phases ("Phase 2", "Stage 3", "2") are ordered, by their
+  number: a phase's tasks wait on every open task of the numbered phase
+  before it, through one gate node per phase so the edges stay linear.
+  Named phases ("Design", "Build 2") stay unordered unless
+  task_dependencies.json says otherwise
+- Optional explicit dependencies from task_dependencies.json, by reminder
+  id or exact title; finished or unknown dependencies count as done
+- One topological pass gives the ready set, tasks blocked (with what
+  blocks them), dependency cycles and each task's longest remaining chain
+- Next action per project: overdue first, then the longest chain (the
+  critical path), then priority, due date and export order
+- A view accumulator like the others: the task table is kept in a side
+  file beside the views (state_file), so build_all_views patches it from
+  the row diff while next_actions.json holds only the schedule
+
+Dependencies file:
+  {"dependencies": {"<id or title>": ["<id or title it waits on>", ...]}}
+"""
+
+import heapq
+import json
+import re
+import sys
+from collections import deque
+from pathlib import Path
+
+import clock
+from view_writer import write_view
+from nova_csv import read_reminders, DUE_OK
+from project_rules import DEFAULT_RULES
+from build_top3_view import priority_level
+
+DEFAULT_DEPENDENCIES_FILE = Path(__file__).resolve().parent / 'task_dependencies.json'
+
+# Ready items and critical-path steps listed per project
+MAX_LISTED = 10
+
+# Blockers listed per blocked task
+MAX_BLOCKERS = 5
+
+_DIGITS = re.compile(r'(\d+)')
+
+# "Phase 2", "Stage 3: Build", "Step #4", "2" -> 2; anything else has no order
+_ORDINAL = re.compile(r'(?:phase|stage|step)?\s*#?(\d+)(?![\w.])', re.IGNORECASE)
+
+def load_dependencies(path=DEFAULT_DEPENDENCIES_FILE):
+    """{id or title: [ids or titles]}; no file means no explicit dependencies"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('dependencies', {})
+    except FileNotFoundError:
+        return {}
+
+def natural_key(text):
+    """'Phase 2' sorts before 'Phase 10'"""
+    return [int(part) if part.isdigit() else part.lower() for part in _DIGITS.split(text)]
+
+def phase_ordinal(name):
+    """The number of a numbered phase, None for a named one"""
+    match = _ORDINAL.match(name.strip())
+    return int(match.group(1)) if match else None
+
+class TaskGraph:
+    """Projects, phase gates and dependencies over a list of tasks
+
+    Nodes 0..n-1 are the tasks, the rest phase gates. solve() runs one
+    topological pass (Kahn) and fills in ready, blocked, cycle and chain.
+    """
+
+    def __init__(self, tasks, dependencies=None):
+        self.tasks = tasks
+        self.preds = [[] for _ in tasks]
+        self.projects = {}       # project name -> [task index] (export order)
+        self.phases = {}         # project name -> [(phase, [task index])] (numbered first, in order)
+        self.gates = 0
+        self.explicit_edges = 0
+
+        phase_members = {}
+        for num, task in enumerate(tasks):
+            project = task['project']
+            self.projects.setdefault(project, []).append(num)
+            if task['phase']:
+                phase_members.setdefault(project, {}).setdefault(task['phase'], []).append(num)
+
+        # Numbered phase k's tasks -> gate -> every task of the numbered phase before it
+        for project, members in phase_members.items():
+            steps = {}
+            named = []
+            for phase, nums in members.items():
+                ordinal = phase_ordinal(phase)
+                if ordinal is None:
+                    named.append((phase, nums))
+                else:
+                    steps.setdefault(ordinal, []).append((phase, nums))
+            ordered = [steps[ordinal] for ordinal in sorted(steps)]
+            self.phases[project] = ([entry for step in ordered for entry in step]
+                                    + sorted(named, key=lambda entry: natural_key(entry[0])))
+            for previous, current in zip(ordered, ordered[1:]):
+                gate = len(self.preds)
+                self.preds.append([num for _, nums in previous for num in nums])
+                self.gates += 1
+                for _, nums in current:
+                    for num in nums:
+                        self.preds[num].append(gate)
+
+        if dependencies:
+            by_id = {task['id']: num for num, task in enumerate(tasks)}
+            by_title = {}
+            for num, task in enumerate(tasks):
+                by_title.setdefault(task['title'], []).append(num)
+
+            def resolve(ref):
+                num = by_id.get(ref)
+                return [num] if num is not None else by_title.get(ref, [])
+
+            for ref, waits_on in dependencies.items():
+                blockers = {num for other in waits_on for num in resolve(other)}
+                for num in resolve(ref):
+                    found = blockers - {num}
+                    self.preds[num].extend(found)
+                    self.explicit_edges += len(found)
+
+        self.ready = []          # task indexes with nothing open before them
+        self.cycle = []          # task indexes in, or behind, a dependency cycle
+        self.chain = []          # node -> tasks on its longest remaining chain, itself included
+        self.succ = []
+
+    def solve(self):
+        node_count = len(self.preds)
+        task_count = len(self.tasks)
+        succ = [[] for _ in range(node_count)]
+        indegree = [0] * node_count
+        for node, preds in enumerate(self.preds):
+            indegree[node] = len(preds)
+            for pred in preds:
+                succ[pred].append(node)
+
+        queue = deque(node for node in range(node_count) if indegree[node] == 0)
+        self.ready = [node for node in queue if node < task_count]
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for nxt in succ[node]:
+                indegree[nxt] -= 1
+                if indegree[nxt] == 0:
+                    queue.append(nxt)
+
+        chain = [0] * node_count
+        for node in reversed(order):
+            longest = max((chain[nxt] for nxt in succ[node]), default=0)
+            chain[node] = longest + (node < task_count)
+        self.cycle = [node for node in range(task_count) if indegree[node] > 0]
+        self.chain = chain
+        self.succ = succ
+        return self
+
+    def blockers(self, num):
+        """Open tasks a task waits on directly (through a gate: the previous phase's)"""
+        found = []
+        for pred in self.preds[num]:
+            found.extend([pred] if pred < len(self.tasks) else self.preds[pred])
+        return found
+
+    def path_from(self, node):
+        """Tasks along the longest chain starting at node"""
+        path = []
+        task_count = len(self.tasks)
+        while node is not None:
+            if node < task_count:
+                path.append(node)
+            # Nodes in a cycle were never ordered and keep chain 0
+            node = max((nxt for nxt in self.succ[node] if self.chain[nxt] > 0),
+                       key=self.chain.__getitem__, default=None)
+        return path
+
+class NextActionView:
+    """Accumulates open project tasks one at a time and schedules them in build()"""
+
+    # Written by build_all_views next to the views, read back by load()
+    state_file = '.next_actions_tasks.json'
+
+    def __init__(self, today=None, rules=DEFAULT_RULES, dependencies=None):
+        self.today = today or clock.today()
+        self.today_ordinal = self.today.toordinal()
+        self.rules = rules
+        self.dependencies = load_dependencies() if dependencies is None else dependencies
+        self.tasks = []
+        self.ready_count = 0
+        self.project_count = 0
+
+    def add(self, row):
+        """Feed one normalized reminder into the view"""
+        if row['completed']:
+            return
+        info = self.rules.classify(row['title'], row['list'])
+        if info is None:
+            return
+
+        task = {
+            'title': row['title'],
+            'list': row['list'],
+            'project': info['project_name'] or row['list'],
+            'phase': info['phase'],
+            'priority': row['priority'],
+            'flagged': row['flagged'],
+            'id': row['id'],
+            'overdue': False
+        }
+        if row['due_status'] == DUE_OK:
+            task['dueISO'] = row['due'].iso
+            task['overdue'] = row['due'].ordinal < self.today_ordinal
+        self.tasks.append(task)
+
+    def load(self, output):
+        """Restore tasks from a previous patch_state(); False if it is stale"""
+        if output.get('date') != self.today.isoformat():
+            return False
+        self.tasks = []
+        for title, list_name, project, phase, priority, flagged, reminder_id, due_iso, overdue in output['tasks']:
+            task = {'title': title, 'list': list_name, 'project': project, 'phase': phase,
+                    'priority': priority, 'flagged': flagged, 'id': reminder_id, 'overdue': overdue}
+            if due_iso:
+                task['dueISO'] = due_iso
+            self.tasks.append(task)
+        return True
+
+    def remove_rows(self, rows):
+        """Undo add() for reminders that left or changed in the export"""
+        ids = {row['id'] for row in rows}
+        self.tasks = [task for task in self.tasks if task['id'] not in ids]
+
+    def reorder(self, positions):
+        """Put tasks back in export order so ties pick like a full rebuild"""
+        self.tasks.sort(key=lambda task: positions[task['id']])
+
+    def merge(self, other):
+        """Absorb a view built from the rows that follow this one's"""
+        self.tasks.extend(other.tasks)
+
+    def _item(self, graph, num, reason=None):
+        task = self.tasks[num]
+        item = {'title': task['title'], 'id': task['id'], 'list': task['list']}
+        if task['phase']:
+            item['phase'] = task['phase']
+        if 'dueISO' in task:
+            item['dueISO'] = task['dueISO']
+        item['priority'] = task['priority']
+        item['flagged'] = task['flagged']
+        item['chain'] = graph.chain[num]
+        if reason:
+            item['reason'] = reason
+        return item
+
+    def build(self):
+        """Return the next_actions.json structure"""
+        tasks = self.tasks
+        graph = TaskGraph(tasks, self.dependencies).solve()
+        chain = graph.chain
+
+        def urgency(num):
+            task = tasks[num]
+            return (not task['overdue'], -chain[num], -priority_level(task['priority']),
+                    task.get('dueISO', '~'), num)
+
+        ready_by_project = {}
+        for num in graph.ready:
+            ready_by_project.setdefault(tasks[num]['project'], []).append(num)
+        in_cycle = set(graph.cycle)
+
+        projects = []
+        for name, members in graph.projects.items():
+            ready_nums = ready_by_project.get(name, [])
+            # Only the listed few are ranked: O(n log k) per project
+            ready = heapq.nsmallest(MAX_LISTED, ready_nums, key=urgency)
+            entry = {
+                'name': name,
+                'open': len(members),
+                'ready': len(ready_nums),
+                'blocked': len(members) - len(ready_nums),
+                'next': None,
+                'path': [],
+                'critical_path': [],
+                'phases': [{'name': phase, 'open': len(nums)} for phase, nums in graph.phases.get(name, [])]
+            }
+            if ready:
+                first = ready[0]
+                if tasks[first]['overdue']:
+                    reason = 'overdue'
+                elif chain[first] > 1:
+                    reason = f"unblocks {chain[first] - 1} more"
+                else:
+                    reason = 'ready'
+                entry['next'] = self._item(graph, first, reason)
+                entry['path'] = [{'title': tasks[num]['title'], 'id': tasks[num]['id']}
+                                 for num in graph.path_from(first)[:MAX_LISTED]]
+                head = max(ready_nums, key=chain.__getitem__)
+                entry['critical_path'] = [{'title': tasks[num]['title'], 'id': tasks[num]['id']}
+                                          for num in graph.path_from(head)[:MAX_LISTED]]
+                entry['critical_length'] = chain[head]
+                entry['ready_items'] = [self._item(graph, num) for num in ready]
+            blocked = [num for num in members if num in in_cycle][:MAX_LISTED]
+            if blocked:
+                entry['cycle'] = [{'title': tasks[num]['title'], 'id': tasks[num]['id'],
+                                   'waits_on': [tasks[other]['id'] for other in graph.blockers(num)[:MAX_BLOCKERS]]}
+                                  for num in blocked]
+            projects.append((urgency(ready[0]) if ready else (True, 1, 0, '~', len(tasks)), entry))
+
+        # Projects with the most urgent next action first; fully blocked ones last
+        projects.sort(key=lambda pair: pair[0])
+        self.ready_count = len(graph.ready)
+        self.project_count = len(projects)
+
+        return {
+            'view': 'next_actions',
+            'date': self.today.isoformat(),
+            'count': len(projects),
+            'projects': [entry for _, entry in projects],
+            'total_tasks': len(tasks),
+            'ready_tasks': len(graph.ready),
+            'blocked_tasks': len(tasks) - len(graph.ready),
+            'cycle_tasks': len(graph.cycle),
+            'phase_gates': graph.gates,
+            'explicit_dependencies': graph.explicit_edges,
+            'generated_at': clock.now().isoformat()
+        }
+
+    def patch_state(self):
+        """Every open project task, so the next build can be patched"""
+        return {
+            'date': self.today.isoformat(),
+            'tasks': [[task['title'], task['list'], task['project'], task['phase'], task['priority'],
+                       task['flagged'], task['id'], task.get('dueISO', ''), task['overdue']]
+                      for task in self.tasks]
+        }
+
+    def summary(self):
+        return (f"✅ Next actions: {self.project_count} projects, "
+                f"{self.ready_count} of {len(self.tasks)} tasks ready")
+
+def build_next_actions_view(source_csv, output_json):
+    """Build next_actions.json from Nova Scheduling CSV"""
+
+    view = NextActionView()
+
+    try:
+        for row in read_reminders(source_csv):
+            view.add(row)
+
+        # Write output
+        write_view(view.build(), output_json)
+
+        print(view.summary())
+        return True
+
+    except Exception as e:
+        print(f"❌ Error building next actions view: {e}")
+        return False
+
+def check_phase_gates():
+    """Numbered phases are chained in order; named ones never are. Returns a list of problems"""
+    def task(num, phase):
+        return {'title': f"t{num}", 'id': f"t{num}", 'project': 'P', 'phase': phase}
+
+    problems = []
+    named = [task(0, 'Design'), task(1, 'Build'), task(2, 'Launch'), task(3, 'Build 2'), task(4, 'Research 1')]
+    graph = TaskGraph(named).solve()
+    if graph.gates or len(graph.ready) != len(named):
+        problems.append(f"named phases made {graph.gates} gates and blocked {len(named) - len(graph.ready)} tasks")
+
+    numbered = [task(0, 'Phase 10'), task(1, 'Phase 2'), task(2, 'phase 2'), task(3, 'Phase 1'), task(4, 'Design')]
+    graph = TaskGraph(numbered).solve()
+    if graph.gates != 2 or sorted(graph.ready) != [3, 4] or graph.chain[3] != 3:
+        problems.append(f"numbered phases: {graph.gates} gates, ready {sorted(graph.ready)}, chain {graph.chain[3]}")
+    return problems
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['--check']:
+        problems = check_phase_gates()
+        for problem in problems:
+            print(f"❌ {problem}")
+        if not problems:
+            print("✅ Phase gates: only numbered phases are ordered")
+        sys.exit(1 if problems else 0)
+
+    if len(sys.argv) != 3:
+        print("Usage: python3 build_next_actions_view.py <source_csv> <output_json>")
+        print("       python3 build_next_actions_view.py --check")
+        sys.exit(1)
+
+    source_csv = sys.argv[1]
+    output_json = sys.argv[2]
+
+    success = build_next_actions_view(source_csv, output_json)
+    sys.exit(0 if success else 1)
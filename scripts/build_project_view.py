@@ -7,127 +7,98 @@ Responsibility:
 - Project tasks
 - Roadmap phases  
 - Anything tagged "project" in Nova Scheduling
-- Future AI logic can pick which task is next
+- Which task is next per project: build_next_actions_view.py
+- Project keywords and "Project — Name" / "Phase: Name" patterns live in
+  project_rules.json (compiled by project_rules.py)
 """
 
-import csv
-import json
 import sys
-import re
-from datetime import datetime, date
 from pathlib import Path
 
-def is_project_item(title, list_name):
+import clock
+from view_writer import write_view
+from nova_csv import read_reminders, DUE_OK
+from project_rules import DEFAULT_RULES
+
+def is_project_item(title, list_name, rules=DEFAULT_RULES):
     """Determine if an item is project-related"""
-    title_lower = title.lower()
-    list_lower = list_name.lower()
-    
-    # Check for project keywords
-    project_keywords = ['project', 'phase', 'milestone', 'roadmap', 'epic', 'feature']
-    
-    # Check title for project indicators
-    if any(keyword in title_lower for keyword in project_keywords):
-        return True
-        
-    # Check for project-style formatting (Project — Name, Phase: Name)
-    if re.match(r'^project\s*[—-]\s*', title_lower):
-        return True
-    if re.match(r'^phase\s*:\s*', title_lower):
-        return True
-        
-    # Check list names that indicate projects
-    if 'project' in list_lower or 'roadmap' in list_lower:
-        return True
-        
-    return False
+    return rules.is_project_item(title, list_name)
 
-def extract_project_info(title):
+def extract_project_info(title, rules=DEFAULT_RULES):
     """Extract project and phase info from title"""
-    # Match "Project — Name" format
-    project_match = re.match(r'^project\s*[—-]\s*(.+)', title.strip(), re.IGNORECASE)
-    if project_match:
-        return {
-            'type': 'project',
-            'project_name': project_match.group(1).strip(),
-            'phase': None
-        }
-    
-    # Match "Phase: Description" format  
-    phase_match = re.match(r'^phase\s*:\s*(.+)', title.strip(), re.IGNORECASE)
-    if phase_match:
-        return {
-            'type': 'phase',
-            'project_name': None,
-            'phase': phase_match.group(1).strip()
+    return rules.extract(title)
+
+class ProjectView:
+    """Accumulates project-related reminders one at a time"""
+
+    def __init__(self, today=None, rules=DEFAULT_RULES):
+        self.today = today or clock.today()
+        self.today_ordinal = self.today.toordinal()
+        self.rules = rules
+        self.project_items = []
+        self.total_projects = 0
+
+    def add(self, row):
+        """Feed one normalized reminder into the view"""
+        # Skip completed items
+        if row['completed']:
+            return
+
+        title = row['title']
+        list_name = row['list']
+
+        # Only include project-related items, with their project structure
+        project_info = self.rules.classify(title, list_name)
+        if project_info is None:
+            return
+
+        item = {
+            'title': title,
+            'type': project_info['type'],
+            'project_name': project_info['project_name'],
+            'phase': project_info['phase'],
+            'list': list_name,
+            'flagged': row['flagged'],
+            'priority': row['priority'],
+            'id': row['id']
         }
-    
-    # Default to task
-    return {
-        'type': 'task',
-        'project_name': None,
-        'phase': None
-    }
 
-def build_project_view(source_csv, output_json):
-    """Build projects view from Nova Scheduling CSV"""
-    
-    today = date.today()
-    project_items = []
-    
-    try:
-        with open(source_csv, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            
-            for row in reader:
-                # Skip completed items
-                if row.get('completed', '').lower() in ['yes', 'true', '1']:
-                    continue
-                    
-                title = row.get('title', 'Untitled').strip()
-                list_name = row.get('list', 'Default').strip()
-                
-                # Only include project-related items
-                if not is_project_item(title, list_name):
-                    continue
-                
-                # Parse due date if exists
-                due_str = row.get('due', '').strip()
-                due_dt = None
-                due_date = None
-                
-                if due_str and 'Error:' not in due_str and due_str != 'No':
-                    try:
-                        due_dt = datetime.strptime(due_str, '%Y-%m-%d %H:%M:%S')
-                        due_date = due_dt.date()
-                    except ValueError:
-                        pass
-                
-                # Extract project structure
-                project_info = extract_project_info(title)
-                
-                item = {
-                    'title': title,
-                    'type': project_info['type'],
-                    'project_name': project_info['project_name'],
-                    'phase': project_info['phase'],
-                    'list': list_name,
-                    'flagged': row.get('flagged', '').lower() in ['yes', 'true', '1'],
-                    'priority': int(row.get('priority', 0) or 0),
-                    'id': row.get('id', '').strip()
-                }
-                
-                if due_dt:
-                    item['dueISO'] = due_dt.isoformat()
-                    item['due_date'] = due_date.isoformat()
-                    item['status'] = 'overdue' if due_date < today else 'scheduled'
-                else:
-                    item['status'] = 'backlog'
-                
-                project_items.append(item)
-    
+        if row['due_status'] == DUE_OK:
+            due = row['due']
+            item['dueISO'] = due.iso
+            item['due_date'] = due.date_iso
+            item['status'] = 'overdue' if due.ordinal < self.today_ordinal else 'scheduled'
+        else:
+            item['status'] = 'backlog'
+
+        self.project_items.append(item)
+
+    def load(self, output):
+        """Restore state from a previous projects.json; False if it is stale"""
+        if output.get('date') != self.today.isoformat():
+            return False
+        self.project_items = [item for project in output['projects'] for item in project['items']]
+        return True
+
+    def remove_rows(self, rows):
+        """Undo add() for reminders that left or changed in the export"""
+        ids = {row['id'] for row in rows}
+        self.project_items = [item for item in self.project_items if item['id'] not in ids]
+
+    def reorder(self, positions):
+        """Put items back in export order so ties sort like a full rebuild"""
+        self.project_items.sort(key=lambda x: positions[x['id']])
+
+    def merge(self, other):
+        """Absorb a view built from the rows that follow this one's"""
+        self.project_items.extend(other.project_items)
+
+    def build(self):
+        """Return the projects.json structure"""
+        project_items = self.project_items
+
         # Group by project name or list
         projects = {}
-        standalone_items = []
         
         for item in project_items:
             project_key = item['project_name'] or item['list']
@@ -163,22 +134,33 @@ def build_project_view(source_csv, output_json):
         
         # Sort projects by total priority
         sorted_projects.sort(key=lambda x: sum(item['priority'] for item in x['items']), reverse=True)
+        self.total_projects = len(sorted_projects)
         
-        # Create output structure
-        output = {
+        return {
             'view': 'projects',
-            'date': today.isoformat(),
+            'date': self.today.isoformat(),
             'projects': sorted_projects,
             'total_projects': len(sorted_projects),
             'total_items': len(project_items),
-            'generated_at': datetime.now().isoformat()
+            'generated_at': clock.now().isoformat()
         }
+
+    def summary(self):
+        return f"✅ Projects view: {self.total_projects} projects, {len(self.project_items)} total items"
+
+def build_project_view(source_csv, output_json):
+    """Build projects view from Nova Scheduling CSV"""
+    
+    view = ProjectView()
+    
+    try:
+        for row in read_reminders(source_csv):
+            view.add(row)
         
         # Write output
-        with open(output_json, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        write_view(view.build(), output_json)
             
-        print(f"✅ Projects view: {len(sorted_projects)} projects, {len(project_items)} total items")
+        print(view.summary())
         return True
         
     except Exception as e:
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+build_top3_view.py
+Creates top3.json for the Top 3 Today card.
+
+Responsibility:
+- Score every open reminder in one pass: priority, flagged, days overdue,
+  due-time proximity and project membership
+- Weights (and K) come from top3_weights.json
+- Top K picked with a bounded heap (external_sort.TopN, O(n log k) time,
+  O(k) memory); ties keep export order
+- A tiny output file, so the first card on the dashboard paints fast
+- Scores are per row: build_all_views keeps every candidate's score in a
+  side file (state_file), so a patch build rescores only the changed rows
+  and picks the top K again; keep_scores=False (the standalone script,
+  streaming builds) holds only the K best
+"""
+
+import json
+import sys
+from datetime import datetime, time
+from pathlib import Path
+
+import clock
+from view_writer import write_view
+from external_sort import TopN
+from nova_csv import read_reminders, DUE_OK
+from project_rules import DEFAULT_RULES
+
+DEFAULT_WEIGHTS_FILE = Path(__file__).resolve().parent / 'top3_weights.json'
+
+def load_weights(path=DEFAULT_WEIGHTS_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def priority_level(priority):
+    """Apple/iCalendar priority (1-4 high, 5 medium, 6-9 low) as 0..1"""
+    if priority <= 0:
+        return 0.0
+    if priority < 5:
+        return 1.0
+    if priority == 5:
+        return 2 / 3
+    return 1 / 3
+
+class Top3View:
+    """Scores open reminders one at a time and keeps the best K"""
+
+    # Written by build_all_views next to the views, read back by load()
+    state_file = '.top3_scores.json'
+
+    def __init__(self, today=None, weights=None, rules=DEFAULT_RULES, keep_scores=True):
+        self.today = today or clock.today()
+        self.today_ordinal = self.today.toordinal()
+        self.day_start = datetime.combine(self.today, time())
+        self.weights = weights or load_weights()
+        self.k = self.weights.get('k', 3)
+        self.rules = rules
+        # [score, tag, id, title, list, flagged, priority, dueISO] per open reminder with a score > 0
+        self.candidates = TopN(self.k, key=self._score_key, reverse=True)
+        # Every candidate in export order, for patch_state(); None keeps memory at O(K)
+        self.scores = [] if keep_scores else None
+        self.top_items = []
+
+    @staticmethod
+    def _score_key(entry):
+        return entry[0]
+
+    def score(self, row):
+        """Weighted score of one reminder and a short reason tag"""
+        w = self.weights
+        score = w['priority'] * priority_level(row['priority'])
+        tag = row['list']
+        if row['flagged']:
+            score += w['flagged']
+            tag = 'Flagged'
+
+        if row['due_status'] == DUE_OK:
+            due = row['due']
+            days_from_now = due.days_from(self.today_ordinal)
+            if days_from_now < 0:
+                score += w['overdue_per_day'] * min(-days_from_now, w['overdue_cap_days'])
+                tag = f"{-days_from_now}d overdue"
+            elif days_from_now == 0:
+                tag = f"Due {due.time}"
+            # Due sooner (measured from the start of today) scores higher
+            hours = (due.dt - self.day_start).total_seconds() / 3600
+            score += w['proximity'] * max(0.0, 1 - max(hours, 0.0) / w['proximity_hours'])
+
+        if self.rules.is_project_item(row['title'], row['list']):
+            score += w['project']
+        return score, tag
+
+    def add(self, row):
+        """Feed one normalized reminder into the view"""
+        if row['completed']:
+            return
+        score, tag = self.score(row)
+        if score > 0:
+            entry = [score, tag, row['id'], row['title'], row['list'], row['flagged'], row['priority'],
+                     row['due'].iso if row['due_status'] == DUE_OK else '']
+            self.candidates.append(entry)
+            if self.scores is not None:
+                self.scores.append(entry)
+
+    def load(self, output):
+        """Restore the scores from a previous patch_state(); False if they are stale"""
+        if (output.get('date') != self.today.isoformat() or output.get('weights') != self.weights
+                or output.get('rules') != self.rules.digest or self.scores is None):
+            return False
+        self.scores = output['scores']
+        return True
+
+    def remove_rows(self, rows):
+        """Undo add() for reminders that left or changed in the export"""
+        ids = {row['id'] for row in rows}
+        self.scores = [entry for entry in self.scores if entry[2] not in ids]
+
+    def reorder(self, positions):
+        """Put the scores back in export order and pick the top K again, so ties rank like a full rebuild"""
+        self.scores.sort(key=lambda entry: positions[entry[2]])
+        self.candidates = TopN(self.k, key=self._score_key, reverse=True)
+        for entry in self.scores:
+            self.candidates.append(entry)
+
+    def merge(self, other):
+        """Absorb a view built from the rows that follow this one's"""
+        self.candidates.extend(other.candidates)
+        if self.scores is not None:
+            self.scores.extend(other.scores)
+
+    def build(self):
+        """Return the top3.json structure"""
+        # Best first; TopN keeps export order among equal scores
+        self.top_items = []
+        for score, tag, reminder_id, title, list_name, flagged, priority, due_iso in self.candidates.sorted_items():
+            item = {
+                'title': title,
+                'list': list_name,
+                'tag': tag,
+                'score': round(score, 3),
+                'flagged': flagged,
+                'priority': priority,
+                'id': reminder_id
+            }
+            if due_iso:
+                item['dueISO'] = due_iso
+            self.top_items.append(item)
+
+        return {
+            'view': 'top3',
+            'date': self.today.isoformat(),
+            'count': len(self.top_items),
+            'items': self.top_items,
+            'candidates': len(self.candidates),
+            'generated_at': clock.now().isoformat()
+        }
+
+    def patch_state(self):
+        """Every candidate's score, so the next build rescores only the changed rows"""
+        if self.scores is None:
+            return None
+        return {
+            'date': self.today.isoformat(),
+            'weights': self.weights,
+            'rules': self.rules.digest,
+            'scores': self.scores
+        }
+
+    def summary(self):
+        return f"✅ Top 3 view: {len(self.top_items)} picked from {len(self.candidates)} scored reminders"
+
+def build_top3_view(source_csv, output_json):
+    """Build the Top 3 Today view from Nova Scheduling CSV"""
+
+    view = Top3View(keep_scores=False)
+
+    try:
+        for row in read_reminders(source_csv):
+            view.add(row)
+
+        # Write output
+        write_view(view.build(), output_json)
+
+        print(view.summary())
+        return True
+
+    except Exception as e:
+        print(f"❌ Error building top 3 view: {e}")
+        return False
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python3 build_top3_view.py <source_csv> <output_json>")
+        sys.exit(1)
+
+    source_csv = sys.argv[1]
+    output_json = sys.argv[2]
+
+    success = build_top3_view(source_csv, output_json)
+    sys.exit(0 if success else 1)
@@ -7,119 +7,217 @@ Responsibility:
 - Reminders scheduled for the next 7 days
 - Sorted by day/time
 - Eventually: plus zone logic, energy logic, etc
+- StreamingWeekView: per-day buckets with running counters and disk
+  spill (external_sort.py), for flat memory on very large exports
 """
 
-import csv
-import json
 import sys
-from datetime import datetime, date, timedelta
+from datetime import timedelta
 from pathlib import Path
 
-def build_week_view(source_csv, output_json):
-    """Build week view from Nova Scheduling CSV"""
-    
-    today = date.today()
-    week_end = today + timedelta(days=7)
-    week_items = []
-    
-    try:
-        with open(source_csv, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            
-            for row in reader:
-                # Skip completed items
-                if row.get('completed', '').lower() in ['yes', 'true', '1']:
-                    continue
-                    
-                # Parse due date
-                due_str = row.get('due', '').strip()
-                if not due_str or 'Error:' in due_str or due_str == 'No':
-                    continue
-                    
-                try:
-                    due_dt = datetime.strptime(due_str, '%Y-%m-%d %H:%M:%S')
-                    due_date = due_dt.date()
-                    
-                    # Only include items in the next 7 days (including today)
-                    if today <= due_date <= week_end:
-                        day_name = due_date.strftime('%A')
-                        days_from_now = (due_date - today).days
-                        
-                        item = {
-                            'title': row.get('title', 'Untitled').strip(),
-                            'dueISO': due_dt.isoformat(),
-                            'due_date': due_date.isoformat(),
-                            'time': due_dt.strftime('%H:%M'),
-                            'day_name': day_name,
-                            'days_from_now': days_from_now,
-                            'list': row.get('list', 'Default').strip(),
-                            'flagged': row.get('flagged', '').lower() in ['yes', 'true', '1'],
-                            'priority': int(row.get('priority', 0) or 0),
-                            'id': row.get('id', '').strip()
-                        }
-                        
-                        # Add relative labels
-                        if days_from_now == 0:
-                            item['relative_day'] = 'Today'
-                        elif days_from_now == 1:
-                            item['relative_day'] = 'Tomorrow'
-                        else:
-                            item['relative_day'] = f"In {days_from_now} days"
-                            
-                        week_items.append(item)
-                        
-                except ValueError:
-                    # Skip unparseable dates
-                    continue
-    
+import clock
+from view_writer import write_view
+from nova_csv import read_reminders, DUE_OK
+from external_sort import ExternalSorter, DEFAULT_SPILL_BUDGET
+
+class WeekView:
+    """Accumulates the next 7 days of reminders one at a time"""
+
+    def __init__(self, today=None):
+        self.today = today or clock.today()
+        self.week_end = self.today + timedelta(days=7)
+        self.today_ordinal = self.today.toordinal()
+        self.week_items = []
+        self.total_days = 0
+
+    def add(self, row):
+        """Feed one normalized reminder into the view"""
+        item = self.make_item(row)
+        if item is not None:
+            self.week_items.append(item)
+
+    def make_item(self, row):
+        """The week item for a reminder, or None if it is not in the next 7 days"""
+        # Skip completed items and anything without a parseable due date
+        if row['completed'] or row['due_status'] != DUE_OK:
+            return None
+
+        due = row['due']
+        days_from_now = due.days_from(self.today_ordinal)
+
+        # Only include items in the next 7 days (including today)
+        if not (0 <= days_from_now <= 7):
+            return None
+
+        item = {
+            'title': row['title'],
+            'dueISO': due.iso,
+            'due_date': due.date_iso,
+            'time': due.time,
+            'day_name': due.day_name,
+            'days_from_now': days_from_now,
+            'list': row['list'],
+            'flagged': row['flagged'],
+            'priority': row['priority'],
+            'id': row['id']
+        }
+
+        # Add relative labels
+        if days_from_now == 0:
+            item['relative_day'] = 'Today'
+        elif days_from_now == 1:
+            item['relative_day'] = 'Tomorrow'
+        else:
+            item['relative_day'] = f"In {days_from_now} days"
+
+        return item
+
+    def load(self, output):
+        """Restore state from a previous week.json; False if it is stale"""
+        if output.get('start_date') != self.today.isoformat():
+            return False
+        self.week_items = [item for day in output['days'] for item in day['items']]
+        return True
+
+    def remove_rows(self, rows):
+        """Undo add() for reminders that left or changed in the export"""
+        ids = {row['id'] for row in rows}
+        self.week_items = [item for item in self.week_items if item['id'] not in ids]
+
+    def reorder(self, positions):
+        """Put items back in export order so ties sort like a full rebuild"""
+        self.week_items.sort(key=lambda x: positions[x['id']])
+
+    def merge(self, other):
+        """Absorb a view built from the rows that follow this one's"""
+        self.week_items.extend(other.week_items)
+
+    def sort_items(self):
         # Sort by date, then time
-        week_items.sort(key=lambda x: x['dueISO'])
+        self.week_items.sort(key=lambda x: x['dueISO'])
+
+    def build(self):
+        """Return the week.json structure"""
+        week_items = self.week_items
+        self.sort_items()
         
-        # Group by day
+        # Group by day, counting as we go
         days = {}
         for item in week_items:
             day_key = item['due_date']
             if day_key not in days:
-                days[day_key] = {
-                    'date': day_key,
-                    'day_name': item['day_name'],
-                    'relative_day': item['relative_day'],
-                    'days_from_now': item['days_from_now'],
-                    'items': []
-                }
-            days[day_key]['items'].append(item)
-        
+                days[day_key] = new_day(item, [])
+            day = days[day_key]
+            day['items'].append(item)
+            count_item(day, item)
+
         # Convert to sorted list
         sorted_days = sorted(days.values(), key=lambda x: x['date'])
-        
-        # Add day summaries
+        return self.week_output(sorted_days)
+
+    def week_output(self, sorted_days):
+        """week.json from sorted day dicts carrying their running counts"""
+        priority_items = flagged_items = total_items = 0
         for day in sorted_days:
-            day['item_count'] = len(day['items'])
-            day['priority_items'] = len([item for item in day['items'] if item['priority'] > 0])
-            day['flagged_items'] = len([item for item in day['items'] if item['flagged']])
-        
-        # Create output structure
-        output = {
+            counts = day.pop('_counts')
+            # Add day summaries
+            day['item_count'] = counts[0]
+            day['priority_items'] = counts[1]
+            day['flagged_items'] = counts[2]
+            total_items += counts[0]
+            priority_items += counts[1]
+            flagged_items += counts[2]
+        self.total_days = len(sorted_days)
+
+        return {
             'view': 'week',
-            'start_date': today.isoformat(),
-            'end_date': week_end.isoformat(),
+            'start_date': self.today.isoformat(),
+            'end_date': self.week_end.isoformat(),
             'days': sorted_days,
             'total_days': len(sorted_days),
-            'total_items': len(week_items),
+            'total_items': total_items,
             'summary': {
-                'total_items': len(week_items),
-                'priority_items': len([item for item in week_items if item['priority'] > 0]),
-                'flagged_items': len([item for item in week_items if item['flagged']]),
+                'total_items': total_items,
+                'priority_items': priority_items,
+                'flagged_items': flagged_items,
                 'items_by_day': {day['relative_day']: day['item_count'] for day in sorted_days}
             },
-            'generated_at': datetime.now().isoformat()
+            'generated_at': clock.now().isoformat()
         }
+
+    def summary(self):
+        return f"✅ Week view: {len(self.week_items)} items across {self.total_days} days"
+
+def new_day(item, items):
+    """A week.json day dict for the date of item"""
+    return {
+        'date': item['due_date'],
+        'day_name': item['day_name'],
+        'relative_day': item['relative_day'],
+        'days_from_now': item['days_from_now'],
+        'items': items,
+        '_counts': [0, 0, 0]   # items, priority items, flagged items
+    }
+
+def count_item(day, item):
+    counts = day['_counts']
+    counts[0] += 1
+    counts[1] += item['priority'] > 0
+    counts[2] += bool(item['flagged'])
+
+class StreamingWeekView(WeekView):
+    """WeekView with flat memory
+
+    Items go straight into per-day buckets that spill sorted runs to disk
+    past spill_budget, and day/summary counts are kept as running
+    counters. build() returns the days' items as lazy iterators for
+    view_writer to stream; the JSON is identical to WeekView's.
+    """
+
+    def __init__(self, today=None, spill_budget=DEFAULT_SPILL_BUDGET):
+        super().__init__(today)
+        self.spill_budget = spill_budget
+        self.days = {}
+        self.item_total = 0
+
+    def add(self, row):
+        item = self.make_item(row)
+        if item is None:
+            return
+        day = self.days.get(item['due_date'])
+        if day is None:
+            sorter = ExternalSorter(key=lambda x: x['dueISO'], budget=self.spill_budget)
+            day = self.days[item['due_date']] = new_day(item, sorter)
+        day['items'].append(item)
+        count_item(day, item)
+        self.item_total += 1
+
+    def load(self, output):
+        # Nothing to patch: streaming views are always rebuilt
+        return False
+
+    def build(self):
+        """Return the week.json structure with lazily merged day items"""
+        sorted_days = [dict(self.days[key], items=self.days[key]['items'].sorted_items())
+                       for key in sorted(self.days)]
+        return self.week_output(sorted_days)
+
+    def summary(self):
+        return f"✅ Week view: {self.item_total} items across {self.total_days} days"
+
+def build_week_view(source_csv, output_json):
+    """Build week view from Nova Scheduling CSV"""
+    
+    view = WeekView()
+    
+    try:
+        for row in read_reminders(source_csv):
+            view.add(row)
         
         # Write output
-        with open(output_json, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        write_view(view.build(), output_json)
             
-        print(f"✅ Week view: {len(week_items)} items across {len(sorted_days)} days")
+        print(view.summary())
         return True
         
     except Exception as e:
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+clock.py
+The pipeline's "today" and "now", overridable for as-of builds.
+
+Responsibility:
+- today()/now() stand in for date.today()/datetime.now() in the builders
+- An as-of moment set in code (set_as_of, or the as_of() context) or in
+  the JENQUIN_AS_OF environment variable freezes both, so any script
+  builds the views of another day without touching the system clock
+- parse_as_of: YYYY-MM-DD, an ISO datetime, or a day offset like +1 / -7
+- date_range: the days of a batch (backfill) build
+"""
+
+import os
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+
+AS_OF_ENV = 'JENQUIN_AS_OF'
+
+_as_of = None
+
+def parse_as_of(text):
+    """Moment for an --as-of argument; a bare date means its midnight"""
+    text = text.strip()
+    if text[:1] in '+-' and text[1:].isdigit():
+        return datetime.combine(date.today() + timedelta(days=int(text)), time())
+    if 'T' in text or ' ' in text:
+        return datetime.fromisoformat(text)
+    return datetime.combine(date.fromisoformat(text), time())
+
+def set_as_of(moment):
+    """Freeze now()/today() at moment (a datetime, date or as-of string); None restores the system clock"""
+    global _as_of
+    if isinstance(moment, str):
+        moment = parse_as_of(moment)
+    elif isinstance(moment, date) and not isinstance(moment, datetime):
+        moment = datetime.combine(moment, time())
+    _as_of = moment
+
+@contextmanager
+def as_of(moment):
+    previous = _as_of
+    set_as_of(moment)
+    try:
+        yield
+    finally:
+        set_as_of(previous)
+
+def now():
+    return _as_of if _as_of is not None else datetime.now()
+
+def today():
+    return _as_of.date() if _as_of is not None else date.today()
+
+def date_range(start, end):
+    """Every day from start through end"""
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+if os.environ.get(AS_OF_ENV):
+    set_as_of(os.environ[AS_OF_ENV])
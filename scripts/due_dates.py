@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+due_dates.py
+Fast, memoized parsing of Nova Scheduling due dates.
+
+Responsibility:
+- One classification of missing / sentinel ("Error: ...", "No") / invalid dates
+- Slice-and-int parsing of the fixed '%Y-%m-%d %H:%M:%S' layout
+  (strptime is only used for the odd non-padded value)
+- Derived fields (ISO strings, HH:MM, weekday name, day ordinal)
+  computed once per distinct timestamp and shared by every builder
+"""
+
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+DUE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Due status values
+DUE_OK = 'ok'
+DUE_MISSING = 'missing'   # empty due column
+DUE_ERROR = 'error'       # "Error: ..." or "No" sentinel from the exporter
+DUE_INVALID = 'invalid'   # present but not a valid DUE_FORMAT timestamp
+
+# Same names as strftime('%A') under the default C locale
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+EPOCH = datetime(1970, 1, 1)
+
+class DueDate(namedtuple('DueDate', 'dt date iso date_iso time day_name ordinal')):
+    """A parsed due timestamp with the fields the views print
+
+    dt:       datetime
+    date:     date
+    iso:      dt.isoformat()
+    date_iso: date.isoformat()
+    time:     'HH:MM'
+    day_name: 'Monday' .. 'Sunday'
+    ordinal:  date.toordinal(), so day offsets are one int subtraction
+    """
+    __slots__ = ()
+
+    def days_from(self, today_ordinal):
+        """Whole days from today (negative when overdue)"""
+        return self.ordinal - today_ordinal
+
+def due_from_datetime(dt):
+    day = dt.date()
+    return DueDate(
+        dt=dt,
+        date=day,
+        iso=dt.isoformat(),
+        date_iso=day.isoformat(),
+        time=f"{dt.hour:02d}:{dt.minute:02d}",
+        day_name=DAY_NAMES[day.weekday()],
+        ordinal=day.toordinal()
+    )
+
+def is_sentinel(due_str):
+    """True for the exporter's placeholder values"""
+    return 'Error:' in due_str or due_str == 'No'
+
+def _fast_datetime(s):
+    """Parse 'YYYY-MM-DD HH:MM:SS' by slicing; None if the layout differs"""
+    if (len(s) != 19 or s[4] != '-' or s[7] != '-' or s[10] != ' '
+            or s[13] != ':' or s[16] != ':'):
+        return None
+    digits = s[0:4] + s[5:7] + s[8:10] + s[11:13] + s[14:16] + s[17:19]
+    if not (digits.isascii() and digits.isdecimal()):
+        return None
+    return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                    int(s[11:13]), int(s[14:16]), int(s[17:19]))
+
+@lru_cache(maxsize=1 << 16)
+def _parse_stripped(due_str):
+    if not due_str:
+        return None, DUE_MISSING
+    if is_sentinel(due_str):
+        return None, DUE_ERROR
+    try:
+        dt = _fast_datetime(due_str)
+        if dt is None:
+            # strptime also accepts non-padded fields such as '2025-1-5 9:00:00'
+            dt = datetime.strptime(due_str, DUE_FORMAT)
+    except ValueError:
+        return None, DUE_INVALID
+    return due_from_datetime(dt), DUE_OK
+
+def parse_due(due_str):
+    """Return (DueDate or None, status) for a raw due string"""
+    return _parse_stripped(due_str.strip())
+
+@lru_cache(maxsize=1 << 16)
+def due_from_seconds(seconds):
+    """DueDate for seconds since 1970-01-01 (naive local time)"""
+    return due_from_datetime(EPOCH + timedelta(seconds=seconds))
+
+def due_to_seconds(due):
+    """Inverse of due_from_seconds"""
+    return int((due.dt - EPOCH).total_seconds())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+due_index.py
+Sorted, bisectable index of due dates for calendar range queries.
+
+Responsibility:
+- Items and per-day counts for any [start, end) date range in O(log n + k)
+- Month shard files (data/calendar/YYYY-MM.json) with a per-day histogram,
+  plus data/calendar/index.json listing every month
+- Unchanged month shards are not rewritten
+
+Usage:
+  python3 due_index.py <source_csv> <start> <end>      # print a range as JSON
+"""
+
+import json
+import os
+import sys
+from bisect import bisect_left
+from datetime import date
+from pathlib import Path
+
+from nova_csv import read_reminders
+from view_writer import write_view, encode_view
+
+CALENDAR_DIR = 'calendar'
+
+def calendar_item(row):
+    due = row['due']
+    return {
+        'title': row['title'],
+        'dueISO': due.iso,
+        'due_date': due.date_iso,
+        'time': due.time,
+        'list': row['list'],
+        'flagged': row['flagged'],
+        'priority': row['priority'],
+        'id': row['id']
+    }
+
+def month_bounds(year, month):
+    """[first day of month, first day of next month)"""
+    start = date(year, month, 1)
+    end = date(year + month // 12, month % 12 + 1, 1)
+    return start, end
+
+class DueIndex:
+    """Open reminders with a valid due date, sorted by due time"""
+
+    def __init__(self, rows, include_completed=False):
+        dated = [row for row in rows
+                 if row['due'] is not None and (include_completed or not row['completed'])]
+        # Stable sort keeps export order for identical timestamps
+        dated.sort(key=lambda row: row['due'].iso)
+        self.rows = dated
+        self.ordinals = [row['due'].ordinal for row in dated]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _slice(self, start, end):
+        lo = bisect_left(self.ordinals, start.toordinal())
+        hi = bisect_left(self.ordinals, end.toordinal(), lo)
+        return lo, hi
+
+    def day_counts(self, start, end):
+        """{'YYYY-MM-DD': count} for days in [start, end) that have items"""
+        counts = {}
+        lo, hi = self._slice(start, end)
+        for row in self.rows[lo:hi]:
+            day = row['due'].date_iso
+            counts[day] = counts.get(day, 0) + 1
+        return counts
+
+    def range(self, start, end):
+        """Items and per-day counts for [start, end)"""
+        lo, hi = self._slice(start, end)
+        rows = self.rows[lo:hi]
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'count': len(rows),
+            'days': self.day_counts(start, end),
+            'items': [calendar_item(row) for row in rows]
+        }
+
+    def months(self):
+        """(year, month) for every month that has items, ascending"""
+        months = []
+        for ordinal in sorted(set(self.ordinals)):
+            day = date.fromordinal(ordinal)
+            if not months or months[-1] != (day.year, day.month):
+                months.append((day.year, day.month))
+        return months
+
+def write_month_shards(index, data_dir, pretty=False):
+    """Write calendar/YYYY-MM.json for every month; returns (written, unchanged)"""
+    calendar_dir = Path(data_dir) / CALENDAR_DIR
+    calendar_dir.mkdir(parents=True, exist_ok=True)
+    written = unchanged = 0
+    live = set()
+    listing = []
+
+    for year, month in index.months():
+        start, end = month_bounds(year, month)
+        shard = dict(view='calendar', month=f"{year:04d}-{month:02d}", **index.range(start, end))
+        body = encode_view(shard, pretty=pretty)
+        name = f"{shard['month']}.json"
+        path = calendar_dir / name
+        live.add(name)
+        try:
+            same = path.stat().st_size == len(body) and path.read_bytes() == body
+        except OSError:
+            same = False
+        if same:
+            unchanged += 1
+        else:
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_bytes(body)
+            os.replace(tmp_path, path)
+            written += 1
+        listing.append({'month': shard['month'], 'count': shard['count'],
+                        'url': f"data/{CALENDAR_DIR}/{name}"})
+
+    for path in calendar_dir.glob('*.json'):
+        if path.name != 'index.json' and path.name not in live:
+            path.unlink()
+
+    write_view({'view': 'calendar_index', 'months': listing}, calendar_dir / 'index.json', pretty=pretty)
+    return written, unchanged
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python3 due_index.py <source_csv> <start YYYY-MM-DD> <end YYYY-MM-DD>")
+        sys.exit(1)
+
+    index = DueIndex(read_reminders(sys.argv[1]))
+    result = index.range(date.fromisoformat(sys.argv[2]), date.fromisoformat(sys.argv[3]))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+external_sort.py
+Bounded-memory collections for the streaming week and backlog views.
+
+Responsibility:
+- ExternalSorter: stable sort that spills sorted runs to temporary files
+  once a memory budget is reached and k-way merges them on read
+- TopN: the first N items of a stable sort, kept in a bounded heap
+- Both take items through append() and report the total seen via len(),
+  so view accumulators can use them in place of plain lists
+"""
+
+import heapq
+import pickle
+import tempfile
+
+# Items held in memory per collection before a run is spilled
+DEFAULT_SPILL_BUDGET = 50_000
+
+# Items pickled together in a spilled run
+SPILL_BATCH = 1024
+
+class ExternalSorter:
+    """Stable sort by key (like list.sort) without holding every item"""
+
+    def __init__(self, key, reverse=False, budget=DEFAULT_SPILL_BUDGET, spill_dir=None):
+        self.key = key
+        self.reverse = reverse
+        self.budget = budget
+        self.spill_dir = spill_dir
+        self.buffer = []
+        self.runs = []       # temporary files, each one sorted run
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, item):
+        self.buffer.append(item)
+        self.count += 1
+        if len(self.buffer) >= self.budget:
+            self._spill()
+
+    def _spill(self):
+        self.buffer.sort(key=self.key, reverse=self.reverse)
+        run = tempfile.TemporaryFile(dir=self.spill_dir)
+        for start in range(0, len(self.buffer), SPILL_BATCH):
+            pickle.dump(self.buffer[start:start + SPILL_BATCH], run, protocol=pickle.HIGHEST_PROTOCOL)
+        self.runs.append(run)
+        self.buffer = []
+
+    @staticmethod
+    def _read_run(run):
+        run.seek(0)
+        while True:
+            try:
+                batch = pickle.load(run)
+            except EOFError:
+                return
+            yield from batch
+
+    def sorted_items(self):
+        """Iterator over every item in sorted order (runs are merged lazily)"""
+        self.buffer.sort(key=self.key, reverse=self.reverse)
+        if not self.runs:
+            return iter(self.buffer)
+        # heapq.merge prefers earlier inputs on ties, which keeps the sort stable
+        streams = [self._read_run(run) for run in self.runs] + [iter(self.buffer)]
+        return heapq.merge(*streams, key=self.key, reverse=self.reverse)
+
+    def close(self):
+        for run in self.runs:
+            run.close()
+        self.runs = []
+
+class _Reversed:
+    """Inverts ordering, for max-heaps and descending keys of any type"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+class TopN:
+    """First n items of a stable sort by key, in a heap of at most n"""
+
+    def __init__(self, n, key, reverse=False):
+        self.n = n
+        self.key = key
+        self.reverse = reverse
+        self.heap = []       # [_Reversed(rank), item]; the root is the worst kept item
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, item):
+        key = self.key(item)
+        # Arrival order breaks ties, so equal keys keep their input order
+        rank = (_Reversed(key) if self.reverse else key, self.count)
+        self.count += 1
+        if len(self.heap) < self.n:
+            heapq.heappush(self.heap, [_Reversed(rank), item])
+        elif self.n and rank < self.heap[0][0].value:
+            heapq.heapreplace(self.heap, [_Reversed(rank), item])
+
+    def extend(self, other):
+        """Absorb a TopN that was fed the items following this one's"""
+        # Its kept items in arrival order; the ones it dropped can't make this top n either
+        for _, item in sorted(other.heap, key=lambda entry: entry[0].value[1]):
+            self.append(item)
+        self.count += other.count - len(other.heap)
+
+    def sorted_items(self):
+        return iter([item for _, item in sorted(self.heap, reverse=True)])
+
+    def close(self):
+        pass
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+nova_csv.py
+Reads a Nova Scheduling CSV once and normalizes every row.
+
+Responsibility:
+- One csv.DictReader pass per export
+- Trimmed title/list/id, boolean flagged/completed, int priority
+- Parsed due date (due_dates.DueDate) plus a missing/error/invalid status
+"""
+
+import csv
+
+from due_dates import parse_due, DUE_OK, DUE_MISSING, DUE_ERROR, DUE_INVALID
+
+TRUTHY = ('yes', 'true', '1')
+
+def normalize_row(row):
+    """Convert a raw DictReader row into the normalized reminder dict"""
+    due, due_status = parse_due(row.get('due', ''))
+    return {
+        'title': row.get('title', 'Untitled').strip(),
+        'list': row.get('list', 'Default').strip(),
+        'id': row.get('id', '').strip(),
+        'flagged': row.get('flagged', '').lower() in TRUTHY,
+        'completed': row.get('completed', '').lower() in TRUTHY,
+        'priority': int(row.get('priority', 0) or 0),
+        'due': due,
+        'due_status': due_status
+    }
+
+def read_reminders(source_csv):
+    """Yield normalized reminders from a Nova Scheduling CSV"""
+    with open(source_csv, 'r', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            yield normalize_row(row)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+parallel_csv.py
+Multi-process view building for archive-scale Nova Scheduling CSVs.
+
+Responsibility:
+- Split the file into byte ranges on record boundaries (a newline outside
+  any quoted field), found with one C-speed pass counting quotes
+- Parse and classify each range in a process pool, with the same
+  csv.DictReader + normalize_row path as nova_csv.read_reminders
+- Each worker sorts its partial views, so merging is concatenation in
+  shard order and the final stable sort only merges k sorted runs;
+  output is identical to the serial path
+- Small files, one worker or unbalanced quotes fall back to serial
+"""
+
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from nova_csv import read_reminders, normalize_row
+from pipeline_metrics import Metrics
+
+# Below this size process start-up costs more than it saves
+MIN_PARALLEL_BYTES = 4 << 20
+SCAN_CHUNK = 16 << 20
+
+def record_boundaries(source_csv, targets):
+    """First record boundary at or after each target byte offset
+
+    Boundaries are offsets just past a newline with an even number of
+    double quotes before it (RFC 4180 quoting, as csv.writer produces).
+    Returns (boundaries, quotes_balanced); boundaries past the last
+    newline are the file size.
+    """
+    size = os.path.getsize(source_csv)
+    pending = sorted(targets)
+    found = []
+    parity = 0
+    offset = 0
+    with open(source_csv, 'rb') as f:
+        while True:
+            chunk = f.read(SCAN_CHUNK)
+            if not chunk:
+                break
+            while pending and pending[0] < offset + len(chunk):
+                position = max(pending[0] - offset, 0)
+                while True:
+                    newline = chunk.find(b'\n', position)
+                    if newline < 0:
+                        break
+                    if (parity + chunk.count(b'"', 0, newline)) % 2 == 0:
+                        break
+                    position = newline + 1
+                if newline < 0:
+                    # Resolve in the next chunk
+                    pending[0] = offset + len(chunk)
+                    break
+                found.append(offset + newline + 1)
+                pending.pop(0)
+            parity = (parity + chunk.count(b'"')) % 2
+            offset += len(chunk)
+    found.extend(size for _ in pending)
+    return found, parity == 0
+
+def plan_shards(source_csv, shards):
+    """(header_end, [(start, end), ...]) or None when the file must be read serially"""
+    size = os.path.getsize(source_csv)
+    targets = [0] + [size * i // shards for i in range(1, shards)]
+    boundaries, balanced = record_boundaries(source_csv, targets)
+    if not balanced:
+        return None
+    header_end = boundaries[0]
+    cuts = sorted({max(boundary, header_end) for boundary in boundaries[1:]} | {header_end, size})
+    return header_end, list(zip(cuts, cuts[1:]))
+
+def read_range(source_csv, start, end):
+    """Text of a byte range with the universal newlines open() would apply"""
+    with open(source_csv, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return io.StringIO(data.decode('utf-8'), newline=None)
+
+def feed(rows, make_views, tally=None):
+    """Views fed every row; returns (views, counters)"""
+    views = make_views()
+    adders = [view.add for view in views.values()]
+    if tally is None:
+        for row in rows:
+            for add in adders:
+                add(row)
+        return views, {}
+    metrics = Metrics('shard')
+    tally(rows, metrics, adders)
+    return views, metrics.counters
+
+def build_shard(source_csv, header_end, start, end, make_views, tally=None):
+    """Partial views (sorted) and row counters for one byte range"""
+    header = next(csv.reader(read_range(source_csv, 0, header_end)), [])
+    rows = (normalize_row(row) for row in csv.DictReader(read_range(source_csv, start, end), fieldnames=header))
+    views, counters = feed(rows, make_views, tally)
+    for view in views.values():
+        if hasattr(view, 'sort_items'):
+            view.sort_items()
+    return views, counters
+
+def build_views_parallel(source_csv, make_views, workers=None, tally=None):
+    """Views for a CSV built across a process pool; returns (views, counters)
+
+    make_views is a picklable callable returning {name: view}; tally is
+    an optional picklable tally_rows(rows, metrics, adders) whose counters
+    are summed across shards.
+    """
+    workers = workers or os.cpu_count() or 1
+    plan = None
+    if workers > 1 and os.path.getsize(source_csv) >= MIN_PARALLEL_BYTES:
+        # A few shards per worker keeps the pool busy when ranges parse unevenly
+        plan = plan_shards(source_csv, workers * 4)
+
+    if plan is None or len(plan[1]) < 2:
+        return feed(read_reminders(source_csv), make_views, tally)
+
+    header_end, ranges = plan
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(build_shard, source_csv, header_end, start, end, make_views, tally)
+                   for start, end in ranges]
+        views, counters = futures[0].result()
+        for future in futures[1:]:
+            partial_views, partial_counters = future.result()
+            for name, view in views.items():
+                view.merge(partial_views[name])
+            for name, value in partial_counters.items():
+                counters[name] = counters.get(name, 0) + value
+    return views, counters
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+pipeline_metrics.py
+Timings, counters and logging shared by the reminders pipeline.
+
+Responsibility:
+- Timing spans per stage (read / parse / classify / sort / serialize ...)
+- Row counters (processed, valid, error, skipped-completed, ...)
+- Peak RSS of the process
+- Rolling metrics.json (last N runs) and an optional Prometheus text file
+- Leveled logging: per-row detail is DEBUG, so it costs nothing by default
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+LOGGER_NAME = 'jenquin.pipeline'
+log = logging.getLogger(LOGGER_NAME)
+
+# Runs kept in metrics.json
+HISTORY_LIMIT = 50
+
+def configure_logging(level='INFO'):
+    """Plain-message logging to stdout, like the scripts' print output"""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.handlers[:] = [handler]
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KiB on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class Metrics:
+    """Collects one pipeline run's spans and counters"""
+
+    def __init__(self, run='views'):
+        self.run = run
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.spans = {}      # name -> seconds (summed over repeats)
+        self.counters = {}   # name -> int
+        self.labels = {}     # name -> str
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] = self.spans.get(name, 0.0) + time.perf_counter() - started
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def label(self, name, value):
+        self.labels[name] = value
+
+    def snapshot(self):
+        return {
+            'run': self.run,
+            'started_at': self.started_at.isoformat(),
+            'total_seconds': round(time.perf_counter() - self._started, 6),
+            'spans': {name: round(seconds, 6) for name, seconds in self.spans.items()},
+            'counters': dict(self.counters),
+            'labels': dict(self.labels),
+            'peak_rss_bytes': peak_rss_bytes()
+        }
+
+    def write_json(self, path, history_limit=HISTORY_LIMIT):
+        """Append this run to a rolling metrics.json ({'latest', 'runs'})"""
+        snapshot = self.snapshot()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                runs = json.load(f).get('runs', [])
+        except (OSError, ValueError, AttributeError):
+            runs = []
+        runs = (runs + [snapshot])[-history_limit:]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'latest': snapshot, 'runs': runs}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return snapshot
+
+    def write_prometheus(self, path, prefix='jenquin_pipeline'):
+        """Prometheus text exposition of the latest run (node_exporter textfile style)"""
+        snapshot = self.snapshot()
+        run = snapshot['run']
+        lines = [
+            f"# TYPE {prefix}_stage_seconds gauge",
+            *(f'{prefix}_stage_seconds{{run="{run}",stage="{name}"}} {seconds}'
+              for name, seconds in sorted(snapshot['spans'].items())),
+            f"# TYPE {prefix}_rows gauge",
+            *(f'{prefix}_rows{{run="{run}",counter="{name}"}} {value}'
+              for name, value in sorted(snapshot['counters'].items())),
+            f"# TYPE {prefix}_total_seconds gauge",
+            f'{prefix}_total_seconds{{run="{run}"}} {snapshot["total_seconds"]}',
+            f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+            f'{prefix}_last_run_timestamp_seconds{{run="{run}"}} {self.started_at.timestamp():.0f}'
+        ]
+        if snapshot['peak_rss_bytes'] is not None:
+            lines += [f"# TYPE {prefix}_peak_rss_bytes gauge",
+                      f'{prefix}_peak_rss_bytes{{run="{run}"}} {snapshot["peak_rss_bytes"]}']
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
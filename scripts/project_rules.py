@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+project_rules.py
+Config-driven classifier for project-related reminders.
+
+Responsibility:
+- Load title keywords, list keywords and "Prefix — Name" patterns from
+  project_rules.json, so rules can be added without editing Python
+- Compile them once into a single regex over the lowercased title and list
+- Classify a reminder and capture its project/phase name in a single match
+
+Usage:
+  python3 project_rules.py "<title>" [list]      # show how a title classifies
+"""
+
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+DEFAULT_RULES_FILE = Path(__file__).resolve().parent / 'project_rules.json'
+
+# Item fields a prefix rule may capture into
+CAPTURE_FIELDS = ('project_name', 'phase')
+
+# A regex that never matches, for empty rule lists
+_NEVER = '(?!)'
+
+class ProjectRules:
+    """Compiled project rules
+
+    A reminder is matched as "<stripped title>\\x00<list>", lowercased,
+    against one regex whose alternatives are, in order: each prefix with
+    its name capture, each bare prefix, the title keywords and the list
+    keywords. The first alternative that matches decides, so a row is
+    classified and its name captured by a single match. Prefix patterns
+    match case-insensitively; the name is sliced from the original title.
+    """
+
+    def __init__(self, title_keywords=(), list_keywords=(), prefixes=()):
+        self.prefixes = []
+        for rule in prefixes:
+            if rule.get('field') not in CAPTURE_FIELDS:
+                raise ValueError(f"prefix rule {rule!r}: field must be one of {', '.join(CAPTURE_FIELDS)}")
+            self.prefixes.append((rule['type'], rule['field'], rule['pattern']))
+        # Identifies the rules, so stored classifications can tell they are stale
+        config = [list(title_keywords), list(list_keywords), [dict(rule) for rule in prefixes]]
+        self.digest = hashlib.sha256(
+            json.dumps(config, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+        # The matching capture alternative's name group closes last
+        alternatives = [f"(?i:{pattern})(?P<r{i}>[^\\x00\\n]+)" for i, (_, _, pattern) in enumerate(self.prefixes)]
+        # A bare prefix still marks a project item, with nothing to capture
+        alternatives += [f"(?i:{pattern})" for _, _, pattern in self.prefixes]
+        if title_keywords:
+            alternatives.append('[^\\x00]*?(?:' + '|'.join(re.escape(keyword.lower()) for keyword in title_keywords) + ')')
+        if list_keywords:
+            alternatives.append('[^\\x00]*\\x00(?s:.*?)(?:' + '|'.join(re.escape(keyword.lower()) for keyword in list_keywords) + ')')
+        pattern = '|'.join(alternatives) or _NEVER
+        self._rules = re.compile(pattern)
+        # For the rare title whose lowercase has another length (e.g. 'İ')
+        self._rules_anycase = re.compile(pattern, re.IGNORECASE)
+
+    def _match(self, title, list_name):
+        key = f"{title.strip()}\x00{list_name}"
+        lowered = key.lower()
+        if len(lowered) != len(key):
+            return self._rules_anycase.match(key), key
+        return self._rules.match(lowered), key
+
+    def _info(self, match, key):
+        info = {'type': 'task', 'project_name': None, 'phase': None}
+        if match.lastgroup:
+            rule_type, field, _ = self.prefixes[int(match.lastgroup[1:])]
+            info['type'] = rule_type
+            info[field] = key[match.start(match.lastgroup):match.end(match.lastgroup)].strip()
+        return info
+
+    def is_project_item(self, title, list_name):
+        return self._match(title, list_name)[0] is not None
+
+    def extract(self, title):
+        """{'type', 'project_name', 'phase'} for a title"""
+        match, key = self._match(title, '')
+        if match is None:
+            return {'type': 'task', 'project_name': None, 'phase': None}
+        return self._info(match, key)
+
+    def classify(self, title, list_name):
+        """extract(title) for project items, None for everything else"""
+        match, key = self._match(title, list_name)
+        return None if match is None else self._info(match, key)
+
+def load_rules(path=DEFAULT_RULES_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return ProjectRules(config.get('title_keywords', ()),
+                        config.get('list_keywords', ()),
+                        config.get('prefixes', ()))
+
+DEFAULT_RULES = load_rules()
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python3 project_rules.py \"<title>\" [list]")
+        sys.exit(1)
+
+    title = sys.argv[1]
+    list_name = sys.argv[2] if len(sys.argv) == 3 else ''
+    info = DEFAULT_RULES.classify(title, list_name)
+    if info is None:
+        print("➖ Not a project item")
+    else:
+        print(f"✅ {info['type']}: project={info['project_name']!r} phase={info['phase']!r}")
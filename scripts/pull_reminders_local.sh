@@ -32,28 +32,34 @@ echo "📋 Copied source CSV to data/nova_scheduling.csv"
 echo ""
 echo "🏗️ Building views..."
 
-# Daily View (Today's Agenda Card)
-python3 "$SCRIPTS_DIR/build_daily_view.py" "$NEWEST_CSV" "$DATA_DIR/daily.json"
+# Every view in build_all_views.VIEW_FILES from a single CSV pass
+# (the build_*_view.py scripts still work on their own for one view).
+# Each run is published as a new generation: data/current flips atomically
+# and data/*.json are links through it, so readers never see a partial set
+python3 "$SCRIPTS_DIR/build_all_views.py" "$NEWEST_CSV" "$DATA_DIR" --backlog-page-size 200 --calendar
 
-# Backlog View (Overdue/Undated/Future)
-python3 "$SCRIPTS_DIR/build_backlog_view.py" "$NEWEST_CSV" "$DATA_DIR/backlog.json"
-
-# Projects View (Smart Planner Card)  
-python3 "$SCRIPTS_DIR/build_project_view.py" "$NEWEST_CSV" "$DATA_DIR/projects.json"
-
-# Week View (Next 7 Days)
-python3 "$SCRIPTS_DIR/build_week_view.py" "$NEWEST_CSV" "$DATA_DIR/week.json"
+# Snapshot site + views (only changed content is stored); create then prunes
+# to the newest site_snapshot.DEFAULT_KEEP snapshots, as refresh_pipeline.json does
+python3 "$SCRIPTS_DIR/site_snapshot.py" create --label "pipeline refresh"
 
 echo ""
 echo "📊 DATA FILES GENERATED:"
 echo "├── nova_scheduling.csv  (source data)"
 echo "├── daily.json          (today's agenda)" 
 echo "├── backlog.json        (overdue/undated/future)"
+echo "├── backlog_manifest.json + backlog/  (paged backlog)"
 echo "├── projects.json       (Smart Planner)"
-echo "└── week.json           (next 7 days)"
+echo "├── week.json           (next 7 days)"
+echo "├── top3.json           (Top 3 Today)"
+echo "├── search_index.json   (title/list search)"
+echo "├── next_actions.json   (next task per project)"
+echo "├── calendar/           (month shards)"
+echo "├── view_versions.json  (per-view versions for live updates)"
+echo "├── next/               (tomorrow's daily + week, served from midnight)"
+echo "└── current → generations/gNNNNNN  (published atomically, last 3 kept)"
 
 echo ""
 echo "✅ Pipeline complete!"
-echo "💡 Usage: python3 -m http.server 8080 from Jenquin-site root"
+echo "💡 Usage: python3 scripts/view_server.py 8080 from Jenquin-site root"
 echo "🌐 Jenquin App: http://localhost:8080"
 echo "🧪 Calendar Test: http://localhost:8080/sandbox_calendar_loading_bar.html"
\ No newline at end of file
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+refresh_pipeline.py
+Runs the refresh_nova stages as a DAG and skips the ones with nothing new.
+
+Responsibility:
+- Stages, their commands, dependencies, inputs and outputs are declared
+  in refresh_pipeline.json
+- Inputs and outputs are fingerprinted by content (SHA-256; a size/mtime
+  cache means unchanged files are not read again)
+- A stage whose inputs and outputs match its last successful run is
+  skipped; stages without declared inputs always run
+- Stages whose dependencies are done run concurrently, each in its own
+  process; a failure stops everything downstream of it
+- Per-stage timings and cache hits go to a rolling refresh_metrics.json,
+  fingerprints and per-stage history to .cache/refresh_state.json
+
+Usage:
+  python3 refresh_pipeline.py [--config PATH] [--force] [--stage NAME ...] [--dry-run]
+  python3 refresh_pipeline.py --status
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, datetime
+from pathlib import Path
+
+from pipeline_metrics import Metrics
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent / 'refresh_pipeline.json'
+STATE_VERSION = 1
+
+# Stages running at once; the heavy ones are separate processes
+DEFAULT_WORKERS = 4
+
+# A var written "newest:<glob>" is the newest match by name (like
+# `find | sort | tail -1`), looked up when a stage starts
+NEWEST_PREFIX = 'newest:'
+
+HASH_BLOCK = 1 << 20
+
+class StageError(Exception):
+    pass
+
+class FileDigests:
+    """SHA-256 of file contents, cached by (size, mtime_ns) across runs"""
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else {}   # path -> [size, mtime_ns, digest]
+        self.hashed = 0
+
+    def digest(self, path):
+        st = os.stat(path)
+        cached = self.cache.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b''):
+                h.update(block)
+        self.cache[path] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+        self.hashed += 1
+        return self.cache[path][2]
+
+class Pipeline:
+    """A loaded refresh_pipeline.json: vars, stages and their order"""
+
+    def __init__(self, config):
+        self.vars = {}
+        for name, value in config.get('vars', {}).items():
+            # Declaration order: a var may use the ones above it
+            self.vars[name] = value.format_map(self.vars)
+        self.state_file = self.expand(config['state_file'])
+        self.metrics_file = self.expand(config['metrics_file'])
+        self.stages = {stage['name']: stage for stage in config['stages']}
+        self.order = self._topological_order()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_CONFIG):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _topological_order(self):
+        order, visiting = [], set()
+
+        def visit(name, path):
+            if name in order:
+                return
+            if name in visiting:
+                raise StageError(f"dependency cycle: {' -> '.join(path + [name])}")
+            if name not in self.stages:
+                raise StageError(f"unknown stage {name!r} (after {path[-1]!r})")
+            visiting.add(name)
+            for dep in self.stages[name].get('after', []):
+                visit(dep, path + [name])
+            visiting.discard(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def expand(self, text):
+        """Fill {var} references; newest: vars resolve against the disk now"""
+        return text.format_map(_ResolvingVars(self.vars))
+
+    def command(self, stage):
+        return [self.expand(part) for part in stage['command']]
+
+    def fingerprint(self, specs, digests, daily=False):
+        """Digest of every file the specs match
+
+        '' for no specs, None if a spec matches nothing (unknown state,
+        so the stage has to run).
+        """
+        if not specs:
+            return ''
+        h = hashlib.sha256()
+        for spec in specs:
+            if isinstance(spec, str):
+                spec = {'glob': spec}
+            pattern = self.expand(spec['glob'])
+            paths = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+            if not paths:
+                return None
+            if spec.get('newest'):
+                # Only the content counts, so a new export with the same
+                # reminders under a new timestamped name is still a hit
+                h.update(digests.digest(paths[-1]).encode())
+                continue
+            for path in paths:
+                h.update(f"{path}\0{digests.digest(path)}\0".encode())
+        if daily:
+            # Views depend on today's date as well as their inputs
+            h.update(date.today().isoformat().encode())
+        return h.hexdigest()
+
+class _ResolvingVars(dict):
+    def __getitem__(self, name):
+        value = super().__getitem__(name)
+        if value.startswith(NEWEST_PREFIX):
+            matches = sorted(glob.glob(value[len(NEWEST_PREFIX):]))
+            if not matches:
+                raise StageError(f"nothing matches {name} ({value[len(NEWEST_PREFIX):]})")
+            return matches[-1]
+        return value
+
+def load_state(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {'version': STATE_VERSION, 'stages': {}, 'digests': {}}
+
+def save_state(state, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def run_command(command, cwd):
+    """Run one stage's process; returns (returncode, seconds, output)"""
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, errors='replace')
+    return result.returncode, time.perf_counter() - started, result.stdout
+
+def run_pipeline(pipeline, force=False, selected=None, dry_run=False, workers=DEFAULT_WORKERS):
+    """Run the stages that need it; returns the run's Metrics and whether all succeeded"""
+    metrics = Metrics('refresh')
+    state = load_state(pipeline.state_file)
+    digests = FileDigests(state['digests'])
+    records = state['stages']
+    status = {}      # name -> 'ran' | 'skipped' | 'failed' | 'blocked' | 'excluded'
+    started = {}     # name -> input fingerprint of a running stage
+
+    def finished(name):
+        return name in status
+
+    def decide(name):
+        """'run', 'skip' or 'block' for a stage whose dependencies are finished"""
+        stage = pipeline.stages[name]
+        if any(status[dep] in ('failed', 'blocked') for dep in stage.get('after', [])):
+            return 'block', None
+        with metrics.span('fingerprint'):
+            inputs = pipeline.fingerprint(stage.get('inputs', []), digests, stage.get('daily', False))
+            record = records.get(name, {})
+            if (not force and not stage.get('always') and inputs
+                    and record.get('status') == 'ok' and record.get('inputs') == inputs
+                    and pipeline.fingerprint(stage.get('outputs', []), digests) == record.get('outputs')):
+                return 'skip', inputs
+        return 'run', inputs
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        running = {}     # future -> name
+        while len(status) < len(pipeline.order):
+            for name in pipeline.order:
+                stage = pipeline.stages[name]
+                if finished(name) or name in started or not all(finished(dep) for dep in stage.get('after', [])):
+                    continue
+                if selected and name not in selected:
+                    status[name] = 'excluded'
+                    continue
+                action, inputs = decide(name)
+                if action == 'block':
+                    status[name] = 'blocked'
+                    print(f"⏭️  {name}: blocked by a failed dependency")
+                elif action == 'skip':
+                    status[name] = 'skipped'
+                    record = records[name]
+                    record['hits'] = record.get('hits', 0) + 1
+                    record['checked_at'] = datetime.now().isoformat()
+                    metrics.count('stages_skipped')
+                    print(f"✅ {name}: unchanged, skipped")
+                elif dry_run:
+                    status[name] = 'ran'
+                    try:
+                        print(f"🔄 {name}: would run {' '.join(pipeline.command(stage))}")
+                    except StageError as e:
+                        # An upstream stage would create the file first
+                        print(f"🔄 {name}: would run ({e} yet)")
+                else:
+                    try:
+                        command = pipeline.command(stage)
+                        cwd = pipeline.expand(stage['cwd']) if stage.get('cwd') else None
+                    except StageError as e:
+                        status[name] = 'failed'
+                        metrics.count('stages_failed')
+                        print(f"❌ {name}: {e}")
+                        continue
+                    print(f"🔄 {name}: running")
+                    started[name] = inputs
+                    running[pool.submit(run_command, command, cwd)] = name
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                stage = pipeline.stages[name]
+                returncode, seconds, output = future.result()
+                for line in output.rstrip().splitlines():
+                    print(f"   [{name}] {line}")
+                metrics.spans[f"stage.{name}"] = seconds
+                record = records.setdefault(name, {})
+                record['runs'] = record.get('runs', 0) + 1
+                record['seconds'] = round(seconds, 3)
+                record['finished_at'] = datetime.now().isoformat()
+                if returncode == 0:
+                    status[name] = 'ran'
+                    record['status'] = 'ok'
+                    # Inputs as they were when the stage started: a file
+                    # that changed mid-run makes the next check a miss
+                    record['inputs'] = started.pop(name)
+                    with metrics.span('fingerprint'):
+                        record['outputs'] = pipeline.fingerprint(stage.get('outputs', []), digests)
+                    metrics.count('stages_run')
+                    print(f"✅ {name}: done in {seconds:.2f}s")
+                else:
+                    status[name] = 'failed'
+                    record['status'] = 'failed'
+                    record.pop('inputs', None)
+                    started.pop(name)
+                    metrics.count('stages_failed')
+                    print(f"❌ {name}: exit code {returncode} after {seconds:.2f}s")
+
+    checked = metrics.counters.get('stages_run', 0) + metrics.counters.get('stages_skipped', 0)
+    hit_rate = metrics.counters.get('stages_skipped', 0) / checked if checked else 0.0
+    metrics.label('cache_hit_rate', f"{hit_rate:.2f}")
+    metrics.count('files_hashed', digests.hashed)
+    for name, result in status.items():
+        metrics.label(f"stage.{name}", result)
+
+    if not dry_run:
+        # Forget cached digests of files that are gone
+        state['digests'] = {path: entry for path, entry in digests.cache.items() if os.path.exists(path)}
+        save_state(state, pipeline.state_file)
+    return metrics, 'failed' not in status.values() and 'blocked' not in status.values()
+
+def print_status(pipeline):
+    records = load_state(pipeline.state_file)['stages']
+    for name in pipeline.order:
+        record = records.get(name)
+        if not record:
+            print(f"   {name:12s} never run")
+            continue
+        runs, hits = record.get('runs', 0), record.get('hits', 0)
+        rate = hits / (runs + hits) if runs + hits else 0.0
+        print(f"   {name:12s} {record.get('status', '?'):6s} last run {record.get('finished_at', '-')[:19]} "
+              f"({record.get('seconds', 0):.2f}s)  {runs} runs, {hits} skips ({rate:.0%} hit rate)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the refresh_nova stages, skipping unchanged ones")
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help="pipeline config (default: %(default)s)")
+    parser.add_argument('--force', action='store_true', help="run every stage regardless of fingerprints")
+    parser.add_argument('--stage', dest='stages', action='append', default=[],
+                        help="run only this stage (repeatable); others are left alone")
+    parser.add_argument('--dry-run', action='store_true', help="show what would run without running it")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="stages run at once")
+    parser.add_argument('--status', action='store_true', help="show each stage's last run and hit rate")
+    args = parser.parse_args()
+
+    try:
+        pipeline = Pipeline.from_file(args.config)
+        unknown = [name for name in args.stages if name not in pipeline.stages]
+        if unknown:
+            raise StageError(f"unknown stage(s): {', '.join(unknown)}")
+    except (KeyError, OSError, ValueError, StageError) as e:
+        print(f"❌ Invalid pipeline config: {e}")
+        sys.exit(1)
+
+    if args.status:
+        print_status(pipeline)
+        sys.exit(0)
+
+    metrics, ok = run_pipeline(pipeline, force=args.force, selected=set(args.stages),
+                               dry_run=args.dry_run, workers=args.workers)
+    snapshot = metrics.snapshot()
+    counters = snapshot['counters']
+    print(f"📊 {counters.get('stages_run', 0)} run, {counters.get('stages_skipped', 0)} skipped, "
+          f"{counters.get('stages_failed', 0)} failed (hit rate {snapshot['labels']['cache_hit_rate']}) "
+          f"in {snapshot['total_seconds']:.2f}s")
+    if not args.dry_run:
+        try:
+            os.makedirs(os.path.dirname(pipeline.metrics_file) or '.', exist_ok=True)
+            metrics.write_json(pipeline.metrics_file)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics: {e}")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+reminder_diff.py
+Row-level diff between two Nova Scheduling exports, keyed by reminder id.
+
+Responsibility:
+- Added, removed and changed reminders between consecutive exports
+- Patch already-built views in place from that diff
+- Fall back (return None) whenever ids are not unique enough to patch safely
+"""
+
+import json
+import sys
+
+from nova_csv import read_reminders
+
+def index_by_id(rows):
+    """Map id -> row, or None if any id is empty or duplicated"""
+    by_id = {}
+    for row in rows:
+        row_id = row['id']
+        if not row_id or row_id in by_id:
+            return None
+        by_id[row_id] = row
+    return by_id
+
+def diff_reminders(previous_rows, current_rows):
+    """Return {'added', 'removed', 'changed'} between two exports, or None
+
+    'changed' holds (old_row, new_row) pairs; rows are normalized dicts.
+    """
+    previous = index_by_id(previous_rows)
+    current = index_by_id(current_rows)
+    if previous is None or current is None:
+        return None
+
+    added = [row for row_id, row in current.items() if row_id not in previous]
+    removed = [row for row_id, row in previous.items() if row_id not in current]
+    changed = [(previous[row_id], row) for row_id, row in current.items()
+               if row_id in previous and previous[row_id] != row]
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+def diff_size(diff):
+    return len(diff['added']) + len(diff['removed']) + len(diff['changed'])
+
+def patch_view(view, previous_output, diff, positions):
+    """Apply a diff to a view restored from its previous output
+
+    positions maps every current id to its row index so that items which
+    tie on the view's sort key land exactly where a full rebuild puts them.
+    Returns False when the previous output cannot be reused.
+    """
+    if not view.load(previous_output):
+        return False
+    view.remove_rows(diff['removed'] + [old for old, new in diff['changed']])
+    for row in diff['added']:
+        view.add(row)
+    for old, new in diff['changed']:
+        view.add(new)
+    view.reorder(positions)
+    return True
+
+def summarize(diff):
+    """JSON-friendly id lists for a diff"""
+    return {
+        'added': [row['id'] for row in diff['added']],
+        'removed': [row['id'] for row in diff['removed']],
+        'changed': [new['id'] for old, new in diff['changed']]
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python3 reminder_diff.py <previous_csv> <current_csv>")
+        sys.exit(1)
+
+    diff = diff_reminders(list(read_reminders(sys.argv[1])), list(read_reminders(sys.argv[2])))
+    if diff is None:
+        print("❌ Reminder ids are missing or duplicated; exports can't be diffed")
+        sys.exit(1)
+
+    print(json.dumps(summarize(diff), indent=2, ensure_ascii=False))
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+reminder_store.py
+SQLite-backed reminder store keyed by reminder id.
+
+Responsibility:
+- Upsert each Nova Scheduling export (reminders that disappear are kept
+  as history with present = 0)
+- Indexes on due date, list, completed and project name
+- is_project/project_name are recomputed for every row when the project
+  rules (project_rules.json) change, tracked by their digest in meta
+- Each view generated from an indexed query instead of a full CSV pass
+- Ad-hoc queries, e.g. everything due in list X next month
+
+Usage:
+  python3 reminder_store.py ingest <source_csv> [--db PATH]
+  python3 reminder_store.py build <data_dir> [--db PATH]
+  python3 reminder_store.py query [--list NAME] [--from DATE] [--to DATE] [--project NAME]
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import clock
+from nova_csv import read_reminders
+from due_dates import parse_due, DUE_OK, DUE_ERROR, DUE_INVALID
+from snapshot_cache import file_sha256
+from view_writer import write_view
+from view_publisher import ViewPublisher
+from build_project_view import is_project_item, extract_project_info
+from project_rules import DEFAULT_RULES
+from build_daily_view import DailyView
+from build_backlog_view import BacklogView
+from build_project_view import ProjectView
+from build_week_view import WeekView
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / '.cache' / 'reminders.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS exports (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    sha256 TEXT NOT NULL,
+    source TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reminders (
+    key TEXT PRIMARY KEY,          -- id, or id#position when the id is empty/duplicated
+    id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    list TEXT NOT NULL,
+    flagged INTEGER NOT NULL,
+    priority INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    due TEXT,                      -- 'YYYY-MM-DD HH:MM:SS' when due_status = 'ok'
+    due_date TEXT,                 -- 'YYYY-MM-DD' when due_status = 'ok'
+    due_status TEXT NOT NULL,
+    is_project INTEGER NOT NULL,
+    project_name TEXT,             -- from "Project — Name" titles
+    position INTEGER NOT NULL,     -- row order in the export it was last seen in
+    present INTEGER NOT NULL,      -- 1 if in the latest export
+    first_seen INTEGER NOT NULL,   -- exports.seq
+    last_seen INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders (present, completed, due_date);
+CREATE INDEX IF NOT EXISTS idx_reminders_list ON reminders (list, due_date);
+CREATE INDEX IF NOT EXISTS idx_reminders_project ON reminders (present, completed, is_project);
+CREATE INDEX IF NOT EXISTS idx_reminders_project_name ON reminders (project_name);
+CREATE INDEX IF NOT EXISTS idx_reminders_position ON reminders (present, position);
+"""
+
+COLUMNS = ('key', 'id', 'title', 'list', 'flagged', 'priority', 'completed', 'due', 'due_date',
+           'due_status', 'is_project', 'project_name', 'position', 'present', 'first_seen', 'last_seen')
+
+def connect(db_path=DEFAULT_DB):
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.executescript(SCHEMA)
+    reclassify(conn)
+    return conn
+
+def reclassify(conn, rules=DEFAULT_RULES):
+    """Recompute is_project/project_name for every row if the rules changed; returns rows updated"""
+    stored = conn.execute("SELECT value FROM meta WHERE name = 'project_rules'").fetchone()
+    if stored is not None and stored['value'] == rules.digest:
+        return 0
+    with conn:
+        records = conn.execute('SELECT key, title, list FROM reminders').fetchall()
+        conn.executemany(
+            'UPDATE reminders SET is_project = ?, project_name = ? WHERE key = ?',
+            ((int(is_project_item(record['title'], record['list'], rules)),
+              extract_project_info(record['title'], rules)['project_name'], record['key'])
+             for record in records))
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('project_rules', ?)", (rules.digest,))
+    return len(records)
+
+def to_record(row, position, seq, seen_ids):
+    """Normalized reminder -> reminders table tuple"""
+    row_id = row['id']
+    key = row_id if row_id and row_id not in seen_ids else f"{row_id}#{position}"
+    seen_ids.add(row_id)
+    due = row['due']
+    info = extract_project_info(row['title'])
+    return (key, row_id, row['title'], row['list'], int(row['flagged']), row['priority'],
+            int(row['completed']),
+            due.iso.replace('T', ' ') if due else None,
+            due.date_iso if due else None,
+            row['due_status'],
+            int(is_project_item(row['title'], row['list'])),
+            info['project_name'],
+            position, 1, seq, seq)
+
+def from_record(record):
+    """reminders table row -> normalized reminder dict"""
+    due = parse_due(record['due'])[0] if record['due_status'] == DUE_OK else None
+    return {
+        'title': record['title'],
+        'list': record['list'],
+        'id': record['id'],
+        'flagged': bool(record['flagged']),
+        'completed': bool(record['completed']),
+        'priority': record['priority'],
+        'due': due,
+        'due_status': record['due_status']
+    }
+
+def ingest(conn, source_csv, rows=None):
+    """Upsert one export; returns (export seq, rows ingested) or (seq, 0) if already current"""
+    digest = file_sha256(source_csv)
+    latest = conn.execute('SELECT seq, sha256 FROM exports ORDER BY seq DESC LIMIT 1').fetchone()
+    if latest is not None and latest['sha256'] == digest:
+        return latest['seq'], 0
+
+    rows = rows if rows is not None else read_reminders(source_csv)
+    with conn:
+        seq = conn.execute(
+            'INSERT INTO exports (sha256, source, rows, ingested_at) VALUES (?, ?, 0, ?)',
+            (digest, str(source_csv), datetime.now().isoformat())).lastrowid
+        seen_ids = set()
+        records = (to_record(row, position, seq, seen_ids) for position, row in enumerate(rows))
+        updates = ', '.join(f"{col} = excluded.{col}" for col in COLUMNS if col not in ('key', 'first_seen'))
+        conn.executemany(
+            f"INSERT INTO reminders ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+            f"ON CONFLICT(key) DO UPDATE SET {updates}", records)
+        count = conn.execute('SELECT COUNT(*) FROM reminders WHERE last_seen = ?', (seq,)).fetchone()[0]
+        # Reminders missing from this export stay as history
+        conn.execute('UPDATE reminders SET present = 0 WHERE present = 1 AND last_seen != ?', (seq,))
+        conn.execute('UPDATE exports SET rows = ? WHERE seq = ?', (count, seq))
+    return seq, count
+
+def query(conn, list_name=None, start=None, end=None, project=None, include_completed=False,
+          include_history=False):
+    """Reminders matching the filters, in export order; dates are [start, end)"""
+    clauses, params = [], []
+    if not include_history:
+        clauses.append('present = 1')
+    if not include_completed:
+        clauses.append('completed = 0')
+    if list_name is not None:
+        clauses.append('list = ?')
+        params.append(list_name)
+    if start is not None:
+        clauses.append('due_date >= ?')
+        params.append(start.isoformat())
+    if end is not None:
+        clauses.append('due_date < ?')
+        params.append(end.isoformat())
+    if project is not None:
+        clauses.append('project_name = ?')
+        params.append(project)
+    where = ' AND '.join(clauses) or '1'
+    return conn.execute(f'SELECT * FROM reminders WHERE {where} ORDER BY position', params)
+
+def build_views(conn, data_dir, today=None, pretty=False, generations=True):
+    """Write the four views from indexed queries on the store
+
+    With generations=True they are published together as one generation
+    (view_publisher.py); generations=False writes them in place.
+    """
+    today = today or clock.today()
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    daily = DailyView(today)
+    yesterday = (today - timedelta(days=1)).isoformat()
+    for record in conn.execute(
+            'SELECT * FROM reminders WHERE present = 1 AND due_date IN (?, ?) ORDER BY position',
+            (yesterday, today.isoformat())):
+        daily.add(from_record(record))
+    # The daily stats cover every row of the export, not just today's
+    stats = conn.execute(
+        'SELECT COUNT(*), SUM(due_status = ?), SUM(due_status IN (?, ?)) FROM reminders WHERE present = 1',
+        (DUE_OK, DUE_ERROR, DUE_INVALID)).fetchone()
+    daily.total_processed, daily.valid_dates, daily.error_dates = (value or 0 for value in stats)
+
+    backlog = BacklogView(today)
+    for record in query(conn):
+        backlog.add(from_record(record))
+
+    projects = ProjectView(today)
+    for record in conn.execute(
+            'SELECT * FROM reminders WHERE present = 1 AND completed = 0 AND is_project = 1 ORDER BY position'):
+        projects.add(from_record(record))
+
+    week = WeekView(today)
+    for record in query(conn, start=today, end=today + timedelta(days=8)):
+        week.add(from_record(record))
+
+    publisher = ViewPublisher(data_dir) if generations else None
+    out_dir = publisher.stage() if publisher else data_dir
+    try:
+        for name, view in (('daily.json', daily), ('backlog.json', backlog),
+                           ('projects.json', projects), ('week.json', week)):
+            write_view(view.build(), out_dir / name, pretty=pretty)
+            print(view.summary())
+        if publisher:
+            print(f"📦 Published generation {publisher.publish(out_dir)}")
+    except BaseException:
+        if publisher:
+            publisher.discard(out_dir)
+        raise
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite reminder store")
+    parser.add_argument('--db', default=str(DEFAULT_DB))
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest_cmd = commands.add_parser('ingest', help="upsert an export into the store")
+    ingest_cmd.add_argument('source_csv')
+
+    build_cmd = commands.add_parser('build', help="write the views from the store")
+    build_cmd.add_argument('data_dir')
+    build_cmd.add_argument('--pretty', action='store_true')
+    build_cmd.add_argument('--in-place', action='store_true', help="write into data_dir without publishing a generation")
+    build_cmd.add_argument('--as-of', type=clock.parse_as_of,
+                           help="build the views of this day (YYYY-MM-DD or +N/-N days)")
+
+    query_cmd = commands.add_parser('query', help="print matching reminders as JSON lines")
+    query_cmd.add_argument('--list', dest='list_name')
+    query_cmd.add_argument('--from', dest='start', type=date.fromisoformat)
+    query_cmd.add_argument('--to', dest='end', type=date.fromisoformat, help="exclusive")
+    query_cmd.add_argument('--project')
+    query_cmd.add_argument('--completed', action='store_true', help="include completed reminders")
+    query_cmd.add_argument('--history', action='store_true', help="include reminders no longer exported")
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+
+    if args.command == 'ingest':
+        seq, count = ingest(conn, args.source_csv)
+        if count:
+            print(f"✅ Ingested export #{seq}: {count} reminders")
+        else:
+            print(f"✅ Export #{seq} already current; nothing to ingest")
+    elif args.command == 'build':
+        if args.as_of:
+            clock.set_as_of(args.as_of)
+        build_views(conn, args.data_dir, pretty=args.pretty, generations=not args.in_place)
+    else:
+        for record in query(conn, args.list_name, args.start, args.end, args.project,
+                            include_completed=args.completed, include_history=args.history):
+            print(json.dumps({key: record[key] for key in record.keys()}, ensure_ascii=False))
+    sys.exit(0)
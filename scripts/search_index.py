@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+search_index.py
+Compact inverted index over reminder titles and lists (search_index.json).
+
+Responsibility:
+- Tokenize open reminders' titles and list names into lowercase words
+- Postings are ascending integer ids into one shared item table,
+  delta-encoded on disk; terms are sorted so a prefix is one bisect range
+- SearchView: a view accumulator like the others, so build_all_views
+  patches it from the row diff instead of re-tokenizing every reminder
+- SearchIndex: query side for the local server; every query word is a
+  prefix, and matches come back in export order
+
+Usage:
+  python3 search_index.py build <source_csv> <output_json>
+  python3 search_index.py query <search_index_json> <text> [--limit N]
+"""
+
+import argparse
+import json
+import re
+import sys
+from bisect import bisect_left
+from itertools import accumulate, chain, islice
+
+import clock
+from view_writer import write_view
+from nova_csv import read_reminders, DUE_OK
+
+SEARCH_INDEX_VERSION = 1
+
+# Term ranges (query words) whose item ids are kept between queries
+RANGE_CACHE_SIZE = 256
+
+# Results returned when the caller gives no limit
+DEFAULT_LIMIT = 20
+
+_WORD = re.compile(r'\w+')
+
+# Sorts after any term that starts with a given prefix
+_PREFIX_END = '\U0010ffff'
+
+def tokenize(text):
+    """Distinct lowercase words of text, in order"""
+    return list(dict.fromkeys(_WORD.findall(text.lower())))
+
+def delta_encode(ids):
+    return [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+
+class SearchView:
+    """Accumulates open reminders and their tokens one at a time"""
+
+    def __init__(self, today=None):
+        self.today = today
+        self.entries = []   # (title, list, id, dueISO or '', tokens)
+        self.term_count = 0
+
+    def add(self, row):
+        """Feed one normalized reminder into the view"""
+        if row['completed']:
+            return
+        due_iso = row['due'].iso if row['due_status'] == DUE_OK else ''
+        tokens = tokenize(f"{row['title']} {row['list']}")
+        self.entries.append((row['title'], row['list'], row['id'], due_iso, tokens))
+
+    def load(self, output):
+        """Restore entries from a previous search_index.json; False if unusable"""
+        if output.get('version') != SEARCH_INDEX_VERSION:
+            return False
+        # Invert the postings instead of re-tokenizing every title
+        tokens = [[] for _ in output['items']]
+        for term, deltas in zip(output['terms'], output['postings']):
+            for num in accumulate(deltas):
+                tokens[num].append(term)
+        lists = output['lists']
+        self.entries = [(title, lists[list_index], reminder_id, due_iso, item_tokens)
+                        for (title, list_index, reminder_id, due_iso), item_tokens
+                        in zip(output['items'], tokens)]
+        return True
+
+    def remove_rows(self, rows):
+        """Undo add() for reminders that left or changed in the export"""
+        ids = {row['id'] for row in rows}
+        self.entries = [entry for entry in self.entries if entry[2] not in ids]
+
+    def reorder(self, positions):
+        """Put entries back in export order, so item ids match a full rebuild"""
+        self.entries.sort(key=lambda entry: positions[entry[2]])
+
+    def merge(self, other):
+        """Absorb a view built from the rows that follow this one's"""
+        self.entries.extend(other.entries)
+
+    def build(self):
+        """Return the search_index.json structure"""
+        list_index = {}
+        items = []
+        postings = {}
+        for num, (title, list_name, reminder_id, due_iso, tokens) in enumerate(self.entries):
+            slot = list_index.setdefault(list_name, len(list_index))
+            items.append([title, slot, reminder_id, due_iso])
+            for token in tokens:
+                postings.setdefault(token, []).append(num)
+
+        terms = sorted(postings)
+        self.term_count = len(terms)
+        return {
+            'view': 'search',
+            'version': SEARCH_INDEX_VERSION,
+            'count': len(items),
+            'lists': list(list_index),
+            'items': items,
+            'terms': terms,
+            'postings': [delta_encode(postings[term]) for term in terms],
+            'generated_at': clock.now().isoformat()
+        }
+
+    def summary(self):
+        return f"✅ Search index: {len(self.entries)} reminders, {self.term_count} terms"
+
+class SearchIndex:
+    """Prefix queries over a loaded search_index.json"""
+
+    def __init__(self, output):
+        if output.get('version') != SEARCH_INDEX_VERSION:
+            raise ValueError(f"unsupported search index version: {output.get('version')}")
+        self.lists = output['lists']
+        self.items = output['items']
+        self.terms = output['terms']
+        self.postings = [list(accumulate(deltas)) for deltas in output['postings']]
+        # cumulative[i] = postings held by terms[:i], so a prefix range's size is O(1)
+        self.cumulative = [0] + list(accumulate(len(ids) for ids in self.postings))
+        self.range_cache = {}      # (lo, hi) term range -> (ids, id set), oldest first
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.items)
+
+    def _prefix_range(self, prefix):
+        lo = bisect_left(self.terms, prefix)
+        return lo, bisect_left(self.terms, prefix + _PREFIX_END, lo)
+
+    def _range_ids(self, lo, hi):
+        """(ascending ids, id set) of items with a term in [lo, hi), cached
+
+        Prefixes typed one key at a time repeat across queries, so a
+        short prefix's union is paid for once.
+        """
+        key = (lo, hi)
+        found = self.range_cache.pop(key, None)
+        if found is None:
+            if hi - lo == 1:
+                ids = self.postings[lo]
+                found = (ids, frozenset(ids))
+            else:
+                members = frozenset(chain.from_iterable(self.postings[lo:hi]))
+                found = (sorted(members), members)
+            if len(self.range_cache) >= RANGE_CACHE_SIZE:
+                del self.range_cache[next(iter(self.range_cache))]
+        self.range_cache[key] = found
+        return found
+
+    def search(self, text, limit=DEFAULT_LIMIT):
+        """Item ids (export order) whose words start with every query word"""
+        ranges = []
+        for prefix in tokenize(text):
+            lo, hi = self._prefix_range(prefix)
+            if lo == hi:
+                return []
+            ranges.append((self.cumulative[hi] - self.cumulative[lo], lo, hi))
+        if not ranges:
+            return []
+
+        # Walk the rarest word's ids in order; set-membership filters run
+        # at C speed and stop as soon as limit items have matched
+        ranges.sort()
+        _, lo, hi = ranges[0]
+        matches = iter(self._range_ids(lo, hi)[0])
+        for _, lo, hi in ranges[1:]:
+            matches = filter(self._range_ids(lo, hi)[1].__contains__, matches)
+        return list(islice(matches, limit))
+
+    def item(self, num):
+        title, list_index, reminder_id, due_iso = self.items[num]
+        item = {'title': title, 'list': self.lists[list_index], 'id': reminder_id}
+        if due_iso:
+            item['dueISO'] = due_iso
+        return item
+
+    def query(self, text, limit=DEFAULT_LIMIT):
+        """Matching items as dicts, at most limit of them"""
+        return [self.item(num) for num in self.search(text, limit)]
+
+def build_search_index(source_csv, output_json):
+    """Build search_index.json from Nova Scheduling CSV"""
+
+    view = SearchView()
+
+    try:
+        for row in read_reminders(source_csv):
+            view.add(row)
+
+        # Write output
+        write_view(view.build(), output_json)
+
+        print(view.summary())
+        return True
+
+    except Exception as e:
+        print(f"❌ Error building search index: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reminder title/list search index")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_cmd = commands.add_parser('build', help="write search_index.json from an export")
+    build_cmd.add_argument('source_csv')
+    build_cmd.add_argument('output_json')
+
+    query_cmd = commands.add_parser('query', help="print matching reminders as JSON lines")
+    query_cmd.add_argument('index_json')
+    query_cmd.add_argument('text')
+    query_cmd.add_argument('--limit', type=int, default=DEFAULT_LIMIT)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        sys.exit(0 if build_search_index(args.source_csv, args.output_json) else 1)
+
+    index = SearchIndex.from_file(args.index_json)
+    for item in index.query(args.text, args.limit):
+        print(json.dumps(item, ensure_ascii=False))
+    sys.exit(0)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+site_snapshot.py
+Content-addressed, incremental snapshots of the site and its data views.
+
+Responsibility:
+- Split every file into chunks stored once under their SHA-256
+  (zlib-compressed, Backups/snapshots/objects/ab/cdef...)
+- One small JSON manifest per snapshot: path -> size, mtime, mode, chunks
+- Files whose size/mtime match the previous snapshot are not even read,
+  and a chunk already in the store is never compressed or written again
+- list, restore (whole tree or some paths) and prune (old manifests plus
+  objects nothing references any more)
+- create prunes to the newest DEFAULT_KEEP snapshots afterwards, so the
+  refresh pipeline and pull_reminders_local.sh keep the store bounded
+
+Usage:
+  python3 site_snapshot.py create [--label TEXT] [--keep N]
+  python3 site_snapshot.py list
+  python3 site_snapshot.py restore <snapshot> <dest_dir> [--path PREFIX ...]
+  python3 site_snapshot.py prune [--keep N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+SITE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_STORE = SITE_DIR / 'Backups' / 'snapshots'
+MANIFEST_VERSION = 1
+
+# Snapshots kept by create and prune unless --keep says otherwise
+DEFAULT_KEEP = 50
+
+CHUNK_SIZE = 1 << 20
+COMPRESS_LEVEL = 6
+
+# Never snapshotted: VCS data, the backups themselves, caches, and the
+# published-generation internals (data/<name> links already cover the
+# current generation)
+EXCLUDED_NAMES = frozenset(('.git', '__pycache__', '.cache', '.DS_Store'))
+EXCLUDED_PATHS = frozenset(('Backups', 'data/generations', 'data/current'))
+
+def iter_site_files(root):
+    """(relative posix path, absolute path) of every file to snapshot, sorted"""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root, followlinks=True):
+        rel_dir = os.path.relpath(dirpath, root)
+        rel_dir = '' if rel_dir == '.' else rel_dir.replace(os.sep, '/') + '/'
+        dirnames[:] = [name for name in dirnames
+                       if name not in EXCLUDED_NAMES and rel_dir + name not in EXCLUDED_PATHS]
+        for name in filenames:
+            rel_path = rel_dir + name
+            # '._*' are macOS resource forks; '*.tmp' are writes in progress
+            if (name in EXCLUDED_NAMES or rel_path in EXCLUDED_PATHS
+                    or name.startswith('._') or name.endswith('.tmp')):
+                continue
+            found.append((rel_path, os.path.join(dirpath, name)))
+    return sorted(found)
+
+class SnapshotStore:
+    """Chunk objects plus one manifest per snapshot"""
+
+    def __init__(self, store_dir=DEFAULT_STORE):
+        self.store_dir = Path(store_dir)
+        self.objects_dir = self.store_dir / 'objects'
+        self.manifests_dir = self.store_dir / 'manifests'
+
+    def object_path(self, digest):
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def put_chunk(self, chunk):
+        """Store a chunk unless present; returns (digest, bytes written)"""
+        digest = hashlib.sha256(chunk).hexdigest()
+        path = self.object_path(digest)
+        if path.exists():
+            return digest, 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(chunk, COMPRESS_LEVEL)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return digest, len(data)
+
+    def get_chunk(self, digest):
+        chunk = zlib.decompress(self.object_path(digest).read_bytes())
+        if hashlib.sha256(chunk).hexdigest() != digest:
+            raise ValueError(f"corrupt chunk {digest}")
+        return chunk
+
+    def snapshot_ids(self):
+        """Snapshot ids, oldest first"""
+        if not self.manifests_dir.is_dir():
+            return []
+        return sorted(path.stem for path in self.manifests_dir.glob('*.json'))
+
+    def load_manifest(self, snapshot_id):
+        with open(self.manifests_dir / f"{snapshot_id}.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def resolve(self, snapshot_id):
+        """A full id, 'latest', or a unique prefix"""
+        ids = self.snapshot_ids()
+        if snapshot_id == 'latest' and ids:
+            return ids[-1]
+        matches = [found for found in ids if found.startswith(snapshot_id)]
+        if len(matches) != 1:
+            raise KeyError(f"no unique snapshot matches {snapshot_id!r}")
+        return matches[0]
+
+    def create(self, root=SITE_DIR, label=None, rehash=False):
+        """Snapshot root; returns the manifest"""
+        started = time.perf_counter()
+        ids = self.snapshot_ids()
+        previous = self.load_manifest(ids[-1])['files'] if ids and not rehash else {}
+
+        files = {}
+        read = stored_bytes = new_chunks = 0
+        for rel_path, path in iter_site_files(root):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue    # dangling link or removed mid-walk
+            entry = previous.get(rel_path)
+            if entry is not None and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+                files[rel_path] = entry
+                continue
+
+            chunks = []
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest, written = self.put_chunk(chunk)
+                    chunks.append(digest)
+                    stored_bytes += written
+                    new_chunks += written > 0
+            read += 1
+            files[rel_path] = {
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'mode': st.st_mode & 0o777,
+                'chunks': chunks
+            }
+
+        now = datetime.now()
+        snapshot_id = now.strftime('%Y%m%d-%H%M%S')
+        suffix = 1
+        while snapshot_id in ids:
+            suffix += 1
+            snapshot_id = f"{now.strftime('%Y%m%d-%H%M%S')}-{suffix}"
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'id': snapshot_id,
+            'created_at': now.isoformat(),
+            'label': label,
+            'root': str(root),
+            'file_count': len(files),
+            'total_bytes': sum(entry['size'] for entry in files.values()),
+            'files_read': read,
+            'new_chunks': new_chunks,
+            'stored_bytes': stored_bytes,
+            'seconds': round(time.perf_counter() - started, 4),
+            'files': files
+        }
+
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        path = self.manifests_dir / f"{snapshot_id}.json"
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(manifest, ensure_ascii=False, separators=(',', ':')))
+        os.replace(tmp_path, path)
+        return manifest
+
+    def restore(self, snapshot_id, dest_dir, prefixes=()):
+        """Write a snapshot's files (or those under prefixes) into dest_dir; returns the count"""
+        manifest = self.load_manifest(self.resolve(snapshot_id))
+        dest_dir = Path(dest_dir)
+        restored = 0
+        for rel_path, entry in manifest['files'].items():
+            if prefixes and not any(rel_path == prefix or rel_path.startswith(prefix.rstrip('/') + '/')
+                                    for prefix in prefixes):
+                continue
+            path = dest_dir / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.restore-tmp")
+            with open(tmp_path, 'wb') as f:
+                for digest in entry['chunks']:
+                    f.write(self.get_chunk(digest))
+            os.chmod(tmp_path, entry['mode'])
+            if path.is_symlink():
+                path.unlink()
+            os.replace(tmp_path, path)
+            os.utime(path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+            restored += 1
+        return restored
+
+    def prune(self, keep):
+        """Keep the newest `keep` snapshots and the objects they use; returns (snapshots, objects) removed"""
+        ids = self.snapshot_ids()
+        doomed = ids[:-keep] if keep > 0 else ids
+        for snapshot_id in doomed:
+            (self.manifests_dir / f"{snapshot_id}.json").unlink()
+
+        live = set()
+        for snapshot_id in self.snapshot_ids():
+            for entry in self.load_manifest(snapshot_id)['files'].values():
+                live.update(entry['chunks'])
+        removed_objects = 0
+        if self.objects_dir.is_dir():
+            for path in self.objects_dir.glob('*/*'):
+                if path.parent.name + path.name not in live:
+                    path.unlink()
+                    removed_objects += 1
+        return len(doomed), removed_objects
+
+def format_bytes(count):
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Content-addressed site snapshots")
+    parser.add_argument('--store', default=str(DEFAULT_STORE), help="snapshot store (default: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    create_cmd = commands.add_parser('create', help="snapshot the site and its data views")
+    create_cmd.add_argument('--root', default=str(SITE_DIR))
+    create_cmd.add_argument('--label')
+    create_cmd.add_argument('--rehash', action='store_true',
+                            help="read every file even if size/mtime are unchanged")
+    create_cmd.add_argument('--keep', type=int, default=DEFAULT_KEEP,
+                            help="then prune to the newest N snapshots; 0 keeps all (default: %(default)s)")
+
+    commands.add_parser('list', help="list snapshots, oldest first")
+
+    restore_cmd = commands.add_parser('restore', help="write a snapshot's files into a directory")
+    restore_cmd.add_argument('snapshot', help="snapshot id, unique prefix, or 'latest'")
+    restore_cmd.add_argument('dest_dir')
+    restore_cmd.add_argument('--path', dest='prefixes', action='append', default=[],
+                             help="only files at or under this relative path (repeatable)")
+
+    prune_cmd = commands.add_parser('prune', help="drop old snapshots and unreferenced chunks")
+    prune_cmd.add_argument('--keep', type=int, default=DEFAULT_KEEP, help="default: %(default)s")
+
+    args = parser.parse_args()
+    store = SnapshotStore(args.store)
+
+    try:
+        if args.command == 'create':
+            manifest = store.create(args.root, label=args.label, rehash=args.rehash)
+            print(f"💾 Snapshot {manifest['id']}: {manifest['file_count']} files "
+                  f"({format_bytes(manifest['total_bytes'])}), {manifest['files_read']} read, "
+                  f"{manifest['new_chunks']} new chunks ({format_bytes(manifest['stored_bytes'])} stored) "
+                  f"in {manifest['seconds']:.3f}s")
+            if 0 < args.keep < len(store.snapshot_ids()):
+                snapshots, objects = store.prune(args.keep)
+                print(f"🧹 Pruned {snapshots} snapshots and {objects} unreferenced chunks (keeping {args.keep})")
+        elif args.command == 'list':
+            for snapshot_id in store.snapshot_ids():
+                manifest = store.load_manifest(snapshot_id)
+                label = f"  {manifest['label']}" if manifest.get('label') else ''
+                print(f"{snapshot_id}  {manifest['file_count']:5d} files  "
+                      f"{format_bytes(manifest['total_bytes']):>9}  "
+                      f"+{format_bytes(manifest['stored_bytes'])}{label}")
+        elif args.command == 'restore':
+            count = store.restore(args.snapshot, args.dest_dir, args.prefixes)
+            print(f"✅ Restored {count} files into {args.dest_dir}")
+        else:
+            snapshots, objects = store.prune(args.keep)
+            print(f"🧹 Pruned {snapshots} snapshots and {objects} unreferenced chunks")
+    except (KeyError, OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+snapshot_cache.py
+Persistent cache of parsed Nova Scheduling exports.
+
+Responsibility:
+- Key each CSV by its SHA-256 content hash (size/mtime short-circuit the hash)
+- Store normalized rows column by column in a compact pickle
+- Skip parsing entirely when the tagger produced an identical export
+- Evict least recently used snapshots beyond a fixed count
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from array import array
+from pathlib import Path
+
+from nova_csv import read_reminders
+from due_dates import (due_from_seconds, due_to_seconds,
+                       DUE_OK, DUE_MISSING, DUE_ERROR, DUE_INVALID)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'snapshots'
+FORMAT_VERSION = 1
+INDEX_NAME = 'index.json'
+
+DUE_STATUSES = (DUE_OK, DUE_MISSING, DUE_ERROR, DUE_INVALID)
+DUE_STATUS_CODES = {status: code for code, status in enumerate(DUE_STATUSES)}
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hash a file without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def rows_to_columns(rows):
+    """Pack normalized rows into compact per-field columns"""
+    columns = {
+        'title': [], 'list': [], 'id': [],
+        'flagged': bytearray(), 'completed': bytearray(),
+        'priority': array('q'), 'due': array('q'), 'due_status': bytearray()
+    }
+    for row in rows:
+        columns['title'].append(row['title'])
+        columns['list'].append(row['list'])
+        columns['id'].append(row['id'])
+        columns['flagged'].append(row['flagged'])
+        columns['completed'].append(row['completed'])
+        columns['priority'].append(row['priority'])
+        # Seconds since 1970-01-01 (naive local time, same as the CSV)
+        due = row['due']
+        columns['due'].append(due_to_seconds(due) if due else 0)
+        columns['due_status'].append(DUE_STATUS_CODES[row['due_status']])
+    return columns
+
+def columns_to_rows(columns):
+    """Rebuild normalized row dicts from packed columns"""
+    rows = []
+    for title, list_name, row_id, flagged, completed, priority, due, status in zip(
+            columns['title'], columns['list'], columns['id'], columns['flagged'],
+            columns['completed'], columns['priority'], columns['due'], columns['due_status']):
+        due_status = DUE_STATUSES[status]
+        rows.append({
+            'title': title,
+            'list': list_name,
+            'id': row_id,
+            'flagged': bool(flagged),
+            'completed': bool(completed),
+            'priority': priority,
+            'due': due_from_seconds(due) if due_status == DUE_OK else None,
+            'due_status': due_status
+        })
+    return rows
+
+class SnapshotCache:
+    """Content-addressed store of parsed CSV snapshots with LRU eviction"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_snapshots=8):
+        self.cache_dir = Path(cache_dir)
+        self.max_snapshots = max_snapshots
+        self.index_path = self.cache_dir / INDEX_NAME
+        self.index = self._load_index()
+        self.hits = 0
+        self.misses = 0
+        self.last_digest = None
+        # Rows of the most recent snapshots, kept warm for long-lived callers
+        self._warm = {}
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == FORMAT_VERSION:
+                return index
+        except (OSError, ValueError):
+            pass
+        return {'version': FORMAT_VERSION, 'snapshots': {}, 'files': {}}
+
+    def _save_index(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _snapshot_path(self, digest):
+        return self.cache_dir / f"{digest}.snap"
+
+    def content_key(self, source_csv):
+        """Return the content hash, trusting size/mtime when unchanged"""
+        source_csv = os.path.abspath(source_csv)
+        st = os.stat(source_csv)
+        known = self.index['files'].get(source_csv)
+        if known and known['size'] == st.st_size and known['mtime_ns'] == st.st_mtime_ns:
+            return known['sha256']
+        digest = file_sha256(source_csv)
+        self.index['files'][source_csv] = {
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'sha256': digest
+        }
+        return digest
+
+    def _read_snapshot(self, digest):
+        try:
+            with open(self._snapshot_path(digest), 'rb') as f:
+                payload = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if payload.get('version') != FORMAT_VERSION:
+            return None
+        return columns_to_rows(payload['columns'])
+
+    def _write_snapshot(self, digest, rows):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._snapshot_path(digest)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': FORMAT_VERSION, 'columns': rows_to_columns(rows)},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def _evict(self):
+        snapshots = self.index['snapshots']
+        stale = sorted(snapshots, key=lambda d: snapshots[d]['last_used'])
+        for digest in stale[:max(0, len(snapshots) - self.max_snapshots)]:
+            del snapshots[digest]
+            try:
+                self._snapshot_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+        live = set(snapshots)
+        self.index['files'] = {path: info for path, info in self.index['files'].items()
+                               if info['sha256'] in live}
+
+    def _remember(self, digest, rows):
+        self._warm.pop(digest, None)
+        self._warm[digest] = rows
+        while len(self._warm) > 2:
+            del self._warm[next(iter(self._warm))]
+
+    def rows_for_digest(self, digest):
+        """Rows of an earlier snapshot, or None if it was evicted"""
+        if digest in self._warm:
+            return self._warm[digest]
+        if digest not in self.index['snapshots']:
+            return None
+        return self._read_snapshot(digest)
+
+    def load_rows(self, source_csv):
+        """Return normalized rows for a CSV, parsing only on a cache miss"""
+        digest = self.last_digest = self.content_key(source_csv)
+        entry = self.index['snapshots'].get(digest)
+        rows = self.rows_for_digest(digest) if entry else None
+
+        if rows is None:
+            self.misses += 1
+            rows = list(read_reminders(source_csv))
+            self._write_snapshot(digest, rows)
+            entry = self.index['snapshots'][digest] = {'rows': len(rows)}
+        else:
+            self.hits += 1
+
+        entry['last_used'] = time.time()
+        self._remember(digest, rows)
+        self._evict()
+        self._save_index()
+        return rows
+
+def load_reminders(source_csv, cache_dir=DEFAULT_CACHE_DIR):
+    """Normalized rows for a CSV via the default snapshot cache"""
+    return SnapshotCache(cache_dir).load_rows(source_csv)
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python3 snapshot_cache.py <source_csv> [cache_dir]")
+        sys.exit(1)
+
+    cache = SnapshotCache(sys.argv[2] if len(sys.argv) == 3 else DEFAULT_CACHE_DIR)
+    rows = cache.load_rows(sys.argv[1])
+    status = 'hit' if cache.hits else 'miss'
+    print(f"✅ Snapshot {status}: {len(rows)} rows cached in {cache.cache_dir}")
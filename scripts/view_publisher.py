@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+view_publisher.py
+Atomic, double-buffered publication of view generations.
+
+Responsibility:
+- Each build writes a complete set of views into a staging directory
+  (data/generations/.staging-<pid>) while readers keep the current set
+- Publishing fsyncs the staged files, renames the directory to the next
+  generation (data/generations/g000042) and flips the data/current
+  symlink with one atomic rename, so every view changes together
+- data/<name> entries are symlinks through data/current, so static
+  servers and existing URLs (data/daily.json) always see one generation
+- Old generations beyond a small keep count, and staging directories of
+  builds that died, are garbage-collected after each flip
+
+Layout:
+  data/current -> generations/g000042
+  data/daily.json -> current/daily.json       (one link per top-level entry)
+  data/generations/g000042/{daily.json, ..., manifest.json}
+
+Usage:
+  python3 view_publisher.py <data_dir>            # show generations
+  python3 view_publisher.py <data_dir> --gc       # also collect old ones
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+
+GENERATIONS_DIR = 'generations'
+CURRENT_LINK = 'current'
+MANIFEST_FILE = 'manifest.json'
+STAGING_PREFIX = '.staging-'
+
+# Generations kept on disk, the current one included; readers that
+# resolved an older generation have this many flips to finish reading
+KEEP_GENERATIONS = 3
+
+def generation_name(number):
+    return f"g{number:06d}"
+
+def generation_number(name):
+    """Number of a generation directory name, or None"""
+    if len(name) == 7 and name[0] == 'g' and name[1:].isdigit():
+        return int(name[1:])
+    return None
+
+def fsync_path(path, directory=False):
+    fd = os.open(path, os.O_RDONLY | (getattr(os, 'O_DIRECTORY', 0) if directory else 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def fsync_tree(root):
+    """fsync every file and directory under root, deepest first"""
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        for name in filenames:
+            fsync_path(os.path.join(dirpath, name))
+        fsync_path(dirpath, directory=True)
+
+def replace_with_symlink(target, link_path):
+    """Atomically point link_path at target (replacing a file or old link)"""
+    tmp_link = link_path.with_name(f".{link_path.name}.link-tmp")
+    try:
+        tmp_link.unlink()
+    except FileNotFoundError:
+        pass
+    os.symlink(target, tmp_link)
+    if link_path.is_dir() and not link_path.is_symlink():
+        # A directory left by an in-place build: one non-atomic migration
+        shutil.rmtree(link_path)
+    os.replace(tmp_link, link_path)
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class ViewPublisher:
+    """Stages, publishes and collects view generations under data_dir"""
+
+    def __init__(self, data_dir, keep=KEEP_GENERATIONS):
+        self.data_dir = Path(data_dir).resolve()
+        self.generations_dir = self.data_dir / GENERATIONS_DIR
+        self.keep = max(keep, 1)
+
+    def current(self):
+        """Directory of the published generation, or None before the first one"""
+        link = self.data_dir / CURRENT_LINK
+        if not link.is_symlink():
+            return None
+        target = link.resolve()
+        return target if target.is_dir() else None
+
+    def generations(self):
+        """(number, path) of every published generation, oldest first"""
+        found = []
+        if self.generations_dir.is_dir():
+            for path in self.generations_dir.iterdir():
+                number = generation_number(path.name)
+                if number is not None and path.is_dir():
+                    found.append((number, path))
+        return sorted(found)
+
+    def stage(self, reuse=()):
+        """Fresh staging directory for the next generation
+
+        Subdirectories named in reuse are pre-filled with hard links to the
+        current generation's files, so shard writers that skip unchanged
+        files keep skipping them. Every writer replaces files by rename,
+        never in place, so a published generation is never modified.
+        """
+        self.generations_dir.mkdir(parents=True, exist_ok=True)
+        staging = self.generations_dir / f"{STAGING_PREFIX}{os.getpid()}"
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir()
+
+        current = self.current()
+        for name in reuse:
+            source = current / name if current else None
+            if source is None or not source.is_dir():
+                continue
+            for path in source.rglob('*'):
+                destination = staging / name / path.relative_to(source)
+                if path.is_dir():
+                    destination.mkdir(parents=True, exist_ok=True)
+                else:
+                    destination.parent.mkdir(parents=True, exist_ok=True)
+                    os.link(path, destination)
+        return staging
+
+    def discard(self, staging):
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def publish(self, staging):
+        """Make a staged directory the current generation; returns its number"""
+        staging = Path(staging)
+        files = {}
+        for path in sorted(staging.rglob('*')):
+            if path.is_file():
+                files[path.relative_to(staging).as_posix()] = path.stat().st_size
+
+        generations = self.generations()
+        number = generations[-1][0] + 1 if generations else 1
+        manifest = {
+            'generation': number,
+            'published_at': datetime.now().isoformat(),
+            'files': files
+        }
+        while True:
+            manifest['generation'] = number
+            with open(staging / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            fsync_tree(staging)
+            try:
+                # Fails if a concurrent build took this number first
+                os.rename(staging, self.generations_dir / generation_name(number))
+                break
+            except OSError:
+                if not (self.generations_dir / generation_name(number)).exists():
+                    raise
+                number += 1
+        fsync_path(self.generations_dir, directory=True)
+
+        generation_dir = self.generations_dir / generation_name(number)
+        replace_with_symlink(f"{GENERATIONS_DIR}/{generation_name(number)}", self.data_dir / CURRENT_LINK)
+        self.link_entries(generation_dir)
+        fsync_path(self.data_dir, directory=True)
+        self.collect()
+        return number
+
+    def link_entries(self, generation_dir):
+        """data/<name> -> current/<name> for each top-level entry of a generation"""
+        names = {path.name for path in generation_dir.iterdir()}
+        for name in names:
+            link_path = self.data_dir / name
+            target = f"{CURRENT_LINK}/{name}"
+            if link_path.is_symlink() and os.readlink(link_path) == target:
+                continue
+            replace_with_symlink(target, link_path)
+
+        # Links to entries the new generation no longer has
+        prefix = f"{CURRENT_LINK}/"
+        for link_path in self.data_dir.iterdir():
+            if link_path.is_symlink():
+                target = os.readlink(link_path)
+                if target.startswith(prefix) and target[len(prefix):] not in names:
+                    link_path.unlink()
+
+    def collect(self):
+        """Remove generations beyond the keep count and dead builds' staging dirs"""
+        current = self.current()
+        removed = 0
+        for number, path in self.generations()[:-self.keep]:
+            if path != current:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        if self.generations_dir.is_dir():
+            for path in self.generations_dir.glob(f"{STAGING_PREFIX}*"):
+                pid = path.name[len(STAGING_PREFIX):]
+                if not pid.isdigit() or not pid_alive(int(pid)):
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+        return removed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect published view generations")
+    parser.add_argument('data_dir')
+    parser.add_argument('--gc', action='store_true', help="remove old generations and dead staging dirs")
+    parser.add_argument('--keep', type=int, default=KEEP_GENERATIONS)
+    args = parser.parse_args()
+
+    publisher = ViewPublisher(args.data_dir, keep=args.keep)
+    if args.gc:
+        print(f"🧹 Removed {publisher.collect()} old generation/staging directories")
+
+    current = publisher.current()
+    for number, path in publisher.generations():
+        marker = '→' if path == current else ' '
+        files = sum(1 for entry in path.rglob('*') if entry.is_file())
+        print(f"{marker} {path.name}  {files} files")
+    if current is None:
+        print("⚠️ No published generation (views are written in place)")
+    sys.exit(0)
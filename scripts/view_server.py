@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+view_server.py
+Local server for the dashboard that keeps the JSON views in memory.
+
+Responsibility:
+- Drop-in replacement for `python3 -m http.server 8080` from the site root
+- data/*.json held in memory with strong ETags; If-None-Match answers 304
+- gzip (and brotli, when the optional `brotli` package is installed)
+  variants computed once per rebuild (in a worker thread), never per request
+- Views are re-read only when a rebuild changes their size/mtime
+- With published generations (view_publisher.py) views are read from the
+  one data/current points at, so a reload swaps in a consistent set
+- /events: Server-Sent Events push of `view-updated` with the pipeline's
+  per-view version (view_versions.json) and compact id diff
+- /api/range?start=YYYY-MM-DD&end=YYYY-MM-DD: items and per-day counts
+  for a date range, answered from a sorted due index (due_index.py) over
+  the snapshot-cached rows of the export the views were built from
+- /api/search?q=words&limit=N: reminders whose title/list words start
+  with every query word, from the in-memory search_index.json
+- Midnight rollover: once daily.json/week.json are for a past day, the
+  pre-rendered next/ copies for the new day are served in their place
+  (and pushed to /events) until the pipeline's next rebuild
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import mimetypes
+import sys
+from collections import namedtuple
+from datetime import date, datetime
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+import clock
+from build_all_views import NEXT_DAY_DIR, NEXT_DAY_VIEWS
+from due_index import DueIndex
+from search_index import SearchIndex, DEFAULT_LIMIT
+from snapshot_cache import SnapshotCache, DEFAULT_CACHE_DIR
+from view_publisher import CURRENT_LINK, GENERATIONS_DIR
+
+SITE_DIR = Path(__file__).resolve().parent.parent
+VERSIONS_FILE = 'view_versions.json'
+SEARCH_FILE = 'search_index.json'
+STATE_FILE = '.build_state.json'
+
+# Longest date range /api/range answers in one request
+MAX_RANGE_DAYS = 400
+
+# Most results /api/search returns in one request
+MAX_SEARCH_LIMIT = 200
+
+# Per-client queue depth; a client this far behind is dropped and reconnects
+MAX_PENDING_EVENTS = 64
+HEARTBEAT_SECONDS = 15
+
+Response = namedtuple('Response', 'status headers body')
+
+REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    503: 'Service Unavailable'
+}
+
+def file_signature(st):
+    # Inode included: hard-linked files carried into a new generation keep it
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+def view_date(body):
+    """Day a daily/week view was built for, or None"""
+    try:
+        output = json.loads(body)
+    except ValueError:
+        return None
+    return output.get('date') or output.get('start_date')
+
+def make_etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+
+def accepted_encodings(accept_encoding):
+    """Codings the client accepts (ignores q-values other than q=0)"""
+    accepted = set()
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding and params.replace(' ', '') not in ('q=0', 'q=0.0'):
+            accepted.add(coding.lower())
+    return accepted
+
+class ViewStore:
+    """In-memory copies of every JSON file under the data directory"""
+
+    def __init__(self, data_dir, min_compress=256):
+        self.data_dir = Path(data_dir)
+        self.min_compress = min_compress
+        self.views = {}    # relative path -> entry dict
+        self.root = self.data_dir   # generation directory the views came from
+        self.aliases = {}  # view name -> next/ name served in its place
+        self.reloads = 0
+
+    def _load(self, name, path, st):
+        body = path.read_bytes()
+        variants = {'identity': body}
+        if len(body) >= self.min_compress:
+            variants['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                variants['br'] = brotli.compress(body)
+        self.reloads += 1
+        return {
+            'signature': file_signature(st),
+            'etag': make_etag(body),
+            'variants': variants,
+            # Only the views that roll over at midnight are parsed
+            'date': view_date(body) if name.rsplit('/', 1)[-1] in NEXT_DAY_VIEWS else None
+        }
+
+    def _paths(self, root):
+        """{name: path} of every servable JSON file under root"""
+        paths = {}
+        if root != self.data_dir:
+            # Files kept beside the generations, e.g. the rolling metrics.json
+            for path in self.data_dir.glob('*.json'):
+                if not path.is_symlink() and not path.name.startswith('.'):
+                    paths[path.name] = path
+        if root.is_dir():
+            for path in root.rglob('*.json'):
+                name = path.relative_to(root).as_posix()
+                parts = name.split('/')
+                if any(part.startswith('.') for part in parts) or parts[0] in (GENERATIONS_DIR, CURRENT_LINK):
+                    continue
+                paths[name] = path
+        return paths
+
+    def refresh(self):
+        """Stat the published generation (or the data dir) and reload changed views; returns changed names"""
+        link = self.data_dir / CURRENT_LINK
+        # Resolved once, so a refresh never mixes views from two generations
+        root = link.resolve() if link.is_symlink() else self.data_dir
+        views = {}
+        changed = []
+        for name, path in self._paths(root).items():
+            try:
+                st = path.stat()
+                entry = self.views.get(name)
+                if entry is None or entry['signature'] != file_signature(st):
+                    entry = self._load(name, path, st)
+                    changed.append(name)
+            except OSError:
+                if root != self.data_dir:
+                    # The generation was collected mid-refresh; retry from the new one
+                    return []
+                # Mid-rebuild; pick it up on the next refresh
+                continue
+            views[name] = entry
+        changed.extend(set(self.views) - set(views))
+        self.views = views
+        self.root = root
+        return changed
+
+    def roll_over(self, today):
+        """Serve next/<name> as <name> once its day has come; returns the names newly switched
+
+        A view is switched only while it is for another day and its next/
+        copy is for today, so the rebuild that follows takes over again.
+        """
+        today = today.isoformat()
+        aliases = {}
+        for name in NEXT_DAY_VIEWS:
+            entry = self.views.get(name)
+            upcoming = self.views.get(f"{NEXT_DAY_DIR}/{name}")
+            if entry and upcoming and entry['date'] != today and upcoming['date'] == today:
+                aliases[name] = f"{NEXT_DAY_DIR}/{name}"
+        switched = [name for name in aliases if name not in self.aliases]
+        self.aliases = aliases
+        return switched
+
+    def get(self, name):
+        return self.views.get(self.aliases.get(name, name))
+
+class ViewServer:
+    """Minimal HTTP/1.1 server (GET/HEAD) over asyncio streams"""
+
+    def __init__(self, site_dir=SITE_DIR, data_dir=None, cache_control='no-cache',
+                 refresh_interval=0.5, cache_dir=DEFAULT_CACHE_DIR):
+        self.site_dir = Path(site_dir).resolve()
+        self.store = ViewStore(data_dir or self.site_dir / 'data')
+        self.cache_dir = cache_dir
+        self.due_index = None      # built on the first /api/range after a rebuild
+        self.search_index = None   # loaded on the first /api/search after a rebuild
+        self.cache_control = cache_control
+        self.refresh_interval = refresh_interval
+        self.subscribers = set()   # one asyncio.Queue per open /events stream
+        self.versions = {}         # view -> version last announced
+        self.event_id = 0
+
+    # Request routing
+
+    def respond(self, method, target, headers):
+        if method not in ('GET', 'HEAD'):
+            return Response(405, {'Allow': 'GET, HEAD'}, b'')
+
+        url = urlsplit(target)
+        path = unquote(url.path)
+        if path == '/api/range':
+            return self.respond_range(parse_qs(url.query), headers)
+        if path == '/api/search':
+            return self.respond_search(parse_qs(url.query), headers)
+        if path.startswith('/data/') and path.endswith('.json'):
+            entry = self.store.get(path[len('/data/'):])
+            if entry is not None:
+                return self.respond_view(entry, headers)
+        return self.respond_static(path, headers)
+
+    def respond_view(self, entry, headers):
+        base = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'ETag': entry['etag'],
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+        if etag_matches(headers.get('if-none-match'), entry['etag']):
+            return Response(304, base, b'')
+
+        variants = entry['variants']
+        accepted = accepted_encodings(headers.get('accept-encoding'))
+        for coding in ('br', 'gzip'):
+            if coding in variants and coding in accepted:
+                return Response(200, dict(base, **{'Content-Encoding': coding}), variants[coding])
+        return Response(200, base, variants['identity'])
+
+    def respond_range(self, params, headers):
+        try:
+            start = date.fromisoformat(params['start'][0])
+            end = date.fromisoformat(params['end'][0])
+        except (KeyError, ValueError):
+            return self.json_error(400, "start and end must be YYYY-MM-DD")
+        if not 0 <= (end - start).days <= MAX_RANGE_DAYS:
+            return self.json_error(400, f"end must be within {MAX_RANGE_DAYS} days after start")
+
+        index = self.load_due_index()
+        if index is None:
+            return self.json_error(503, "no cached export; run build_all_views.py with the snapshot cache")
+        return self.respond_json(index.range(start, end), headers)
+
+    def respond_search(self, params, headers):
+        text = params.get('q', [''])[0]
+        try:
+            limit = int(params.get('limit', [DEFAULT_LIMIT])[0])
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            return self.json_error(400, f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+
+        index = self.load_search_index()
+        if index is None:
+            return self.json_error(503, f"no {SEARCH_FILE}; run build_all_views.py")
+        items = index.query(text, limit)
+        return self.respond_json({'query': text, 'count': len(items), 'items': items}, headers)
+
+    def respond_json(self, payload, headers):
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        etag = make_etag(body)
+        base = {'Content-Type': 'application/json; charset=utf-8', 'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(headers.get('if-none-match'), etag):
+            return Response(304, base, b'')
+        return Response(200, base, body)
+
+    def json_error(self, status, message):
+        body = json.dumps({'error': message}).encode('utf-8')
+        return Response(status, {'Content-Type': 'application/json; charset=utf-8'}, body)
+
+    def load_due_index(self):
+        """Due index over the rows the current views were built from"""
+        if self.due_index is None:
+            try:
+                with open(self.store.root / STATE_FILE, 'r', encoding='utf-8') as f:
+                    digest = json.load(f).get('source_sha256')
+            except (OSError, ValueError):
+                return None
+            # A fresh cache object re-reads the index the pipeline just wrote
+            rows = SnapshotCache(self.cache_dir).rows_for_digest(digest) if digest else None
+            if rows is not None:
+                self.due_index = DueIndex(rows)
+        return self.due_index
+
+    def load_search_index(self):
+        """Search index parsed from the in-memory search_index.json"""
+        if self.search_index is None:
+            entry = self.store.get(SEARCH_FILE)
+            if entry is None:
+                return None
+            try:
+                self.search_index = SearchIndex(json.loads(entry['variants']['identity']))
+            except (ValueError, KeyError):
+                return None
+        return self.search_index
+
+    def respond_static(self, path, headers):
+        file_path = (self.site_dir / path.lstrip('/')).resolve()
+        if not file_path.is_relative_to(self.site_dir):
+            return Response(404, {}, b'Not Found')
+        if file_path.is_dir():
+            file_path = file_path / 'index.html'
+        try:
+            st = file_path.stat()
+            if not file_path.is_file():
+                raise FileNotFoundError(file_path)
+        except OSError:
+            return Response(404, {'Content-Type': 'text/plain; charset=utf-8'}, b'Not Found')
+
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        content_type = mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+            content_type += '; charset=utf-8'
+        base = {'Content-Type': content_type, 'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(headers.get('if-none-match'), etag):
+            return Response(304, base, b'')
+        return Response(200, base, file_path.read_bytes())
+
+    # Connection handling
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    await self.send(writer, 'GET', Response(400, {}, b'Bad Request'), keep_alive=False)
+                    break
+                method, target, version = parts
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                if method == 'GET' and urlsplit(target).path == '/events':
+                    await self.stream_events(writer)
+                    break
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = (version == 'HTTP/1.1' and connection != 'close') or connection == 'keep-alive'
+                response = self.respond(method, target, headers)
+                await self.send(writer, method, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer, method, response, keep_alive):
+        lines = [f"HTTP/1.1 {response.status} {REASONS.get(response.status, '')}"]
+        headers = dict(response.headers)
+        if response.status != 304:
+            headers['Content-Length'] = str(len(response.body))
+        headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+        lines.extend(f"{key}: {value}" for key, value in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if method != 'HEAD' and response.status != 304:
+            writer.write(response.body)
+        await writer.drain()
+
+    async def watch_views(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Reading and compressing a rebuild's views runs in a worker thread,
+            # so requests and SSE heartbeats keep flowing meanwhile
+            changed = await loop.run_in_executor(None, self.store.refresh)
+            if changed:
+                self.on_views_changed(changed)
+            rolled = self.store.roll_over(clock.today())
+            if rolled:
+                self.on_rollover(rolled)
+            await asyncio.sleep(self.refresh_interval)
+
+    def on_views_changed(self, changed):
+        self.due_index = None
+        self.search_index = None
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] 🔄 Reloaded: {', '.join(sorted(changed))}", flush=True)
+
+        manifest = self.read_versions()
+        if manifest is None:
+            # No pipeline versions (e.g. a single build_*_view.py run): count changes here
+            for name in changed:
+                if self.store.get(name) is not None:
+                    view = name[:-len('.json')]
+                    self.versions[view] = self.versions.get(view, 0) + 1
+                    self.broadcast({'view': view, 'version': self.versions[view],
+                                    'url': f"data/{name}", 'changes': None})
+            return
+
+        if VERSIONS_FILE not in changed:
+            return
+        for view, entry in manifest.get('views', {}).items():
+            if entry.get('version') != self.versions.get(view):
+                self.versions[view] = entry.get('version')
+                self.broadcast({'view': view, 'version': entry.get('version'),
+                                'url': entry.get('url'), 'changes': manifest.get('changes')})
+
+    def on_rollover(self, names):
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] 🌅 New day: serving "
+              f"{', '.join(f'{NEXT_DAY_DIR}/{name}' for name in names)} until the next rebuild", flush=True)
+        for name in names:
+            view = name[:-len('.json')]
+            self.broadcast({'view': view, 'version': self.versions.get(view),
+                            'url': f"data/{name}", 'changes': None})
+
+    def read_versions(self):
+        entry = self.store.get(VERSIONS_FILE)
+        if entry is None:
+            return None
+        try:
+            return json.loads(entry['variants']['identity'])
+        except ValueError:
+            return None
+
+    # Server-Sent Events
+
+    def broadcast(self, payload):
+        self.event_id += 1
+        message = (f"id: {self.event_id}\nevent: view-updated\n"
+                   f"data: {json.dumps(payload, ensure_ascii=False)}\n\n").encode('utf-8')
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too slow to keep up: end its stream; EventSource reconnects and resyncs
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                self.subscribers.discard(queue)
+
+    async def stream_events(self, writer):
+        queue = asyncio.Queue(MAX_PENDING_EVENTS)
+        self.subscribers.add(queue)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\n"
+                         b"Content-Type: text/event-stream; charset=utf-8\r\n"
+                         b"Cache-Control: no-cache\r\n"
+                         b"Connection: keep-alive\r\n\r\n"
+                         b"retry: 3000\n\n")
+            # Current versions first, so a (re)connecting client can resync
+            hello = {view: version for view, version in self.versions.items()}
+            writer.write(f"event: view-versions\ndata: {json.dumps(hello)}\n\n".encode('utf-8'))
+            await writer.drain()
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    message = b": ping\n\n"
+                if message is None:
+                    break
+                writer.write(message)
+                await writer.drain()
+        finally:
+            self.subscribers.discard(queue)
+
+    async def serve(self, host, port):
+        self.store.refresh()
+        manifest = self.read_versions() or {}
+        self.versions = {view: entry.get('version') for view, entry in manifest.get('views', {}).items()}
+        server = await asyncio.start_server(self.handle, host or None, port)
+        watcher = asyncio.create_task(self.watch_views())
+        print(f"🌐 Jenquin App: http://localhost:{port}  ({len(self.store.views)} views in memory, "
+              f"{'gzip+br' if brotli else 'gzip'})", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the dashboard with in-memory views")
+    parser.add_argument('port', nargs='?', type=int, default=8080)
+    parser.add_argument('--bind', default='', help="address to bind (default: all interfaces)")
+    parser.add_argument('--site-dir', default=str(SITE_DIR))
+    parser.add_argument('--data-dir', default=None, help="defaults to <site-dir>/data")
+    parser.add_argument('--cache-control', default='no-cache',
+                        help="Cache-Control for views (default: %(default)s, i.e. revalidate with ETag)")
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help="snapshot cache used by /api/range (default: %(default)s)")
+    args = parser.parse_args()
+
+    server = ViewServer(args.site_dir, args.data_dir, cache_control=args.cache_control,
+                        cache_dir=args.cache_dir)
+    try:
+        asyncio.run(server.serve(args.bind, args.port))
+    except KeyboardInterrupt:
+        sys.exit(0)
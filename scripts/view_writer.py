@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+view_writer.py
+Serializes view dicts to disk for the dashboard.
+
+Responsibility:
+- Compact JSON by default (no indent, ',' / ':' separators)
+- Pretty `indent=2` output as an opt-in debug format (the original layout)
+- Streams to the file item by item; lists may be generators, and the
+  whole document is never held as one string
+- Writes go to a temporary file renamed into place, never in place
+- Optional content digest that ignores the build timestamp, so callers
+  can tell which views actually changed
+- Optional string table: repeated values such as `list`, `day_name` and
+  `relative_day` become indexes into a top-level "strings" array
+"""
+
+import hashlib
+import io
+import json
+import os
+
+# Item fields worth interning when string_table=True
+STRING_TABLE_KEYS = frozenset(('list', 'day_name', 'relative_day', 'category', 'type', 'status'))
+
+# Top-level keys left out of a view's digest: they change on every build
+VOLATILE_KEYS = frozenset(('generated_at',))
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+_encode = _encoder.encode   # one-shot encode uses the C accelerator
+
+class StringTable:
+    """Assigns a stable index to each distinct interned string"""
+
+    def __init__(self, keys=STRING_TABLE_KEYS):
+        self.keys = keys
+        self.index = {}
+        self.strings = []
+
+    def intern(self, item):
+        """Shallow copy of a flat item with interned values replaced by indexes"""
+        out = {}
+        for key, value in item.items():
+            if key in self.keys and isinstance(value, str):
+                slot = self.index.get(value)
+                if slot is None:
+                    slot = self.index[value] = len(self.strings)
+                    self.strings.append(value)
+                value = slot
+            out[key] = value
+        return out
+
+def _is_container(value):
+    return isinstance(value, (dict, list, tuple)) or hasattr(value, '__next__')
+
+def _write_compact(obj, write, table):
+    if isinstance(obj, dict):
+        if not any(_is_container(v) for v in obj.values()):
+            # A flat item: encode it in one C call
+            write(_encode(table.intern(obj) if table else obj))
+            return
+        write('{')
+        first = True
+        for key, value in obj.items():
+            if not first:
+                write(',')
+            first = False
+            write(_encode(str(key)))
+            write(':')
+            _write_compact(value, write, table)
+        write('}')
+    elif isinstance(obj, (list, tuple)) and not any(_is_container(v) for v in obj):
+        # A flat array (e.g. search postings): one C call as well
+        write(_encode(obj))
+    elif isinstance(obj, (list, tuple)) or hasattr(obj, '__next__'):
+        write('[')
+        first = True
+        for value in obj:
+            if not first:
+                write(',')
+            first = False
+            _write_compact(value, write, table)
+        write(']')
+    else:
+        write(_encode(obj))
+
+def expand_strings(output):
+    """Undo string_table=True in place on a loaded view; returns it"""
+    strings = output.pop('strings', None)
+    if strings is None:
+        return output
+
+    def expand(obj):
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                if key in STRING_TABLE_KEYS and type(value) is int:
+                    obj[key] = strings[value]
+                elif isinstance(value, (dict, list)):
+                    expand(value)
+        elif isinstance(obj, list):
+            for value in obj:
+                expand(value)
+
+    expand(output)
+    return output
+
+def _materialize(obj):
+    """json.dump default: lists may be generators (pretty output collects them)"""
+    if hasattr(obj, '__next__'):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dump_view(output, f, pretty=False, string_table=False, digest=None):
+    """Write a view dict to an open text file
+
+    digest (a hashlib object) is fed everything written except the
+    VOLATILE_KEYS, so it only changes when the view's content does.
+    """
+    if digest is None:
+        write = f.write
+    else:
+        def write(text):
+            f.write(text)
+            digest.update(text.encode('utf-8'))
+
+    if pretty:
+        # Key by key, but byte for byte what json.dump(indent=2) writes
+        if not output:
+            write('{}')
+            return
+        separator = '{\n  '
+        for key, value in output.items():
+            put = f.write if key in VOLATILE_KEYS else write
+            write(separator)
+            separator = ',\n  '
+            put(json.dumps(str(key), ensure_ascii=False))
+            put(': ')
+            put(json.dumps(value, indent=2, ensure_ascii=False, default=_materialize).replace('\n', '\n  '))
+        write('\n}')
+        return
+
+    table = StringTable() if string_table else None
+    write('{')
+    first = True
+    for key, value in output.items():
+        if not first:
+            write(',')
+        first = False
+        put = f.write if key in VOLATILE_KEYS else write
+        put(_encode(str(key)))
+        put(':')
+        _write_compact(value, put, table)
+    if table is not None:
+        # The table is only complete after the items, so it goes last
+        write(',"strings":' if output else '"strings":')
+        write(_encode(table.strings))
+    write('}')
+
+def encode_view(output, pretty=False, string_table=False):
+    """Serialized view as UTF-8 bytes (for hashing before writing)"""
+    buffer = io.StringIO()
+    dump_view(output, buffer, pretty=pretty, string_table=string_table)
+    return buffer.getvalue().encode('utf-8')
+
+def write_view(output, output_json, pretty=False, string_table=False, digest=False):
+    """Write a view dict to output_json
+
+    The view goes to a temporary sibling that is renamed over output_json,
+    so a reader sees the old file or the new one, never a partial write.
+    With digest=True returns the SHA-256 of the content (see dump_view).
+    """
+    hasher = hashlib.sha256() if digest else None
+    tmp_path = f"{output_json}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        dump_view(output, f, pretty=pretty, string_table=string_table, digest=hasher)
+    os.replace(tmp_path, output_json)
+    return hasher.hexdigest() if hasher else None
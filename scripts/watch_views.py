@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+watch_views.py
+Long-running watcher that rebuilds the views as soon as a new Nova Scheduling CSV lands.
+
+Responsibility:
+- Notice new/changed CSVs in the nova_scheduling directory
+  (polling, or filesystem events when the optional `watchdog` package is installed)
+- Debounce: only build once the newest file's size/mtime has settled,
+  so half-written exports are skipped
+- Rebuild in-process with a warm snapshot cache, one build at a time,
+  with the same options as pull_reminders_local.sh (backlog pages, calendar)
+- A failed build is retried after a delay instead of waiting for the next export
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from build_all_views import build_all_views
+from snapshot_cache import SnapshotCache, DEFAULT_CACHE_DIR
+from pipeline_metrics import configure_logging
+
+SOURCE_DIR = "/Volumes/storage/projects/LifeOrganizer/life_organizer/modules/organized_reminders/data/nova_scheduling"
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+# Same as pull_reminders_local.sh and refresh_pipeline.json
+BACKLOG_PAGE_SIZE = 200
+
+# Seconds before a failed build of the same export is tried again
+RETRY_DELAY = 30.0
+
+def find_newest_csv(source_dir):
+    """Same pick as `find SOURCE_DIR -name "*.csv" | sort | tail -1`"""
+    newest = None
+    for root, dirs, files in os.walk(source_dir):
+        for name in files:
+            if name.endswith('.csv') and not name.startswith('.'):
+                path = os.path.join(root, name)
+                if newest is None or path > newest:
+                    newest = path
+    return newest
+
+def file_signature(path):
+    """(path, size, mtime_ns) or None if the file vanished"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (path, st.st_size, st.st_mtime_ns)
+
+class PollWakeup:
+    """Wakes the watcher every poll interval"""
+
+    def __init__(self, source_dir):
+        self.event = threading.Event()
+
+    def idle_timeout(self, interval):
+        return interval
+
+    def wait(self, timeout):
+        woke = self.event.wait(timeout)
+        self.event.clear()
+        return woke
+
+    def stop(self):
+        pass
+
+class WatchdogWakeup(PollWakeup):
+    """Wakes the watcher on filesystem events (FSEvents / inotify via watchdog)"""
+
+    def __init__(self, source_dir):
+        super().__init__(source_dir)
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+
+        event = self.event
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, fs_event):
+                event.set()
+
+        self.observer = Observer()
+        self.observer.schedule(Handler(), source_dir, recursive=True)
+        self.observer.start()
+
+    def idle_timeout(self, interval):
+        # Events wake us; the timeout is only a safety net for missed ones
+        return 30.0
+
+    def stop(self):
+        self.observer.stop()
+        self.observer.join()
+
+def make_wakeup(backend, source_dir):
+    if backend in ('auto', 'watchdog'):
+        try:
+            return WatchdogWakeup(source_dir)
+        except ImportError:
+            if backend == 'watchdog':
+                raise
+    return PollWakeup(source_dir)
+
+def log(message):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}", flush=True)
+
+class ViewWatcher:
+    """Debounced single-flight rebuild loop"""
+
+    def __init__(self, source_dir, data_dir, cache_dir=DEFAULT_CACHE_DIR,
+                 interval=0.5, settle=0.5, backend='auto',
+                 backlog_page_size=BACKLOG_PAGE_SIZE, calendar=True, retry_delay=RETRY_DELAY):
+        self.source_dir = source_dir
+        self.data_dir = Path(data_dir)
+        self.cache = SnapshotCache(cache_dir)
+        self.interval = interval
+        self.settle = settle
+        self.backend = backend
+        self.backlog_page_size = backlog_page_size
+        self.calendar = calendar
+        self.retry_delay = retry_delay
+        self.built = None       # signature of the last export we built
+        self.pending = None     # signature waiting to settle
+        self.pending_since = 0.0
+
+    def check(self):
+        """Build if the newest export is new and has stopped changing"""
+        newest = find_newest_csv(self.source_dir)
+        signature = file_signature(newest) if newest else None
+        if signature is None or signature == self.built:
+            self.pending = None
+            return False
+
+        now = time.monotonic()
+        if signature != self.pending:
+            # New or still growing: restart the settle timer
+            self.pending = signature
+            self.pending_since = now
+            return False
+        if now - self.pending_since < self.settle:
+            return False
+
+        if not self.build(newest):
+            # Keep it pending; the settle timer now also covers the retry delay
+            self.pending_since = now + self.retry_delay
+            log(f"🔁 Retrying in {self.retry_delay:g}s")
+            return False
+        self.built = signature
+        self.pending = None
+        return True
+
+    def build(self, source_csv):
+        started = time.perf_counter()
+        log(f"📄 Processing: {os.path.basename(source_csv)}")
+        try:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source_csv, self.data_dir / 'nova_scheduling.csv')
+            ok = build_all_views(source_csv, self.data_dir, cache=self.cache,
+                                 backlog_page_size=self.backlog_page_size, calendar=self.calendar)
+        except Exception as e:
+            log(f"❌ {type(e).__name__}: {e}")
+            ok = False
+        elapsed = time.perf_counter() - started
+        log(f"{'✅' if ok else '❌'} Rebuild {'finished' if ok else 'failed'} in {elapsed:.2f}s")
+        return ok
+
+    def run(self, once=False):
+        wakeup = make_wakeup(self.backend, self.source_dir)
+        log(f"👀 Watching {self.source_dir} ({type(wakeup).__name__})")
+        try:
+            while True:
+                built = self.check()
+                if once and built:
+                    return
+                # While a file is settling, re-check soon even without events
+                wakeup.wait(self.settle if self.pending else wakeup.idle_timeout(self.interval))
+        except KeyboardInterrupt:
+            log("👋 Watcher stopped")
+        finally:
+            wakeup.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild reminder views whenever a new export lands")
+    parser.add_argument('--source-dir', default=SOURCE_DIR)
+    parser.add_argument('--data-dir', default=str(DATA_DIR))
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR))
+    parser.add_argument('--interval', type=float, default=0.5, help="poll interval in seconds")
+    parser.add_argument('--settle', type=float, default=0.5,
+                        help="seconds a file must stay unchanged before it is built")
+    parser.add_argument('--backend', choices=('auto', 'poll', 'watchdog'), default='auto')
+    parser.add_argument('--backlog-page-size', type=int, default=BACKLOG_PAGE_SIZE,
+                        help="backlog page size (0 disables the pages)")
+    parser.add_argument('--no-calendar', action='store_true', help="skip the calendar month shards")
+    parser.add_argument('--retry-delay', type=float, default=RETRY_DELAY,
+                        help="seconds before a failed build is retried")
+    parser.add_argument('--once', action='store_true', help="exit after the first build")
+    parser.add_argument('--log-level', default='INFO', choices=('DEBUG', 'INFO', 'WARNING', 'ERROR'))
+    args = parser.parse_args()
+
+    configure_logging(args.log_level)
+
+    if not os.path.isdir(args.source_dir):
+        print(f"❌ Source directory not found: {args.source_dir}")
+        sys.exit(1)
+
+    ViewWatcher(args.source_dir, args.data_dir, cache_dir=args.cache_dir,
+                interval=args.interval, settle=args.settle, backend=args.backend,
+                backlog_page_size=args.backlog_page_size, calendar=not args.no_calendar,
+                retry_delay=args.retry_delay).run(once=args.once)
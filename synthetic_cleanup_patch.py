@@ -2,9 +2,96 @@
 """
 Patch for reminder_tagger.py to auto-cleanup synthetic instances 
 when original reminders are deleted.
+
+Recurring reminders get synthetic instances for every occurrence in a
+rolling horizon (recurrence_engine.py: daily / weekly BYDAY / monthly,
+INTERVAL, UNTIL, COUNT), so the week view and calendar see future ones.
+
+A persisted ledger (parent id -> synthetic instances by day, for the
+current horizon) makes orphan cleanup a set difference and answers
+"already generated this day" without a scan of every reminder.
 """
 
-def clean_synthetic_instances_patch(all_reminders, current_export_ids):
+import json
+import os
+
+from recurrence_engine import OccurrenceIndex, parse_rule
+
+# Today plus the 7 days the week view shows
+DEFAULT_HORIZON_DAYS = 8
+
+LEDGER_VERSION = 2
+
+class SyntheticLedger:
+    """
+    Persisted map of parent reminder id -> synthetic instances generated
+    for it, by day ({'YYYY-MM-DD': synthetic id}). Only days from today to
+    the end of the horizon are kept, so the file stays the size of one
+    horizon however long a reminder repeats.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.parents = {}
+        self.loaded = False
+        self.dirty = False
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if saved.get('version') == LEDGER_VERSION:
+                    self.parents = saved['parents']
+                    self.loaded = True
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def adopt(self, reminders):
+        """Seed the ledger from synthetic instances already in a reminder list"""
+        for reminder in reminders:
+            if reminder.get('synthetic'):
+                synthetic_id = reminder.get('id', '')
+                parent_id = synthetic_id.split('_synthetic_')[0]
+                self.record(parent_id, synthetic_id, (reminder.get('due') or '')[:10])
+
+    def record(self, parent_id, synthetic_id, day):
+        self.parents.setdefault(parent_id, {})[day] = synthetic_id
+        self.dirty = True
+
+    def has(self, parent_id, day):
+        """True if parent_id already has an instance on day (a 'YYYY-MM-DD' inside the horizon)"""
+        return day in self.parents.get(parent_id, ())
+
+    def prune(self, start, end):
+        """Forget instances dated outside start <= day < end ('YYYY-MM-DD')
+
+        Parents stay listed with no days, so deleting one still clears
+        its older instances from the reminder list.
+        """
+        for days in self.parents.values():
+            stale = [day for day in days if not start <= day < end]
+            for day in stale:
+                del days[day]
+            self.dirty = self.dirty or bool(stale)
+
+    def remove_orphans(self, current_export_ids):
+        """Forget parents missing from the export; returns their ids"""
+        orphan_ids = self.parents.keys() - current_export_ids
+        for parent_id in orphan_ids:
+            del self.parents[parent_id]
+            self.dirty = True
+        return orphan_ids
+
+    def save(self):
+        if not self.path or not (self.dirty or not self.loaded):
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'version': LEDGER_VERSION, 'parents': self.parents},
+                               ensure_ascii=False, separators=(',', ':')))
+        os.replace(tmp_path, self.path)
+        self.loaded, self.dirty = True, False
+
+def clean_synthetic_instances_patch(all_reminders, current_export_ids, ledger=None):
     """
     Remove synthetic instances whose original reminders no longer exist
     in the current Apple Reminders export.
@@ -12,10 +99,21 @@ def clean_synthetic_instances_patch(all_reminders, current_export_ids):
     Args:
         all_reminders: List of all reminders (including synthetic)
         current_export_ids: Set of reminder IDs from current export
+        ledger: Optional SyntheticLedger; orphans are then found from it
+            without inspecting every reminder
     
     Returns:
         Cleaned list of reminders with orphaned synthetics removed
     """
+    if ledger is not None:
+        orphan_parents = ledger.remove_orphans(current_export_ids)
+        if not orphan_parents:
+            return list(all_reminders)
+        cleaned = [r for r in all_reminders
+                   if not (r.get('synthetic') and r.get('id', '').split('_synthetic_')[0] in orphan_parents)]
+        print(f"🧹 Auto-cleanup: Removed {len(all_reminders) - len(cleaned)} orphaned synthetic instances")
+        return cleaned
+
     cleaned = []
     removed_count = 0
     
@@ -40,74 +138,95 @@ def clean_synthetic_instances_patch(all_reminders, current_export_ids):
     
     return cleaned
 
-def enhanced_recurrence_generator(reminders, current_export_ids):
+def enhanced_recurrence_generator(reminders, current_export_ids, today=None,
+                                  horizon_days=DEFAULT_HORIZON_DAYS, index_path=None,
+                                  ledger_path=None):
     """
     Enhanced recurrence generator with automatic synthetic cleanup.
     
     Args:
         reminders: List of deduplicated reminders
         current_export_ids: Set of reminder IDs from current export
+        today: First day of the horizon (defaults to the current date)
+        horizon_days: Days from today that get synthetic instances
+        index_path: Optional JSON file persisting the occurrence index
+        ledger_path: Optional JSON file persisting the synthetic ledger;
+            without one the ledger is rebuilt from the list on every run
     
     Returns:
         List with synthetic instances added and orphans cleaned
     """
     import datetime
     
+    today = today or datetime.datetime.now().date()
+    horizon_end = today + datetime.timedelta(days=horizon_days)
+
+    ledger = SyntheticLedger(ledger_path)
+    if not ledger.loaded:
+        ledger.adopt(reminders)
+    # Days before today (or past a shorter horizon) are no longer generated
+    ledger.prune(today.isoformat(), horizon_end.isoformat())
+
     # First, clean any existing synthetic instances whose originals are deleted
-    cleaned_reminders = clean_synthetic_instances_patch(reminders, current_export_ids)
+    cleaned_reminders = clean_synthetic_instances_patch(reminders, current_export_ids, ledger)
     
-    today = datetime.datetime.now().date()
     output = list(cleaned_reminders)  # Start with cleaned list
     synthetic_count = 0
     
-    # Index to avoid duplicate same-day instances
-    instance_index = {}
+    # Recurrence rule and anchor date for current valid reminders only
+    recurring = {}
+    originals = {}
+    due_days = {}
+    daily_keywords = ["daily", "every day", "water", "feed", "walk", "exercise"]
     for r in cleaned_reminders:
+        # Skip if already synthetic or not in the current export
+        if r.get('synthetic') or r.get('id') not in current_export_ids:
+            continue
+
+        rule = r.get("recurrence") or ""
+        if parse_rule(rule) is None:
+            # Simple daily pattern detection
+            title = r.get("title", "").lower()
+            if not any(keyword in title for keyword in daily_keywords):
+                continue
+            rule = "daily"
+
+        anchor = today
         if r.get("due"):
             try:
-                due_date = datetime.datetime.strptime(r["due"][:10], "%Y-%m-%d").date()
-                instance_index[(r["title"], due_date)] = True
-            except:
+                anchor = datetime.date.fromisoformat(r["due"][:10])
+                due_days[r["id"]] = anchor
+            except ValueError:
                 pass
+        recurring[r["id"]] = (rule, anchor)
+        originals[r["id"]] = r
 
-    # Generate synthetic instances for current valid reminders only
-    for r in cleaned_reminders:
-        # Skip if reminder doesn't exist in current export
-        if not r.get('synthetic') and r.get('id') not in current_export_ids:
-            continue
-            
-        # Skip if already synthetic
-        if r.get('synthetic'):
-            continue
-            
-        # Check for recurrence patterns
-        recurrence = r.get("recurrence", "").lower() if r.get("recurrence") else ""
-        
-        # Simple daily pattern detection
-        is_likely_daily = False
-        title = r.get("title", "").lower()
-        daily_keywords = ["daily", "every day", "water", "feed", "walk", "exercise"]
-        if any(keyword in title for keyword in daily_keywords):
-            is_likely_daily = True
-
-        # Skip if already have instance for today
-        if (r["title"], today) in instance_index:
-            continue
+    # Only reminders whose rule or anchor changed are re-expanded
+    occurrence_index = OccurrenceIndex(index_path)
+    occurrence_index.update(recurring, today, horizon_end)
+    occurrence_index.save()
 
-        # Generate daily recurrence instance
-        if recurrence == "daily" or is_likely_daily:
-            synthetic = generate_today_instance(r, today)
+    for reminder_id, r in originals.items():
+        for day in occurrence_index.dates(reminder_id):
+            # Skip the original's own due day and days already generated
+            if day == due_days.get(reminder_id) or ledger.has(reminder_id, day.isoformat()):
+                continue
+            synthetic = generate_today_instance(r, day)
             output.append(synthetic)
-            instance_index[(r["title"], today)] = True
+            ledger.record(reminder_id, synthetic["id"], day.isoformat())
             synthetic_count += 1
 
-    print(f"Recurrence generator: Created {synthetic_count} synthetic instances for today")
+    ledger.save()
+
+    print(f"Recurrence generator: Created {synthetic_count} synthetic instances "
+          f"for {today} – {horizon_end - datetime.timedelta(days=1)} "
+          f"({occurrence_index.expanded} rules expanded)")
     return output
 
 def generate_today_instance(reminder, today):
     """
-    Creates a synthetic 'today' instance of a repeating reminder.
-    Does NOT alter the original reminder.
+    Creates a synthetic instance of a repeating reminder on `today`
+    (any occurrence date). Does NOT alter the original reminder.
     """
     # Extract time from original due date, default to 09:00:00 if parsing fails
     original_time = "09:00:00"
@@ -123,9 +242,12 @@ def generate_today_instance(reminder, today):
         **reminder,  # copy all fields
         "due": today.strftime("%Y-%m-%d ") + original_time,
         "synthetic": True,
-        "id": reminder.get("id", "") + "_synthetic_" + today.strftime("%Y%m%d")  # unique synthetic ID
+        "id": synthetic_id(reminder, today)  # unique synthetic ID
     }
 
+def synthetic_id(reminder, day):
+    return reminder.get("id", "") + "_synthetic_" + day.isoformat().replace("-", "")
+
 # Instructions for patching:
 """
 In reminder_tagger.py, replace the recurrence_generator function call with:
@@ -133,6 +255,10 @@ In reminder_tagger.py, replace the recurrence_generator function call with:
 # Before tagging, get current export IDs
 current_export_ids = set(r.get('id', '') for r in deduplicated_reminders if r.get('id'))
 
-# Enhanced recurrence generation with cleanup
-tagged_reminders = enhanced_recurrence_generator(tagged_reminders, current_export_ids)
+# Enhanced recurrence generation with cleanup; the index file keeps
+# unchanged rules from being re-expanded on every run, and the ledger
+# tracks which synthetic instances belong to which reminder
+tagged_reminders = enhanced_recurrence_generator(tagged_reminders, current_export_ids,
+                                                 index_path="recurrence_index.json",
+                                                 ledger_path="synthetic_ledger.json")
 """
\ No newline at end of file